@@ -1,26 +1,28 @@
-import math
 import os.path
 
-import cv2
-import numpy as np
-
 from analysis.AccumulationMapping import AccumulationMapping
 from analysis.AnalysisConfiguration import AnalysisConfiguration
+from analysis.ArtifactCache import ArtifactCache
+from analysis.DirectedMaskFormat import load_directed_mask, save_directed_mask
+from analysis.DirectedMaskRasterizer import DirectedMaskRasterizer
 from analysis.extractors.BivariateSplineExtractor import BivariateSplineExtractor
 from analysis.Plotter import Plotter
 from analysis.RelatableFixations import RelatableFixations
 from analysis.SimpleFixation import SimpleFixation
+from analysis.StreamingDirectedMaskAccumulator import StreamingDirectedMaskAccumulator
 from analysis.WeightType import WeightType
+from analysis.directed_mask_algebra import sum_directed_masks, subtract_directed_masks
 from analysis.HeatPoint import HeatPoint
 from analysis.analysis_utils import parse_explorations, get_explorations_file_path, parse_fixations, \
     get_difference_fixations_file_path, get_movements_file_path, filter_fixations_for_exploration, \
-    DIRECTED_MASK_SIGNATURE, get_directed_mask_file_path, get_directed_masks_dir
+    get_directed_mask_file_path, get_directed_masks_dir, get_flipped_min_max_timestamps, \
+    get_accumulated_directed_mask_file_path, map_in_parallel
 from config import ACCUMULATED_PLOT_DIR, ORIGINAL_IMG_DIR, ACCUMULATED_DIRECTED_MASK_DIR, MIDDLE_FIXATION_INTENSITY, \
     ACCUMULATED_SALIENCE_PLOT_DIR
 from experiment.Experiment import Experiment
 from experiment.Image import Image
 from experiment.Task import Task
-from util import normalize_value, find_file_in_dir
+from util import find_file_in_dir
 
 
 SimpleFixationsMap = dict[str, list[SimpleFixation]]
@@ -33,6 +35,9 @@ class Accumulator:
     def __init__(self, config, plotter):
         self.config: AnalysisConfiguration = config
         self.plotter: Plotter = plotter
+        self.rasterizer: DirectedMaskRasterizer = DirectedMaskRasterizer()
+        # Shared with the Plotter, hence files are hashed once per run
+        self.artifact_cache: ArtifactCache = plotter.artifact_cache
 
     def get_relatable_fixations(self):
         """Collects all fixations from the given PIDs.
@@ -120,7 +125,7 @@ class Accumulator:
             elif weight_type == WeightType.INTENSITY:
                 return fixation.duration
             elif weight_type == WeightType.ORDER:
-                flip, min_weight, max_weight = self._get_flipped_min_max_weight(simple_fixations)
+                flip, min_weight, max_weight = get_flipped_min_max_timestamps(simple_fixations)
                 return flip(fixation.timestamp_us)
             else:
                 raise ValueError(f"This weight type is not supported to calculate the intensity of a single fixation ({weight_type})")
@@ -207,19 +212,27 @@ class Accumulator:
         self.accumulated_fixations(relatable_fixations_map, accumulated_plot_dir)
 
     def generate_directed_masks(self, relatable_fixations: list[RelatableFixations]):
-        for relatable_fixation in relatable_fixations:
-            pid = relatable_fixation.pid
-            directed_masks_dir = get_directed_masks_dir(pid)
-            if not os.path.exists(directed_masks_dir):
-                os.makedirs(directed_masks_dir)
-
-            original_img_path = find_file_in_dir(relatable_fixation.image.get_name(), ORIGINAL_IMG_DIR)
-
-            directed_mask_file_path = get_directed_mask_file_path(pid, relatable_fixation.exploration_id)
-            if not os.path.exists(directed_mask_file_path) or self.config.directed_mask_overwrite:
-                # Generate a directed mask and save it to file
-                directed_mask = self.generate_directed_mask(original_img_path, relatable_fixation.fixations, self.config.directed_weight_type)
-                np.save(directed_mask_file_path, directed_mask)
+        for pid in sorted({relatable_fixation.pid for relatable_fixation in relatable_fixations}):
+            os.makedirs(get_directed_masks_dir(pid), exist_ok=True)
+        map_in_parallel(self.generate_directed_mask_for_exploration, relatable_fixations, self.config.jobs,
+                        "Generated directed masks")
+
+    def generate_directed_mask_for_exploration(self, relatable_fixation: RelatableFixations):
+        pid = relatable_fixation.pid
+        original_img_path = find_file_in_dir(relatable_fixation.image.get_name(), ORIGINAL_IMG_DIR)
+
+        mask_format = self.config.directed_mask_format
+        directed_mask_file_path = get_directed_mask_file_path(pid, relatable_fixation.exploration_id, mask_format)
+        fixations = [(fixation.timestamp_us, fixation.duration, fixation.norm_x, fixation.norm_y)
+                     for fixation in relatable_fixation.fixations]
+        key = self.artifact_cache.key([], {"artifact": "directed-mask", "fixations": fixations,
+                                           "size": self.plotter.image_cache.get_size(original_img_path),
+                                           "weight_type": self.config.directed_weight_type, "format": vars(mask_format)})
+        if not self.artifact_cache.is_current(directed_mask_file_path, key) or self.config.directed_mask_overwrite:
+            # Generate a directed mask and save it to file
+            directed_mask = self.generate_directed_mask(original_img_path, relatable_fixation.fixations, self.config.directed_weight_type)
+            mask_format.save(directed_mask_file_path, directed_mask)
+            self.artifact_cache.record(directed_mask_file_path, key)
 
     def generate_accumulated_directed_masks(self, relatable_fixations_map: RelatableFixationsMap):
         accumulated_directed_mask_dir = ACCUMULATED_DIRECTED_MASK_DIR
@@ -228,51 +241,35 @@ class Accumulator:
 
         accumulated_directed_masks = []
 
+        mask_format = self.config.directed_mask_format
         for list_id, relatable_fixations_list in relatable_fixations_map.items():
-            accumulated_directed_mask_path = os.path.join(accumulated_directed_mask_dir, f"{list_id}-accumulated-directed-mask.npy")
-            if os.path.exists(accumulated_directed_mask_path) and not self.config.directed_mask_overwrite:
-                accumulated_directed_masks.append(np.load(accumulated_directed_mask_path))
+            accumulated_directed_mask_path = get_accumulated_directed_mask_file_path(list_id, mask_format)
+            directed_mask_file_paths = [get_directed_mask_file_path(relatable_fixation.pid, relatable_fixation.exploration_id, mask_format)
+                                        for relatable_fixation in relatable_fixations_list]
+            key = self.artifact_cache.key(directed_mask_file_paths, {"artifact": "accumulated-directed-mask",
+                                                                     "format": vars(mask_format)})
+            if self.artifact_cache.is_current(accumulated_directed_mask_path, key) and not self.config.directed_mask_overwrite:
+                accumulated_directed_masks.append(load_directed_mask(accumulated_directed_mask_path))
             else:
-                directed_masks = []
-
-                for relatable_fixation in relatable_fixations_list:
-                    pid = relatable_fixation.pid
-                    directed_mask_file_path = get_directed_mask_file_path(pid, relatable_fixation.exploration_id)
-                    if not os.path.exists(directed_mask_file_path):
-                        raise FileNotFoundError(f"Could not find directed mask: {directed_mask_file_path}")
-                    directed_masks.append(np.load(directed_mask_file_path))
-
-                accumulated_directed_mask = self.accumulate_directed_masks(directed_masks)
+                checkpoint_path = f"{os.path.splitext(accumulated_directed_mask_path)[0]}-checkpoint.npz"
+                streaming_accumulator = StreamingDirectedMaskAccumulator(checkpoint_path)
+                accumulated_directed_mask = streaming_accumulator.accumulate(directed_mask_file_paths)
                 accumulated_directed_masks.append(accumulated_directed_mask)
-                np.save(accumulated_directed_mask_path, accumulated_directed_mask)
+                save_directed_mask(accumulated_directed_mask_path, accumulated_directed_mask)
+                self.artifact_cache.record(accumulated_directed_mask_path, key)
+                streaming_accumulator.discard_checkpoint()
 
         return accumulated_directed_masks
 
     def accumulate_directed_masks(self, directed_masks):
         """Cumulatively adds up vectors at the same position for each directed mask.
         """
-        accumulated_directed_mask = directed_masks[0]
-        shape = accumulated_directed_mask.shape
-        height, width, _ = shape
-
-        vectorized_combine_directed_mask_values = np.vectorize(self._combine_directed_mask_values, signature=DIRECTED_MASK_SIGNATURE)
-
-        print(f"Planned directed mask accumulations: {len(directed_masks)-1}")
-        for index, directed_mask in enumerate(directed_masks[1:]):
-            print(f"Current directed mask accumulation: {index+1}")
-            if shape != directed_mask.shape:
-                raise ValueError(f"Directed masks must have the same shape {shape} != {directed_mask.shape}")
-
-            accumulated_directed_mask = vectorized_combine_directed_mask_values(accumulated_directed_mask, directed_mask)
-
-        return accumulated_directed_mask
+        return sum_directed_masks(directed_masks)
 
     def subtract_directed_mask(self, accumulated_directed_mask, directed_mask):
         """Subtracts directed mask vectors from accumulated directed mask vectors at the same position.
         """
-        vectorized_subtract_directed_mask_values = np.vectorize(self._subtract_directed_mask_values, signature=DIRECTED_MASK_SIGNATURE)
-        subtracted_directed_mask = vectorized_subtract_directed_mask_values(accumulated_directed_mask, directed_mask)
-        return subtracted_directed_mask
+        return subtract_directed_masks(accumulated_directed_mask, directed_mask)
 
     def generate_directed_mask(self, original_img_path, filtered_fixations: list[SimpleFixation], weight_type):
         """Generates a directed mask from a scanpath.
@@ -295,120 +292,5 @@ class Accumulator:
         returns:
             - A directed mask. Basically a 2D numpy array where each point has a vector value of (direction, strength).
         """
-        # Load the original image
-        original_img = cv2.imread(original_img_path)
-        width = original_img.shape[1]
-        height = original_img.shape[0]
-
-        # Initialize mask (2D array) with all zero directions and strengths (0, 0)
-        directed_mask = np.zeros((width * height, 2))
-        directed_mask = directed_mask.reshape((height, width, 2))
-        # Create a grid of coordinates for the 2D array
-        x_vector, y_vector = np.meshgrid(np.arange(directed_mask.shape[1]), np.arange(directed_mask.shape[0]))
-
-        if not filtered_fixations:
-            return directed_mask
-
-        flip = None
-        min_weight = None
-        max_weight = None
-
-        if weight_type == WeightType.ORDER:
-            flip, min_weight, max_weight = self._get_flipped_min_max_weight(filtered_fixations)
-
-        num_filtered_fixations = len(filtered_fixations)
-        print(f"Number of fixations to process: {num_filtered_fixations - 1}")
-        for fixation_index, fixation in enumerate(filtered_fixations):
-            if fixation_index < num_filtered_fixations - 1:
-                print(f"Processing fixation: {fixation_index + 1}")
-                next_fixation: SimpleFixation = filtered_fixations[fixation_index + 1]
-                vector_origin = (fixation.norm_x * width, fixation.norm_y * height)
-                vector_destination = (next_fixation.norm_x * width, next_fixation.norm_y * height)
-
-                vector = (vector_destination[0] - vector_origin[0], vector_destination[1] - vector_origin[1])
-                vector_len = math.sqrt(vector[0]**2 + vector[1]**2)
-                assert vector_len != 0
-                unit_vector = (vector[0] / vector_len, vector[1] / vector_len)
-
-                if weight_type == WeightType.ORDER:
-                    vector_intensity = normalize_value(flip(fixation.timestamp_us), min_weight, max_weight, 1, 256)
-                elif weight_type == WeightType.DISTANCE:
-                    vector_intensity = vector_len
-                elif weight_type == WeightType.INTENSITY:
-                    vector_intensity = normalize_value(fixation.duration, min_weight, max_weight, 1, 256)
-                else:
-                    vector_intensity = 50
-
-                vector = (unit_vector[0] * vector_intensity, unit_vector[1] * vector_intensity)
-
-                vector_range = vector_intensity
-
-                # Find points in range of vector
-                # Calculate all Euclidean distances from the vectors origin
-                distance_vector = np.sqrt((x_vector - vector_origin[0]) ** 2 + (y_vector - vector_origin[1]) ** 2)
-                # Find the indices of points within the given range
-                indices_in_vector_range = np.where(distance_vector <= vector_range)
-
-                points_in_range = []
-                for i in range(len(indices_in_vector_range[0])):
-                    points_in_range.append((indices_in_vector_range[0][i], indices_in_vector_range[1][i]))
-
-                # Identify values for each index
-                values_in_vector_range = directed_mask[indices_in_vector_range]
-                # Remember the distances for each index
-                distances_to_vector_origin = distance_vector[indices_in_vector_range]
-
-                num_points_in_range = len(points_in_range)
-                print(f"Influencing {num_points_in_range} vectors for fixation {fixation_index + 1}")
-                for i in range(num_points_in_range):
-                    #print(f"index {points_in_range[i]}; value {values_in_vector_range[i]}; distance {distances_to_vector_origin[i]}")
-                    directed_mask[points_in_range[i]] = self._influence_vector(values_in_vector_range[i], vector, distances_to_vector_origin[i], vector_range)
-
-        return directed_mask
-
-    def _get_flipped_min_max_weight(self, simple_filtered_fixations):
-        fixation_timestamps = [fixation.timestamp_us for fixation in simple_filtered_fixations]
-        min_fixation_timestamp = min(fixation_timestamps)
-        max_fixation_timestamp = max(fixation_timestamps)
-
-        def flip(value):
-            flipper = max_fixation_timestamp + 1
-            return abs(value - flipper)
-
-        # Flip timestamps to make early occurring fixations worth more than later occurring ones
-        flipped_min_timestamp = flip(max_fixation_timestamp)
-        flipped_max_timestamp = flip(min_fixation_timestamp)
-        return flip, flipped_min_timestamp, flipped_max_timestamp
-
-    def _influence_vector(self, influenced_vector: tuple, influencing_vector: tuple, vector_distance: float, influencing_vector_range: int) -> tuple:
-        """Influences vectors in range of influencing vector. Uses a linear function to reduce
-        the strength of influence the further the influenced vector is away from the influencing vector.
-
-        args:
-            - influenced_vector: One vector that is in range of the influencing vector and is influenced by it.
-            - influencing_vector: The one vector extracted from the current saccade that influences surrounding vectors.
-            - vector_distance: The distance of the influencing vector to the influenced vector.
-            - influencing_vector_range: The range in which the influencing vector influences other vectors.
-
-        returns:
-            - The influenced vector after being influenced.
-        """
-        def _strength_at_range(current_distance, max_range, max_strength):
-            return max_strength - (max_strength / max_range) * current_distance
-
-        influencing_vector_strength = math.sqrt(influencing_vector[0] ** 2 + influencing_vector[1] ** 2)
-        strength_at_range = _strength_at_range(vector_distance, influencing_vector_range, influencing_vector_strength)
-        assert strength_at_range != 0
-        influencing_unit_vector = (influencing_vector[0] / influencing_vector_strength, influencing_vector[1] / influencing_vector_strength)
-        vector_influence = (influencing_unit_vector[0] * strength_at_range, influencing_unit_vector[1] * strength_at_range)
-        added_vec = (influenced_vector[0] + vector_influence[0], influenced_vector[1] + vector_influence[1])
-
-        return added_vec
-
-    def _combine_directed_mask_values(self, vec1, vec2):
-        added_vec = vec1[0] + vec2[0], vec1[1] + vec2[1]
-        return np.array(added_vec)
-
-    def _subtract_directed_mask_values(self, vec_minuend, vec_subtrahend):
-        subtracted_vec = vec_minuend[0] - vec_subtrahend[0], vec_minuend[1] - vec_subtrahend[1]
-        return np.array(subtracted_vec)
+        width, height = self.plotter.image_cache.get_size(original_img_path)
+        return self.rasterizer.create_directed_mask(width, height, filtered_fixations, weight_type)
@@ -1,13 +1,25 @@
+from analysis.DirectedMaskFormat import DirectedMaskFormat
+
+
 class AnalysisConfiguration:
     def __init__(self, participants, general_overwrite, accumulation_overwrite, directed_mask_overwrite,
                  validation_overwrite, saliency, accumulation_mapping, accumulated_weight_type,
-                 directed_weight_type):
+                 directed_weight_type, directed_mask_format=None, native_fixation_filter=False,
+                 jobs=1):
         self.participants = participants
+        # Artifacts are rebuilt whenever their inputs change (see ArtifactCache),
+        # hence the overwrite flags only force a rebuild of the artifacts of their own stage
         self.general_overwrite = general_overwrite
-        self.accumulation_overwrite = accumulation_overwrite or general_overwrite
-        self.directed_mask_overwrite = directed_mask_overwrite or general_overwrite or accumulation_overwrite
-        self.validation_overwrite = validation_overwrite or general_overwrite or accumulation_overwrite or directed_mask_overwrite
+        self.accumulation_overwrite = accumulation_overwrite
+        self.directed_mask_overwrite = directed_mask_overwrite
+        # Validation scores are stored with the keys of their inputs and are recomputed when those change
+        self.validation_overwrite = validation_overwrite
         self.saliency = saliency
         self.accumulation_mapping = accumulation_mapping
         self.accumulated_weight_type = accumulated_weight_type
-        self.directed_weight_type = directed_weight_type
\ No newline at end of file
+        self.directed_weight_type = directed_weight_type
+        self.directed_mask_format = directed_mask_format if directed_mask_format is not None else DirectedMaskFormat()
+        # Applies the I-VT fixation filter in-process instead of running the GazeToolkit executable
+        self.native_fixation_filter = native_fixation_filter
+        # Number of worker processes for the per participant and per exploration stages, 1 runs them in-process
+        self.jobs = jobs
\ No newline at end of file
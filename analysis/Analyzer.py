@@ -1,3 +1,4 @@
+import functools
 import os.path
 import shutil
 from datetime import datetime
@@ -7,11 +8,14 @@ from analysis.Accumulator import Accumulator
 from analysis.AccumulationMapping import AccumulationMapping
 from analysis.AnalysisConfiguration import AnalysisConfiguration
 from analysis.Differentiator import Differentiator
+from analysis.GazeSampleStore import GazeSampleStore
 from analysis.Validator import Validator
 from analysis.WeightType import WeightType
 from analysis.analysis_utils import get_participant_analysis_data_dir, get_participant_experiment_data_dir, \
-    get_movements_file_path, get_explorations_file_path
+    get_movements_file_path, get_explorations_file_path, get_gaze_sample_store_file_path, map_in_parallel
 from analysis.fixation_filter.FixationFilter import FixationFilter
+from analysis.run_report import stage, reset_run_report, write_run_report
+from config import RUN_REPORT_PATH
 
 
 class Analyzer:
@@ -36,66 +40,64 @@ class Analyzer:
     def run(self):
         print(f"Starting analysis for participants: {self.config.participants}")
         self.t0 = datetime.now()
+        reset_run_report()
 
-        self.import_observation_data()
+        with stage("import_observation_data"):
+            self.import_observation_data()
 
-        self.fixation_filter.apply_ivt_fixation_filter()
+        with stage("fixation_filter"):
+            self.fixation_filter.apply_ivt_fixation_filter()
 
         self.analysis_data_for_participants_available()
 
         if self.config.saliency:
-            self.differentiator.create_difference_fixations()
+            with stage("difference_fixations"):
+                self.differentiator.create_difference_fixations()
 
-        self.plotter.plot_analysis_images()
+        with stage("analysis_plots"):
+            self.plotter.plot_analysis_images()
 
-        relatable_fixations = self.accumulator.get_relatable_fixations()
-        relatable_fixations_map = self.accumulator.map_relatable_fixations(relatable_fixations)
+        with stage("relatable_fixations"):
+            relatable_fixations = self.accumulator.get_relatable_fixations()
+            relatable_fixations_map = self.accumulator.map_relatable_fixations(relatable_fixations)
 
-        self.accumulator.generate_accumulated_fixations(relatable_fixations_map)
+        with stage("accumulated_fixations"):
+            self.accumulator.generate_accumulated_fixations(relatable_fixations_map)
 
-        self.accumulator.generate_directed_masks(relatable_fixations)
+        with stage("directed_masks"):
+            self.accumulator.generate_directed_masks(relatable_fixations)
 
-        accumulated_directed_masks = self.accumulator.generate_accumulated_directed_masks(relatable_fixations_map)
+        with stage("accumulated_directed_masks"):
+            accumulated_directed_masks = self.accumulator.generate_accumulated_directed_masks(relatable_fixations_map)
 
-        self.plotter.plot_directed_heatmaps(relatable_fixations_map, accumulated_directed_masks)
+        with stage("directed_heatmaps"):
+            self.plotter.plot_directed_heatmaps(relatable_fixations_map, accumulated_directed_masks)
 
-        self.validator.leave_one_out_cross_validation(relatable_fixations_map)
-        mapped_dm_correlations, mapped_hm_correlations, mapped_average_correlations = self.validator.analyse_cross_validation_results(relatable_fixations_map)
+        with stage("cross_validation"):
+            self.validator.leave_one_out_cross_validation(relatable_fixations_map)
+            mapped_dm_correlations, mapped_hm_correlations, mapped_average_correlations = self.validator.analyse_cross_validation_results(relatable_fixations_map)
 
-        self.plotter.save_cross_validation_analysis_results(
-            mapped_dm_correlations,
-            mapped_hm_correlations,
-            mapped_average_correlations)
+        with stage("cross_validation_results"):
+            self.plotter.save_cross_validation_analysis_results(
+                mapped_dm_correlations,
+                mapped_hm_correlations,
+                mapped_average_correlations)
 
         print(self.time_running())
+        self.write_run_report()
+
+    def write_run_report(self):
+        """Writes the stage timings and counters of the run to a json file, see analysis.run_report.
+        """
+        run_report = write_run_report(RUN_REPORT_PATH, started=self.t0.isoformat(timespec='seconds'),
+                                      total_seconds=self.time_running().total_seconds(),
+                                      participants=self.config.participants, jobs=self.config.jobs)
+        print(f"Wrote run report ({len(run_report['counters'])} counters) to {RUN_REPORT_PATH}")
 
     def import_observation_data(self):
-        tobii_data_str = "tobii_data.tsv"
-        explorations_str = "explorations.tsv"
-        for pid in self.config.participants:
-            participant_experiment_data_dir = get_participant_experiment_data_dir(pid)
-            if not os.path.exists(participant_experiment_data_dir):
-                print(f"Experiment data directory for participant {pid} not found, skipping participant")
-                continue
-            experiment_tobii_data_path = os.path.join(participant_experiment_data_dir, tobii_data_str)
-            assert os.path.exists(experiment_tobii_data_path)
-            experiment_explorations_path = os.path.join(participant_experiment_data_dir, explorations_str)
-            assert os.path.exists(experiment_explorations_path)
-            participant_analysis_data_dir = get_participant_analysis_data_dir(pid)
-            if not os.path.exists(participant_analysis_data_dir):
-                os.mkdir(participant_analysis_data_dir)
-            analysis_tobii_data_path = os.path.join(participant_analysis_data_dir, tobii_data_str)
-            if not os.path.exists(analysis_tobii_data_path) or self.config.general_overwrite:
-                try:
-                    shutil.copy(experiment_tobii_data_path, analysis_tobii_data_path)
-                except Exception as e:
-                    print(f"Encountered an error while importing an Tobii data file: {e}")
-            analysis_explorations_path = os.path.join(participant_analysis_data_dir, explorations_str)
-            if not os.path.exists(analysis_explorations_path) or self.config.general_overwrite:
-                try:
-                    shutil.copy(experiment_explorations_path, analysis_explorations_path)
-                except Exception as e:
-                    print(f"Encountered an error while importing an explorations file: {e}")
+        map_in_parallel(functools.partial(import_participant_observation_data,
+                                          general_overwrite=self.config.general_overwrite),
+                        self.config.participants, self.config.jobs, "Imported participants")
 
     def analysis_data_for_participants_available(self):
         """Check if participant data directory, fixations and explorations file is available.
@@ -116,6 +118,42 @@ class Analyzer:
         return datetime.now() - self.t0
 
 
+def import_participant_observation_data(pid, general_overwrite):
+    """Copies the Tobii data and explorations file of a participant into the analysis data directory
+    and imports the gaze samples into the participant's gaze sample store.
+    """
+    tobii_data_str = "tobii_data.tsv"
+    explorations_str = "explorations.tsv"
+    participant_experiment_data_dir = get_participant_experiment_data_dir(pid)
+    if not os.path.exists(participant_experiment_data_dir):
+        print(f"Experiment data directory for participant {pid} not found, skipping participant")
+        return
+    experiment_tobii_data_path = os.path.join(participant_experiment_data_dir, tobii_data_str)
+    assert os.path.exists(experiment_tobii_data_path)
+    experiment_explorations_path = os.path.join(participant_experiment_data_dir, explorations_str)
+    assert os.path.exists(experiment_explorations_path)
+    participant_analysis_data_dir = get_participant_analysis_data_dir(pid)
+    if not os.path.exists(participant_analysis_data_dir):
+        os.mkdir(participant_analysis_data_dir)
+    analysis_tobii_data_path = os.path.join(participant_analysis_data_dir, tobii_data_str)
+    if not os.path.exists(analysis_tobii_data_path) or general_overwrite:
+        try:
+            shutil.copy(experiment_tobii_data_path, analysis_tobii_data_path)
+        except Exception as e:
+            print(f"Encountered an error while importing an Tobii data file: {e}")
+    gaze_sample_store = GazeSampleStore(get_gaze_sample_store_file_path(pid))
+    if os.path.exists(analysis_tobii_data_path) and (not gaze_sample_store.is_current(analysis_tobii_data_path)
+                                                     or general_overwrite):
+        print(f"Importing gaze samples of participant {pid}")
+        gaze_sample_store.import_tobii_data(analysis_tobii_data_path)
+    analysis_explorations_path = os.path.join(participant_analysis_data_dir, explorations_str)
+    if not os.path.exists(analysis_explorations_path) or general_overwrite:
+        try:
+            shutil.copy(experiment_explorations_path, analysis_explorations_path)
+        except Exception as e:
+            print(f"Encountered an error while importing an explorations file: {e}")
+
+
 def get_default_analyzer():
     config = AnalysisConfiguration(
         participants=[i for i in range(1, 17)],
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+
+from analysis.run_report import count
+
+# Changing the version invalidates all artifacts, e.g. after changing how an artifact is computed
+ARTIFACT_CACHE_VERSION = 1
+
+
+class ArtifactCache:
+    """Decides whether an artifact has to be rebuilt by comparing keys instead of checking that the artifact exists.
+
+    The key of an artifact is a hash of everything it is computed from: the content of its input files and
+    its parameters. When an artifact is built, its key is recorded in a .key file next to it.
+    An artifact is current if its recorded key equals the key of its current inputs and parameters
+    and it was not changed after its key was recorded, hence only artifacts whose inputs or parameters changed
+    are rebuilt.
+
+    Input files that are artifacts themselves contribute their recorded key instead of their content,
+    as long as they were not changed after their key was recorded. Other files are hashed once per state.
+    """
+    def __init__(self):
+        self.file_digests: dict[tuple, str] = dict()
+
+    def key(self, input_file_paths, parameters) -> str:
+        """args:
+            - input_file_paths: The files the artifact is computed from. Missing files are part of the key as well.
+            - parameters: Everything else the artifact depends on, must be serializable to json.
+              Other objects (e.g. enums) are serialized by their string representation.
+        """
+        key_hash = hashlib.sha256()
+        key_hash.update(f"{ARTIFACT_CACHE_VERSION}\n".encode())
+        key_hash.update(json.dumps(parameters, sort_keys=True, default=str).encode())
+        for input_file_path in input_file_paths:
+            key_hash.update(f"\n{self._file_digest(input_file_path)}".encode())
+        return key_hash.hexdigest()
+
+    def is_current(self, artifact_path, key) -> bool:
+        key_file_path = self.key_file_path(artifact_path)
+        current = False
+        # An artifact changed after its key was recorded, e.g. by an interrupted rebuild, is not current
+        if os.path.exists(artifact_path) and os.path.exists(key_file_path) \
+                and os.stat(key_file_path).st_mtime_ns >= os.stat(artifact_path).st_mtime_ns:
+            with open(key_file_path, 'r') as key_file:
+                current = key_file.read() == key
+        count("artifact_cache_hits" if current else "artifact_cache_misses")
+        return current
+
+    def record(self, artifact_path, key):
+        """Records the key of a freshly built artifact.
+        """
+        key_file_path = self.key_file_path(artifact_path)
+        # Written next to the key file and moved in place, hence parallel workers never read a partial key
+        temporary_file_path = f"{key_file_path}.{os.getpid()}.tmp"
+        with open(temporary_file_path, 'w') as key_file:
+            key_file.write(key)
+        os.replace(temporary_file_path, key_file_path)
+
+    @staticmethod
+    def key_file_path(artifact_path):
+        return f"{artifact_path}.key"
+
+    def _file_digest(self, file_path):
+        if file_path is None or not os.path.exists(file_path):
+            return f"missing:{file_path}"
+        file_stat = os.stat(file_path)
+        key_file_path = self.key_file_path(file_path)
+        if os.path.exists(key_file_path) and os.stat(key_file_path).st_mtime_ns >= file_stat.st_mtime_ns:
+            with open(key_file_path, 'r') as key_file:
+                return f"artifact:{key_file.read()}"
+
+        state = (os.path.abspath(file_path), file_stat.st_size, file_stat.st_mtime_ns)
+        if state not in self.file_digests:
+            file_hash = hashlib.sha256()
+            with open(file_path, 'rb') as file:
+                for block in iter(lambda: file.read(1 << 20), b""):
+                    file_hash.update(block)
+            self.file_digests[state] = f"content:{file_hash.hexdigest()}"
+        return self.file_digests[state]
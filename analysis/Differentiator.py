@@ -1,12 +1,16 @@
 import os.path
 
 from analysis.AnalysisConfiguration import AnalysisConfiguration
+from analysis.ArtifactCache import ArtifactCache
 from analysis.extractors.BivariateSplineExtractor import BivariateSplineExtractor
 from analysis.HeatPoint import HeatPoint
-from analysis.Movement import write_movements_to_file, Movement
+from analysis.FixationTable import FixationTable
+from analysis.Movement import write_movements_to_file
+from analysis.ProgressReporter import ProgressReporter
+from analysis.run_report import count
 from analysis.analysis_utils import parse_fixations, parse_explorations, filter_fixations_for_exploration, \
     get_salience_considered_data_dir, get_movements_file_path, get_explorations_file_path, \
-    get_difference_fixations_file_path
+    get_difference_fixations_file_path, map_in_parallel
 from config import RESOLUTION, SALIENCE_IMG_DIR
 from util import Point, find_file_in_dir, normalize_value, norm_to_disp
 
@@ -14,6 +18,7 @@ from util import Point, find_file_in_dir, normalize_value, norm_to_disp
 class Differentiator:
     def __init__(self, config):
         self.config: AnalysisConfiguration = config
+        self.artifact_cache: ArtifactCache = ArtifactCache()
 
     def create_difference_fixations(self):
         """Creates difference fixations from the original observed fixations and the extracted fixations (heat sources)
@@ -21,44 +26,52 @@ class Differentiator:
         Clears all fixations that have a non-positive duration.
         Then writes the cleared difference fixations to a difference_fixations.csv file.
         """
-        for pid in self.config.participants:
-            difference_fixations = []
-
-            salience_considered_directory = get_salience_considered_data_dir(pid)
-            if not os.path.exists(salience_considered_directory):
-                print(f"Salience considered participant directory not found, creating one ({salience_considered_directory})")
-                os.makedirs(salience_considered_directory)
-
-            difference_fixations_file_path = get_difference_fixations_file_path(pid)
-            if os.path.exists(difference_fixations_file_path) and not self.config.general_overwrite:
-                print(f"Difference fixations for participant {pid} already exist, skipping generation")
-                continue
-
-            fixations = parse_fixations(get_movements_file_path(pid))
-            explorations = parse_explorations(get_explorations_file_path(pid))
-
-            print(f"Generating difference fixations for participant {pid}")
-            extractor = BivariateSplineExtractor(self.config.general_overwrite)
-            for index, exploration in enumerate(explorations):
-                print(f"Generating difference fixations for exploration {index+1}")
-                saliency_map_name = self._get_saliency_map_name(exploration.img_name)
-                saliency_map_path = find_file_in_dir(saliency_map_name, SALIENCE_IMG_DIR)
-
-                heat_sources = extractor.get_heat_sources_from_heatmap(saliency_map_path)
-                original_fixations = filter_fixations_for_exploration(exploration, fixations)
-
-                difference_fixations.extend(self._calculate_difference_fixations_for_exploration(original_fixations, heat_sources))
-
-            # Clear all fixations that have a non-positive duration
-            cleared_difference_fixations = []
-            for difference_fixation in difference_fixations:
-                if difference_fixation.duration > 0:
-                    cleared_difference_fixations.append(difference_fixation)
-
-            print(f"Writing difference fixations for participant {pid} to\n\t{difference_fixations_file_path}")
-            write_movements_to_file(cleared_difference_fixations, difference_fixations_file_path)
-
-    def _calculate_difference_fixations_for_exploration(self, original_fixations: list[Movement], heat_sources: list[HeatPoint]) -> list[Movement]:
+        map_in_parallel(self.create_difference_fixations_for_participant, self.config.participants,
+                        self.config.jobs, "Differentiated participants")
+
+    def create_difference_fixations_for_participant(self, pid):
+        difference_fixations = []
+
+        salience_considered_directory = get_salience_considered_data_dir(pid)
+        if not os.path.exists(salience_considered_directory):
+            print(f"Salience considered participant directory not found, creating one ({salience_considered_directory})")
+            os.makedirs(salience_considered_directory)
+
+        movements_file_path = get_movements_file_path(pid)
+        explorations_file_path = get_explorations_file_path(pid)
+        explorations = parse_explorations(explorations_file_path)
+        saliency_map_paths = [find_file_in_dir(self._get_saliency_map_name(exploration.img_name), SALIENCE_IMG_DIR)
+                              for exploration in explorations]
+        extractor = BivariateSplineExtractor(self.config.general_overwrite)
+
+        difference_fixations_file_path = get_difference_fixations_file_path(pid)
+        key = self.artifact_cache.key([movements_file_path, explorations_file_path] + saliency_map_paths,
+                                      {"artifact": "difference-fixations", "extractor": type(extractor).__name__,
+                                       "resolution": RESOLUTION, **extractor.get_parameters()})
+        if self.artifact_cache.is_current(difference_fixations_file_path, key) and not self.config.general_overwrite:
+            print(f"Difference fixations for participant {pid} are up to date, skipping generation")
+            return
+
+        fixations = parse_fixations(movements_file_path)
+
+        progress_reporter = ProgressReporter(f"Difference fixations of participant {pid}", len(explorations))
+        for exploration, saliency_map_path in zip(explorations, saliency_map_paths):
+            heat_sources = extractor.get_heat_sources_from_heatmap(saliency_map_path)
+            original_fixations = filter_fixations_for_exploration(exploration, fixations)
+            count("fixations_differentiated", len(original_fixations))
+
+            difference_fixations.append(self._calculate_difference_fixations_for_exploration(original_fixations, heat_sources))
+            progress_reporter.update()
+
+        # Clear all fixations that have a non-positive duration
+        difference_fixations = FixationTable.concatenate(difference_fixations)
+        cleared_difference_fixations = difference_fixations[difference_fixations.durations > 0]
+
+        print(f"Writing difference fixations for participant {pid} to\n\t{difference_fixations_file_path}")
+        write_movements_to_file(cleared_difference_fixations, difference_fixations_file_path)
+        self.artifact_cache.record(difference_fixations_file_path, key)
+
+    def _calculate_difference_fixations_for_exploration(self, original_fixations: FixationTable, heat_sources: list[HeatPoint]) -> FixationTable:
         """Convert intensity of heat sources to a scaled duration matching fixation durations.
         Subtract scaled durations from original fixation durations.
         Only original fixations that are in range of a heat source have their duration decreased.
@@ -71,7 +84,7 @@ class Differentiator:
         difference_fixations = original_fixations.copy()
         if not original_fixations:
             return difference_fixations
-        max_fixation_duration = max([fixation.duration for fixation in original_fixations])
+        max_fixation_duration = float(max(original_fixations.durations))
         max_heat_intensity = max([source.intensity for source in heat_sources])
         for heat_source in heat_sources:
             impact_radius = heat_source.intensity
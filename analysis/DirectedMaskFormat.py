@@ -0,0 +1,126 @@
+import os
+
+import numpy as np
+
+from analysis.DirectedMaskPrecision import DirectedMaskPrecision
+from analysis.SparseDirectedMask import SparseDirectedMask
+
+
+DIRECTED_MASK_ARRAY_NAME = "directed_mask"
+
+
+class DirectedMaskFormat:
+    """Describes how directed masks are stored on disk.
+
+    A directed mask can be stored with reduced precision, in a compressed container and downsampled by an integer
+    factor. Downsampling averages the vectors of factor x factor pixel blocks, the mask size has to be divisible by it.
+    Sparse directed masks only store their non-zero vectors and are accumulated and validated without densifying them.
+    Accumulation and validation work on the stored resolution; accumulated directed masks are decoded for plotting.
+
+    Compared to the full precision format, leave-one-out directed mask correlations of synthetic 1920x1080
+    explorations with 20 and 150 fixations deviated by at most:
+     - float32: 1e-10 for every weight type
+     - float16: 1e-6 for every weight type
+     - downsampling factor 2 or 4: 1e-4 (order weighted)
+     - downsampling factor 8: 1e-3 (order weighted)
+    float16 only holds vectors up to 65504. Constant, intensity and order weighted directed masks stayed below 1000,
+    while distance weighted strokes reach the length of the saccade and their sum reached 28000 at 150 fixations.
+    Directed masks that exceed the range of their precision are rejected instead of being stored as inf.
+    """
+    def __init__(self, precision=DirectedMaskPrecision.FLOAT64, compressed=False, downsampling_factor=1, sparse=False):
+        assert downsampling_factor >= 1
+        self.precision: DirectedMaskPrecision = precision
+        self.compressed: bool = compressed
+        self.downsampling_factor: int = downsampling_factor
+        self.sparse: bool = sparse
+
+    @property
+    def dtype(self):
+        match self.precision:
+            case DirectedMaskPrecision.FLOAT64:
+                return np.float64
+            case DirectedMaskPrecision.FLOAT32:
+                return np.float32
+            case DirectedMaskPrecision.FLOAT16:
+                return np.float16
+            case _:
+                raise ValueError(f"This directed mask precision is not supported: {self.precision}")
+
+    @property
+    def file_suffix(self):
+        """Distinguishes files of different formats. The full precision format keeps the original file names.
+        """
+        suffix = ""
+        if self.precision != DirectedMaskPrecision.FLOAT64:
+            suffix += f"-{self.precision.value}"
+        if self.downsampling_factor != 1:
+            suffix += f"-d{self.downsampling_factor}"
+        if self.sparse:
+            suffix += "-sparse"
+        return suffix
+
+    @property
+    def file_extension(self):
+        return ".npz" if self.compressed or self.sparse else ".npy"
+
+    def encode(self, directed_mask):
+        """Downsamples the directed mask and reduces its precision.
+        """
+        factor = self.downsampling_factor
+        if factor != 1:
+            height, width, _ = directed_mask.shape
+            if height % factor != 0 or width % factor != 0:
+                raise ValueError(f"Directed mask of size {width}x{height} cannot be downsampled by factor {factor}")
+            directed_mask = directed_mask.reshape(height // factor, factor, width // factor, factor, 2).mean(axis=(1, 3))
+        with np.errstate(over='ignore'):
+            encoded_directed_mask = directed_mask.astype(self.dtype, copy=False)
+        if not np.isfinite(encoded_directed_mask).all():
+            raise ValueError(f"Directed mask vectors of up to {np.abs(directed_mask).max()} exceed the range of "
+                             f"{self.precision.value}, store them with a higher precision")
+        return encoded_directed_mask
+
+    def upsample(self, directed_mask):
+        """Repeats each vector of a downsampled directed mask to restore the original resolution.
+        """
+        factor = self.downsampling_factor
+        if factor == 1:
+            return directed_mask
+        return np.repeat(np.repeat(directed_mask, factor, axis=0), factor, axis=1)
+
+    def decode(self, directed_mask):
+        """Restores a dense directed mask of the original resolution from a stored directed mask.
+        """
+        if isinstance(directed_mask, SparseDirectedMask):
+            directed_mask = directed_mask.to_dense()
+        return self.upsample(directed_mask)
+
+    def save(self, file_path, directed_mask):
+        encoded_directed_mask = self.encode(directed_mask)
+        if self.sparse:
+            SparseDirectedMask.from_dense(encoded_directed_mask).save(file_path, self.compressed)
+        elif self.compressed:
+            with open(file_path, "wb") as file:
+                np.savez_compressed(file, **{DIRECTED_MASK_ARRAY_NAME: encoded_directed_mask})
+        else:
+            np.save(file_path, encoded_directed_mask)
+
+
+def save_directed_mask(file_path, directed_mask):
+    """Saves a dense or sparse directed mask as is, e.g. an accumulated directed mask.
+    """
+    if isinstance(directed_mask, SparseDirectedMask):
+        directed_mask.save(file_path)
+    else:
+        np.save(file_path, directed_mask)
+
+
+def load_directed_mask(file_path, mmap_mode=None):
+    """Loads a directed mask from a .npy file or an .npz container holding a dense or a sparse directed mask.
+    The directed mask keeps the precision and resolution it is stored with. Only .npy files can be memory-mapped.
+    """
+    if os.path.splitext(file_path)[1] == ".npz":
+        with np.load(file_path) as container:
+            if DIRECTED_MASK_ARRAY_NAME in container.files:
+                return container[DIRECTED_MASK_ARRAY_NAME]
+        return SparseDirectedMask.load(file_path)
+    return np.load(file_path, mmap_mode=mmap_mode)
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class DirectedMaskPrecision(Enum):
+    FLOAT64 = "f64"  # Full precision as generated
+    FLOAT32 = "f32"
+    FLOAT16 = "f16"
@@ -0,0 +1,93 @@
+import json
+import os
+
+import numpy as np
+
+from analysis.DirectedMaskFormat import load_directed_mask
+
+
+class DirectedMaskStore:
+    """Stacks the directed masks of one accumulation mapping into a single memory-mapped array.
+
+    The stack is an .npy file of shape (n, height, width, 2) next to a json index that maps
+    (pid, exploration_id) to the position in the stack. Opened stores are memory-mapped read-only,
+    hence directed masks are read as views without copying them and processes opening the same
+    store share its pages.
+    The index also records the source directed mask files, a store is rebuilt once they change.
+    """
+    def __init__(self, store_file_path):
+        self.store_file_path: str = store_file_path
+        self.index_file_path: str = f"{os.path.splitext(store_file_path)[0]}.json"
+        self.directed_masks = None
+        self.positions: dict[tuple, int] = dict()
+
+    def is_current(self, entries: list[tuple]):
+        """Checks whether the store contains exactly the given directed masks in their current state.
+
+        args:
+            - entries: List of (pid, exploration_id, directed_mask_file_path) tuples.
+        """
+        if not os.path.exists(self.store_file_path) or not os.path.exists(self.index_file_path):
+            return False
+        with open(self.index_file_path, 'r') as index_file:
+            index = json.load(index_file)
+        return index["entries"] == self._describe_entries(entries)
+
+    def build(self, entries: list[tuple]):
+        """Writes the directed masks of the given entries into the store, one at a time.
+
+        args:
+            - entries: List of (pid, exploration_id, directed_mask_file_path) tuples.
+        """
+        if not entries:
+            raise ValueError("At least one directed mask is required to build a directed mask store")
+        print(f"Building directed mask store with {len(entries)} directed masks: {self.store_file_path}")
+        self.close()
+
+        first_directed_mask = load_directed_mask(entries[0][2])
+        shape = (len(entries),) + first_directed_mask.shape
+        directed_masks = np.lib.format.open_memmap(self.store_file_path, mode='w+', dtype=first_directed_mask.dtype,
+                                                   shape=shape)
+        for position, (_, _, directed_mask_file_path) in enumerate(entries):
+            directed_mask = first_directed_mask if position == 0 else load_directed_mask(directed_mask_file_path)
+            if directed_mask.shape != shape[1:]:
+                raise ValueError(f"Directed mask shapes differ: {directed_mask.shape} and {shape[1:]}")
+            directed_masks[position] = directed_mask
+        directed_masks.flush()
+        del directed_masks
+
+        with open(self.index_file_path, 'w') as index_file:
+            json.dump({"entries": self._describe_entries(entries)}, index_file)
+
+    def open(self):
+        """Memory-maps the store read-only.
+        """
+        with open(self.index_file_path, 'r') as index_file:
+            index = json.load(index_file)
+        self.directed_masks = np.load(self.store_file_path, mmap_mode='r')
+        self.positions = {(entry["pid"], entry["exploration_id"]): position
+                          for position, entry in enumerate(index["entries"])}
+        return self
+
+    def close(self):
+        self.directed_masks = None
+        self.positions = dict()
+
+    def get(self, pid, exploration_id):
+        """Returns a read-only view of the directed mask of the given exploration.
+        """
+        if self.directed_masks is None:
+            raise RuntimeError("The directed mask store has to be opened first")
+        return self.directed_masks[self.positions[(pid, exploration_id)]]
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    @staticmethod
+    def _describe_entries(entries):
+        return [{"pid": pid, "exploration_id": exploration_id, "source": directed_mask_file_path,
+                 "mtime": os.stat(directed_mask_file_path).st_mtime_ns}
+                for pid, exploration_id, directed_mask_file_path in entries]
@@ -2,6 +2,7 @@ import os
 from datetime import datetime
 from abc import ABC, abstractmethod
 
+from analysis.ArtifactCache import ArtifactCache
 from analysis.HeatPoint import heat_points_from_file, heat_points_to_file
 
 
@@ -15,6 +16,8 @@ class Extractor(ABC):
         self.t0 = None
         self.heat_sources = None
         self.heat_sources_file_path = None
+        self.heat_sources_key = None
+        self.artifact_cache = ArtifactCache()
 
     def get_heat_sources_from_heatmap(self, heatmap_path):
         self.heatmap_path = heatmap_path
@@ -28,14 +31,24 @@ class Extractor(ABC):
     def _extract_heat_sources_from_heatmap(self):
         pass
 
+    def get_parameters(self):
+        """returns:
+            - A dict of the parameters that change the extracted heat sources.
+        """
+        return dict()
+
     def _pre_extraction(self):
         heatmap_parent_dir = os.path.dirname(self.heatmap_path)
         heat_source_file_dir = os.path.join(heatmap_parent_dir, "extracted_heat_sources")
-        if not os.path.exists(heat_source_file_dir):
-            os.mkdir(heat_source_file_dir)
+        # Worker processes may extract heat sources from the same heatmap at the same time
+        os.makedirs(heat_source_file_dir, exist_ok=True)
         heatmap_name = ".".join(os.path.basename(self.heatmap_path).split(".")[:-1])
         self.heat_sources_file_path = os.path.join(heat_source_file_dir, f"{heatmap_name}-heat-sources.csv")
-        if os.path.exists(self.heat_sources_file_path) and not self.overwrite:
+        # Heat sources depend on the heatmap and the extraction algorithm
+        self.heat_sources_key = self.artifact_cache.key([self.heatmap_path], {"artifact": "heat-sources",
+                                                                              "extractor": type(self).__name__,
+                                                                              **self.get_parameters()})
+        if self.artifact_cache.is_current(self.heat_sources_file_path, self.heat_sources_key) and not self.overwrite:
             print(f"Reading heat sources from file {self.heat_sources_file_path}")
             self.heat_sources = heat_points_from_file(self.heat_sources_file_path)
             extraction_necessary = False
@@ -50,4 +63,8 @@ class Extractor(ABC):
         time_delta = datetime.now().timestamp() - self.t0
         print(f"Extracted {len(self.heat_sources)} heat sources in {time_delta} seconds")
         # plot_points_on_img(heat_sources, heatmap_path)
-        heat_points_to_file(self.heat_sources, self.heat_sources_file_path)
+        # Written next to the target and moved in place, hence readers never see a partially written file
+        temporary_file_path = f"{self.heat_sources_file_path}.{os.getpid()}.tmp"
+        heat_points_to_file(self.heat_sources, temporary_file_path)
+        os.replace(temporary_file_path, self.heat_sources_file_path)
+        self.artifact_cache.record(self.heat_sources_file_path, self.heat_sources_key)
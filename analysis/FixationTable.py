@@ -0,0 +1,120 @@
+import numpy as np
+
+from analysis.Movement import Movement, MovementType
+
+# Movement attributes of fixations, in the column order of the movements file without the movement type
+FIXATION_ATTRIBUTES = ["timestamp_us", "duration", "average_gaze_point2d_x", "average_gaze_point2d_y",
+                       "average_gaze_point3d_x", "average_gaze_point3d_y", "average_gaze_point3d_z",
+                       "average_eye_position3d_x", "average_eye_position3d_y", "average_eye_position3d_z",
+                       "average_pupil_diameter"]
+FIXATION_DTYPE = np.dtype([(attribute, np.int64 if attribute == "timestamp_us" else np.float64)
+                           for attribute in FIXATION_ATTRIBUTES])
+
+
+class FixationTable:
+    """Fixations stored column-wise in a NumPy structured array.
+
+    The table behaves like the list of fixation movements it replaces: iterating or indexing it with an integer
+    yields FixationRow views, while slices and boolean masks yield tables of the selected fixations.
+    """
+    def __init__(self, fixations=None):
+        self.fixations: np.ndarray = np.empty(0, dtype=FIXATION_DTYPE) if fixations is None else fixations
+        self._is_sorted: bool | None = None
+
+    @staticmethod
+    def from_csv(movements_file_path):
+        """Reads all fixations of a movements file at once. Other movement types are dropped.
+        """
+        fixation_marker = f",{MovementType.FIXATION.value},"
+        with open(movements_file_path, 'r') as movements_file:
+            header_line = movements_file.readline()  # Read off header line
+            fixation_lines = [line.rstrip("\n") for line in movements_file if fixation_marker in line]
+        fixations = np.empty(len(fixation_lines), dtype=FIXATION_DTYPE)
+        if not fixation_lines:
+            return FixationTable(fixations)
+
+        # Dropping the movement type leaves the fixation attributes in the order of FIXATION_ATTRIBUTES
+        fields = ",".join(fixation_lines).replace(fixation_marker, ",").split(",")
+        fields = np.array(fields, dtype=object).reshape(len(fixation_lines), len(FIXATION_ATTRIBUTES))
+        for column, attribute in enumerate(FIXATION_ATTRIBUTES):
+            fixations[attribute] = fields[:, column].astype(FIXATION_DTYPE[attribute])
+        return FixationTable(fixations)
+
+    @staticmethod
+    def concatenate(fixation_tables):
+        if not fixation_tables:
+            return FixationTable()
+        return FixationTable(np.concatenate([fixation_table.fixations for fixation_table in fixation_tables]))
+
+    @property
+    def timestamps_us(self):
+        return self.fixations["timestamp_us"]
+
+    @property
+    def durations(self):
+        return self.fixations["duration"]
+
+    @property
+    def gaze_points2d(self):
+        """returns:
+            - An array of shape (n, 2) of the normalized average gaze points (x, y).
+        """
+        return np.stack([self.fixations["average_gaze_point2d_x"], self.fixations["average_gaze_point2d_y"]], axis=1)
+
+    def between(self, start_us, end_us):
+        """Selects the fixations that occur strictly after start_us and strictly before end_us.
+        Movements files are written in chronological order, hence the time range is found by binary search
+        on the timestamps. Tables that are not sorted by time fall back to a scan.
+        """
+        timestamps_us = self.timestamps_us
+        if self._is_sorted is None:
+            self._is_sorted = bool(np.all(timestamps_us[1:] >= timestamps_us[:-1]))
+        if not self._is_sorted:
+            return self[(start_us < timestamps_us) & (timestamps_us < end_us)]
+        start_index = np.searchsorted(timestamps_us, start_us, side='right')
+        end_index = max(np.searchsorted(timestamps_us, end_us, side='left'), start_index)
+        return self[start_index:end_index]
+
+    def copy(self):
+        return FixationTable(self.fixations.copy())
+
+    def __len__(self):
+        return len(self.fixations)
+
+    def __iter__(self):
+        for index in range(len(self.fixations)):
+            yield FixationRow(self, index)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return FixationRow(self, range(len(self.fixations))[key])
+        return FixationTable(self.fixations[key])
+
+
+class FixationRow(Movement):
+    """Lazy view of one fixation of a FixationTable.
+    Reading an attribute reads the table, setting an attribute writes into the table.
+    """
+    def __init__(self, fixation_table, index):
+        self.fixation_table: FixationTable = fixation_table
+        self.index: int = index
+
+    @property
+    def movement_type(self):
+        return MovementType.FIXATION
+
+
+def _fixation_attribute(attribute):
+    as_python_type = int if attribute == "timestamp_us" else float
+
+    def get(fixation_row):
+        return as_python_type(fixation_row.fixation_table.fixations[attribute][fixation_row.index])
+
+    def set(fixation_row, value):
+        fixation_row.fixation_table.fixations[attribute][fixation_row.index] = value
+
+    return property(get, set)
+
+
+for _attribute in FIXATION_ATTRIBUTES:
+    setattr(FixationRow, _attribute, _fixation_attribute(_attribute))
@@ -0,0 +1,101 @@
+import itertools
+import json
+import os
+
+import numpy as np
+
+from analysis.fixation_filter.tobiidata_to_uxidata import split_tobii_lines, tobii_field_columns, \
+    tobii_variable_size, _tobii_tsv_header
+
+GAZE_SAMPLE_SCHEMA_VERSION = 1
+
+
+def _gaze_sample_dtype():
+    fields = []
+    for name in _tobii_tsv_header().split("\t"):
+        if name.endswith("_time_stamp"):
+            fields.append((name, np.int64))
+        elif name.endswith("_validity"):
+            fields.append((name, np.uint8))
+        elif tobii_variable_size(name) == 1:
+            fields.append((name, np.float64))
+        else:
+            fields.append((name, np.float64, (tobii_variable_size(name),)))
+    return np.dtype(fields)
+
+
+# One record per gaze sample with the Tobii variables as fields, tuples become sub-arrays
+GAZE_SAMPLE_DTYPE = _gaze_sample_dtype()
+
+
+class GazeSampleStore:
+    """Stores the raw gaze samples of a participant as a typed structured array in an .npy file.
+
+    A json file next to it records the schema version and the Tobii data file it was imported from.
+    Opened stores are memory-mapped read-only, hence all stages read the gaze samples without parsing
+    and without copying them. Floats are stored with full precision, hence the Tobii data file can be restored.
+    """
+    def __init__(self, store_file_path):
+        self.store_file_path: str = store_file_path
+        self.schema_file_path: str = f"{os.path.splitext(store_file_path)[0]}.json"
+
+    def exists(self):
+        return os.path.exists(self.store_file_path) and os.path.exists(self.schema_file_path)
+
+    def is_current(self, tobii_data_file_path):
+        """Checks whether the store has the current schema and was imported from the Tobii data file in its current state.
+        """
+        if not self.exists():
+            return False
+        schema = self._load_schema()
+        source_stat = os.stat(tobii_data_file_path)
+        return (schema.get("schema_version") == GAZE_SAMPLE_SCHEMA_VERSION
+                and schema.get("source_size") == source_stat.st_size
+                and schema.get("source_mtime") == source_stat.st_mtime_ns)
+
+    def import_tobii_data(self, tobii_data_file_path, chunk_size=50000):
+        """Parses the Tobii data file in chunks and writes all gaze samples to the store.
+        """
+        chunks = []
+        with open(tobii_data_file_path, 'r') as tobii_data_file:
+            tobii_data_file.readline()  # Read off the header line
+            while True:
+                lines = list(itertools.islice(tobii_data_file, chunk_size))
+                if not lines:
+                    break
+                chunks.append(self._fields_to_gaze_samples(split_tobii_lines(lines)))
+        gaze_samples = np.concatenate(chunks) if chunks else np.empty(0, dtype=GAZE_SAMPLE_DTYPE)
+        np.save(self.store_file_path, gaze_samples)
+
+        source_stat = os.stat(tobii_data_file_path)
+        with open(self.schema_file_path, 'w') as schema_file:
+            json.dump({"schema_version": GAZE_SAMPLE_SCHEMA_VERSION, "rows": len(gaze_samples),
+                       "source": tobii_data_file_path, "source_size": source_stat.st_size,
+                       "source_mtime": source_stat.st_mtime_ns}, schema_file)
+        print(f"Imported {len(gaze_samples)} gaze samples ({os.path.getsize(self.store_file_path)} bytes, "
+              f"Tobii data file {source_stat.st_size} bytes)")
+        return gaze_samples
+
+    def open(self):
+        """Memory-maps the gaze samples read-only.
+        """
+        schema_version = self._load_schema().get("schema_version")
+        if schema_version != GAZE_SAMPLE_SCHEMA_VERSION:
+            raise ValueError(f"Gaze sample store has schema version {schema_version}, "
+                             f"expected {GAZE_SAMPLE_SCHEMA_VERSION}: {self.store_file_path}")
+        return np.load(self.store_file_path, mmap_mode='r')
+
+    def _load_schema(self):
+        with open(self.schema_file_path, 'r') as schema_file:
+            return json.load(schema_file)
+
+    @staticmethod
+    def _fields_to_gaze_samples(fields):
+        gaze_samples = np.empty(len(fields), dtype=GAZE_SAMPLE_DTYPE)
+        for name, column in tobii_field_columns().items():
+            size = tobii_variable_size(name)
+            values = fields[:, column:column + size]
+            if size == 1:
+                values = values[:, 0]
+            gaze_samples[name] = values.astype(GAZE_SAMPLE_DTYPE[name].base)
+        return gaze_samples
@@ -0,0 +1,67 @@
+import cv2
+import numpy as np
+
+# How many neighbours need to be hot for a point to be a heat source (0.5 == 50%)
+VALIDITY_THRESHOLD = 0.6
+# Neighbours are all points within this manhattan distance of a point, excluding the point itself
+NEIGHBOUR_RANGE = 2
+
+
+def _create_neighbour_kernel(manhattan_distance):
+    offsets = np.arange(-manhattan_distance, manhattan_distance + 1)
+    kernel = (np.abs(offsets[:, np.newaxis]) + np.abs(offsets[np.newaxis, :]) <= manhattan_distance).astype(np.float32)
+    kernel[manhattan_distance, manhattan_distance] = 0
+    return kernel
+
+
+def _count_neighbours(points, kernel):
+    """Counts the points around each point of a boolean array, points outside the array are not counted.
+    """
+    return cv2.filter2D(points.view(np.uint8), cv2.CV_16S, kernel, borderType=cv2.BORDER_CONSTANT)
+
+
+class HotNeighbourCountMap:
+    """Counts the hot (non-black) neighbours of every point of a heatmap.
+
+    The counts are computed once by filtering the hot points with the neighbour kernel and are updated locally when
+    points of the heatmap are eliminated, hence checking whether a point is a valid heat source is a lookup
+    instead of visiting its neighbours.
+    Neighbours outside the heatmap are neither hot nor counted as neighbours on the display area.
+    """
+    def __init__(self, heatmap):
+        self.kernel = _create_neighbour_kernel(NEIGHBOUR_RANGE)
+        self.hot_points = heatmap > 0
+        self.hot_neighbour_counts = _count_neighbours(self.hot_points, self.kernel)
+        neighbours_on_display_area = _count_neighbours(np.ones(heatmap.shape, dtype=bool), self.kernel)
+        self.required_hot_neighbour_counts = (neighbours_on_display_area * VALIDITY_THRESHOLD).astype(np.int16)
+
+    def is_valid_heat_source(self, x, y):
+        """A heat source is valid if it spreads heat, i.e. if enough of its neighbours on the display area are hot.
+        """
+        return self.hot_neighbour_counts[y, x] >= self.required_hot_neighbour_counts[y, x]
+
+    def update(self, heatmap, xs, ys):
+        """Updates the counts after points of the heatmap have been eliminated.
+
+        args:
+            - heatmap: The heatmap after the elimination.
+            - xs, ys: The coordinates of the eliminated points. Only their bounding box is used.
+        """
+        if len(xs) == 0:
+            return
+        height, width = heatmap.shape
+        # Bounding box of the eliminated points and the box of the points whose neighbours were eliminated
+        x_start, x_end = min(xs), max(xs) + 1
+        y_start, y_end = min(ys), max(ys) + 1
+        outer_x_start, outer_x_end = max(x_start - NEIGHBOUR_RANGE, 0), min(x_end + NEIGHBOUR_RANGE, width)
+        outer_y_start, outer_y_end = max(y_start - NEIGHBOUR_RANGE, 0), min(y_end + NEIGHBOUR_RANGE, height)
+
+        hot_points = self.hot_points[y_start:y_end, x_start:x_end]
+        still_hot_points = heatmap[y_start:y_end, x_start:x_end] > 0
+        cooled_points = np.zeros((outer_y_end - outer_y_start, outer_x_end - outer_x_start), dtype=bool)
+        inner_cooled_points = cooled_points[y_start - outer_y_start:y_end - outer_y_start,
+                                            x_start - outer_x_start:x_end - outer_x_start]
+        np.greater(hot_points, still_hot_points, out=inner_cooled_points)
+        hot_points &= still_hot_points
+        self.hot_neighbour_counts[outer_y_start:outer_y_end, outer_x_start:outer_x_end] -= _count_neighbours(
+            cooled_points, self.kernel)
@@ -0,0 +1,73 @@
+import os
+import struct
+from collections import OrderedDict
+
+import cv2
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class ImageCache:
+    """Caches the stimulus images of a run.
+
+    Image sizes are read from the IHDR header of PNG files without decoding the image.
+    Decoded images are kept in a bounded LRU, hence an image that is plotted several times is decoded once.
+    Cached images are returned as copies because plots draw on the image they receive.
+    Entries are keyed by the path and the mtime of the file, hence changed files are read again.
+    """
+    def __init__(self, max_images=16):
+        self.max_images: int = max_images
+        self.images: OrderedDict[tuple, object] = OrderedDict()
+        self.sizes: dict[tuple, tuple] = dict()
+        self.decoded_count: int = 0
+
+    def get_size(self, img_path):
+        """returns:
+            - A tuple of (width, height) of the image.
+        """
+        key = self._key(img_path)
+        if key not in self.sizes:
+            size = self._read_png_size(img_path)
+            if size is None:
+                image = self.read(img_path)
+                size = (image.shape[1], image.shape[0])
+            self.sizes[key] = size
+        return self.sizes[key]
+
+    def read(self, img_path):
+        """Reads the image like cv2.imread(img_path) does.
+        """
+        key = self._key(img_path)
+        if key in self.images:
+            self.images.move_to_end(key)
+        else:
+            image = cv2.imread(img_path)
+            if image is None:
+                raise FileNotFoundError(f"Image could not be read ({img_path})")
+            self.decoded_count += 1
+            self.images[key] = image
+            self.sizes[key] = (image.shape[1], image.shape[0])
+            if len(self.images) > self.max_images:
+                self.images.popitem(last=False)
+        return self.images[key].copy()
+
+    def clear(self):
+        self.images.clear()
+        self.sizes.clear()
+
+    @staticmethod
+    def _key(img_path):
+        return os.path.abspath(img_path), os.stat(img_path).st_mtime_ns
+
+    @staticmethod
+    def _read_png_size(img_path):
+        """Reads width and height from the IHDR chunk, which directly follows the PNG signature.
+
+        returns:
+            - A tuple of (width, height), or None if the file is not a PNG file.
+        """
+        with open(img_path, 'rb') as img_file:
+            header = img_file.read(24)
+        if len(header) < 24 or header[:8] != PNG_SIGNATURE or header[12:16] != b"IHDR":
+            return None
+        return struct.unpack(">II", header[16:24])
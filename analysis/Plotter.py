@@ -9,9 +9,15 @@ import pandas as pd
 import seaborn as sns
 
 from analysis.AnalysisConfiguration import AnalysisConfiguration
+from analysis.ArtifactCache import ArtifactCache
+from analysis.GaussianHeatmapRenderer import GaussianHeatmapRenderer
+from analysis.ImageCache import ImageCache
+from analysis.ProgressReporter import ProgressReporter
+from analysis.run_report import count
 from analysis.analysis_utils import parse_fixations, parse_explorations, filter_fixations_for_exploration, \
     get_movements_file_path, get_explorations_file_path, get_difference_fixations_file_path, find_close_dividers, \
-    get_participant_analysis_plot_dir, get_salience_considered_plot_dir, get_validation_analysis_file_path
+    get_participant_analysis_plot_dir, get_salience_considered_plot_dir, get_validation_analysis_file_path, \
+    map_in_parallel
 from config import RESOLUTION, ANALYSIS_PLOT_DIR, ORIGINAL_IMG_DIR, ACCUMULATED_PLOT_DIR, ACCUMULATED_SALIENCE_PLOT_DIR
 from util import find_file_in_dir, normalize_value, norm_to_disp
 
@@ -19,6 +25,10 @@ from util import find_file_in_dir, normalize_value, norm_to_disp
 class Plotter:
     def __init__(self, config):
         self.config: AnalysisConfiguration = config
+        self.heatmap_renderer: GaussianHeatmapRenderer = GaussianHeatmapRenderer()
+        # Shared with the Accumulator, which only needs the image sizes
+        self.image_cache: ImageCache = ImageCache()
+        self.artifact_cache: ArtifactCache = ArtifactCache()
 
     def plot_analysis_images(self):
         if self.config.saliency:
@@ -27,51 +37,48 @@ class Plotter:
             self.plot_salience_unconsidered_analysis_images()
 
     def plot_salience_considered_analysis_images(self):
-        for pid in self.config.participants:
-
-            participant_plot_dir = get_participant_analysis_plot_dir(pid)
-            if not os.path.exists(participant_plot_dir):
-                print(f"Creating analysis plot directory for participant {pid}")
-                os.mkdir(participant_plot_dir)
-
-            participant_salience_considered_plot_dir = get_salience_considered_plot_dir(pid)
-            if not os.path.exists(participant_salience_considered_plot_dir):
-                print(f"Creating salience considered plot directory for participant {pid}")
-                os.mkdir(participant_salience_considered_plot_dir)
-
-            difference_fixations_file_path = get_difference_fixations_file_path(pid)
-            difference_fixations = parse_fixations(difference_fixations_file_path)
-            explorations = parse_explorations(get_explorations_file_path(pid))
-
-            print(f"Generating salience considered plots for participant {pid}")
-            for index, exploration in enumerate(explorations):
-                print(f"Generating salience considered plots for exploration {index+1}")
-                original_img_path = find_file_in_dir(exploration.img_name, ORIGINAL_IMG_DIR)
-                self._plot_fixations(
-                    participant_salience_considered_plot_dir, original_img_path, exploration, difference_fixations, index)
-                self._plot_scanpaths(
-                    participant_salience_considered_plot_dir, original_img_path, exploration, difference_fixations, index)
-                self._plot_heatmaps(
-                    participant_salience_considered_plot_dir, original_img_path, exploration, difference_fixations, index)
+        map_in_parallel(self.plot_salience_considered_analysis_images_for_participant, self.config.participants,
+                        self.config.jobs, "Plotted participants")
+
+    def plot_salience_considered_analysis_images_for_participant(self, pid):
+        participant_plot_dir = get_participant_analysis_plot_dir(pid)
+        if not os.path.exists(participant_plot_dir):
+            print(f"Creating analysis plot directory for participant {pid}")
+            os.mkdir(participant_plot_dir)
+
+        participant_salience_considered_plot_dir = get_salience_considered_plot_dir(pid)
+        if not os.path.exists(participant_salience_considered_plot_dir):
+            print(f"Creating salience considered plot directory for participant {pid}")
+            os.mkdir(participant_salience_considered_plot_dir)
+
+        difference_fixations_file_path = get_difference_fixations_file_path(pid)
+        difference_fixations = parse_fixations(difference_fixations_file_path)
+        explorations = parse_explorations(get_explorations_file_path(pid))
+
+        progress_reporter = ProgressReporter(f"Salience considered plots of participant {pid}", len(explorations))
+        for index, exploration in enumerate(explorations):
+            original_img_path = find_file_in_dir(exploration.img_name, ORIGINAL_IMG_DIR)
+            self._plot_exploration(
+                participant_salience_considered_plot_dir, original_img_path, exploration, difference_fixations, index)
+            progress_reporter.update()
 
     def plot_salience_unconsidered_analysis_images(self):
-        for pid in self.config.participants:
-
-            participant_plot_dir = os.path.join(ANALYSIS_PLOT_DIR, str(pid))
-            if not os.path.exists(participant_plot_dir):
-                print(f"Creating plot directory for participant {pid}")
-                os.makedirs(participant_plot_dir)
-            fixations = parse_fixations(get_movements_file_path(pid))
-            explorations = parse_explorations(get_explorations_file_path(pid))
-
-            print(f"Generating plots for participant {pid}")
-            for index, exploration in enumerate(explorations):
-                print(f"Generating plots for exploration {index+1}")
-                original_img_path = find_file_in_dir(exploration.img_name, ORIGINAL_IMG_DIR)
-
-                self._plot_fixations(participant_plot_dir, original_img_path, exploration, fixations, index)
-                self._plot_scanpaths(participant_plot_dir, original_img_path, exploration, fixations, index)
-                self._plot_heatmaps(participant_plot_dir, original_img_path, exploration, fixations, index)
+        map_in_parallel(self.plot_salience_unconsidered_analysis_images_for_participant, self.config.participants,
+                        self.config.jobs, "Plotted participants")
+
+    def plot_salience_unconsidered_analysis_images_for_participant(self, pid):
+        participant_plot_dir = os.path.join(ANALYSIS_PLOT_DIR, str(pid))
+        if not os.path.exists(participant_plot_dir):
+            print(f"Creating plot directory for participant {pid}")
+            os.makedirs(participant_plot_dir)
+        fixations = parse_fixations(get_movements_file_path(pid))
+        explorations = parse_explorations(get_explorations_file_path(pid))
+
+        progress_reporter = ProgressReporter(f"Plots of participant {pid}", len(explorations))
+        for index, exploration in enumerate(explorations):
+            original_img_path = find_file_in_dir(exploration.img_name, ORIGINAL_IMG_DIR)
+            self._plot_exploration(participant_plot_dir, original_img_path, exploration, fixations, index)
+            progress_reporter.update()
 
     def plot_directed_heatmaps(self, relatable_fixations_map, directed_masks):
         """Plots a directed heatmap.
@@ -104,7 +111,7 @@ class Plotter:
 
             print(f"Plotting directed heatmap: {directed_heatmap_path}")
 
-            directed_mask = directed_masks[index]
+            directed_mask = self.config.directed_mask_format.decode(directed_masks[index])
 
             heatmap = cv2.imread(accumulated_heatmap_path)
             height, width, _ = heatmap.shape
@@ -156,17 +163,27 @@ class Plotter:
 
             cv2.imwrite(directed_heatmap_path, directed_heatmap)
 
-    def _plot_fixations(self, participant_plot_dir, original_img_path, exploration, fixations, index):
+    def _plot_exploration(self, participant_plot_dir, original_img_path, exploration, fixations, index):
+        """Plots the fixations, the scanpath and the heatmaps of an exploration.
+        The fixations of the exploration are filtered once and shared by all plots.
+        """
+        filtered_fixations = filter_fixations_for_exploration(exploration, fixations)
+        self._plot_fixations(participant_plot_dir, original_img_path, filtered_fixations, index)
+        self._plot_scanpaths(participant_plot_dir, original_img_path, filtered_fixations, index)
+        self._plot_heatmaps(participant_plot_dir, original_img_path, filtered_fixations, index)
+        count("explorations_plotted")
+        count("fixations_plotted", len(filtered_fixations))
+
+    def _plot_fixations(self, participant_plot_dir, original_img_path, filtered_fixations, index):
         fixation_img_path = os.path.join(participant_plot_dir, f"{index}-fixations.png")
         if os.path.exists(fixation_img_path) and not self.config.general_overwrite:
             return
 
         # Load the original image
-        original_img = cv2.imread(original_img_path)
+        original_img = self.image_cache.read(original_img_path)
         width = original_img.shape[1]
         height = original_img.shape[0]
 
-        filtered_fixations = filter_fixations_for_exploration(exploration, fixations)
         if filtered_fixations:
             min_fixation_duration, max_fixation_duration = self._get_min_max_fixation_duration(filtered_fixations)
 
@@ -202,18 +219,16 @@ class Plotter:
         # Save the image with fixations
         cv2.imwrite(fixation_img_path, original_img)
 
-    def _plot_scanpaths(self, participant_plot_dir, original_img_path, exploration, fixations, index):
+    def _plot_scanpaths(self, participant_plot_dir, original_img_path, filtered_fixations, index):
         scanpath_img_path = os.path.join(participant_plot_dir, f"{index}-scanpath.png")
         if os.path.exists(scanpath_img_path) and not self.config.general_overwrite:
             return
 
         # Load the original image
-        original_img = cv2.imread(original_img_path)
+        original_img = self.image_cache.read(original_img_path)
         width = original_img.shape[1]
         height = original_img.shape[0]
 
-        filtered_fixations = filter_fixations_for_exploration(exploration, fixations)
-
         for fixation_index, fixation in enumerate(filtered_fixations):
             # Extract fixation coordinates and duration
             x, y = norm_to_disp((fixation.average_gaze_point2d_x, fixation.average_gaze_point2d_y), (width, height))
@@ -256,34 +271,32 @@ class Plotter:
         # Save the image with the scanpath
         cv2.imwrite(scanpath_img_path, original_img)
 
-    def _plot_heatmaps(self, participant_plot_dir, original_img_path, exploration, fixations, index):
-        # Load the original image
-        original_img = cv2.imread(original_img_path)
-
-        self._plot_heatmap(participant_plot_dir, original_img, exploration, fixations, index, on_orig_img=False)
-        self._plot_heatmap(participant_plot_dir, original_img, exploration, fixations, index, on_orig_img=True)
+    def _plot_heatmaps(self, participant_plot_dir, original_img_path, filtered_fixations, index):
+        self._plot_heatmap(participant_plot_dir, original_img_path, filtered_fixations, index, on_orig_img=False)
+        self._plot_heatmap(participant_plot_dir, original_img_path, filtered_fixations, index, on_orig_img=True)
 
-    def _plot_heatmap(self, participant_plot_dir, original_img, exploration, fixations, index, on_orig_img=True):
+    def _plot_heatmap(self, participant_plot_dir, original_img_path, filtered_fixations, index, on_orig_img=True):
         if on_orig_img:
-            self._plot_heatmap_with_orig_img(participant_plot_dir, original_img, index)
+            self._plot_heatmap_with_orig_img(participant_plot_dir, original_img_path, index)
         else:
-            self._plot_heatmap_without_orig_img(participant_plot_dir, exploration, fixations, index)
+            self._plot_heatmap_without_orig_img(participant_plot_dir, filtered_fixations, index)
 
-    def _plot_heatmap_without_orig_img(self, participant_plot_dir, exploration, fixations, index, plot_size=RESOLUTION):
+    def _plot_heatmap_without_orig_img(self, participant_plot_dir, filtered_fixations, index, plot_size=RESOLUTION):
         heatmap_img_path = os.path.join(participant_plot_dir, f"{index}-heatmap-raw.png")
-        filtered_fixations = filter_fixations_for_exploration(exploration, fixations)
         x_y_intensity_list = [(filtered_fixation.average_gaze_point2d_x, filtered_fixation.average_gaze_point2d_y, filtered_fixation.duration) for filtered_fixation in filtered_fixations]
-        heatmap = self._create_general_heatmap(plot_size, x_y_intensity_list)
-        self._plot_general_heatmap(heatmap_img_path, heatmap)
+        self._plot_general_heatmap(heatmap_img_path, plot_size, x_y_intensity_list)
 
-    def _plot_heatmap_with_orig_img(self, participant_plot_dir, original_img, index):
+    def _plot_heatmap_with_orig_img(self, participant_plot_dir, original_img_path, index):
         heatmap_img_path = os.path.join(participant_plot_dir, f"{index}-heatmap.png")
-        if os.path.exists(heatmap_img_path) and not self.config.general_overwrite:
-            return
-
         raw_heatmap_img_path = os.path.join(participant_plot_dir, f"{index}-heatmap-raw.png")
         if not os.path.exists(raw_heatmap_img_path):
             raise FileNotFoundError("To plot the heatmap on top of the original image, the raw heatmap has to exist.")
+        key = self.artifact_cache.key([raw_heatmap_img_path, original_img_path], {"artifact": "heatmap-on-image"})
+        if self.artifact_cache.is_current(heatmap_img_path, key) and not self.config.general_overwrite:
+            return
+
+        # Load the original image
+        original_img = self.image_cache.read(original_img_path)
 
         # Load the grayscale heatmap image and the original image
         heat_img = cv2.imread(raw_heatmap_img_path, cv2.IMREAD_GRAYSCALE)
@@ -302,6 +315,7 @@ class Plotter:
 
         # Save the result to the output image
         cv2.imwrite(heatmap_img_path, heatmap_with_alpha)
+        self.artifact_cache.record(heatmap_img_path, key)
 
     def _get_min_max_fixation_duration(self, fixations):
         assert fixations, f"Fixations must not be empty"
@@ -313,23 +327,37 @@ class Plotter:
         heatmap = self._create_general_heatmap(plot_size, x_y_intensity_list)
         return heatmap
 
+    def create_unnormalized_heatmap_from_heat_points(self, heat_points, plot_size=RESOLUTION):
+        """Creates a blurred heatmap that is not normalized yet.
+        The blur is linear, hence unnormalized heatmaps can be added up and subtracted before normalizing them.
+        """
+        x_y_intensity_list = [(heat_point.x, heat_point.y, heat_point.intensity) for heat_point in heat_points]
+        return self._create_unnormalized_general_heatmap(plot_size, x_y_intensity_list)
+
     def plot_accumulated_heatmap_from_heat_points(self, plot_path, heat_points, plot_size=RESOLUTION):
-        heatmap = self.create_heatmap_from_heat_points(heat_points, plot_size)
-        self._plot_general_heatmap(plot_path, heatmap, accumulation=True)
+        x_y_intensity_list = [(heat_point.x, heat_point.y, heat_point.intensity) for heat_point in heat_points]
+        self._plot_general_heatmap(plot_path, plot_size, x_y_intensity_list, accumulation=True)
 
-    def _plot_general_heatmap(self, plot_path, heatmap, accumulation=False):
+    def _plot_general_heatmap(self, plot_path, plot_size, x_y_intensity_list, accumulation=False):
         """Plots a heatmap from general heatmap values (x,y,intensity),
-        if the image plot does not already exist or should be overwritten.
+        if the heatmap values changed since the image plot was created or the plot should be overwritten.
         Intensity values are normalized.
 
         args:
         - plot_path: The file path to where the plot should be saved.
-        - heatmap: The heatmap as a 2D numpy array to be saved.
+        - plot_size: A tuple of (width, height) of the plot size.
+        - x_y_intensity_list: List of heatmap values (x,y,intensity).
         """
         overwrite = self.config.accumulation_overwrite if accumulation else self.config.general_overwrite
-        if os.path.exists(plot_path) and not overwrite:
+        key = self.artifact_cache.key([], {"artifact": "heatmap", "plot_size": plot_size,
+                                           "sigma": self.heatmap_renderer.sigma,
+                                           "dtype": np.dtype(self.heatmap_renderer.dtype).name,
+                                           "values": x_y_intensity_list})
+        if self.artifact_cache.is_current(plot_path, key) and not overwrite:
             return
+        heatmap = self._create_general_heatmap(plot_size, x_y_intensity_list)
         cv2.imwrite(plot_path, heatmap)
+        self.artifact_cache.record(plot_path, key)
 
     def _create_general_heatmap(self, plot_size, x_y_intensity_list):
         """Creates a heatmap from general heatmap values (x,y,intensity).
@@ -339,18 +367,18 @@ class Plotter:
             - plot_size: A tuple of (width, height) of the plot size.
             - x_y_intensity_list: List of heatmap values (x,y,intensity). The intensity does not need to be normalized.
         """
-        heatmap = np.zeros((plot_size[1], plot_size[0]), dtype=np.float32)
         if not x_y_intensity_list:
-            heatmap = (heatmap * 255).astype(np.uint8)
-            return heatmap
-        for index, x_y_intensity in enumerate(x_y_intensity_list):
-            norm_x, norm_y, intensity = x_y_intensity
-            x, y = norm_to_disp(
-                (norm_x, norm_y), plot_size)
-            heatmap[y, x] += intensity
-        # Apply a Gaussian blur to the heatmap to make it smoother
-        heatmap = cv2.GaussianBlur(heatmap, (0, 0), sigmaX=45)
-        # Normalize values and plot heatmap
+            return np.zeros((plot_size[1], plot_size[0]), dtype=np.uint8)
+        heatmap = self._create_unnormalized_general_heatmap(plot_size, x_y_intensity_list)
+        return self.normalize_heatmap(heatmap)
+
+    def _create_unnormalized_general_heatmap(self, plot_size, x_y_intensity_list):
+        return self.heatmap_renderer.render(plot_size, x_y_intensity_list)
+
+    @staticmethod
+    def normalize_heatmap(heatmap):
+        """Normalizes the values of a blurred heatmap to the range of 0 to 255.
+        """
         assert heatmap.max() != 0
         heatmap = heatmap / heatmap.max()
         heatmap = (heatmap * 255).astype(np.uint8)
@@ -0,0 +1,23 @@
+import time
+
+
+class ProgressReporter:
+    """Reports the progress of a loop over many items, at most once per interval instead of once per item.
+    The last item is always reported.
+    """
+    def __init__(self, description, total, interval_s=5.0):
+        self.description: str = description
+        self.total: int = total
+        self.interval_s: float = interval_s
+        self.done: int = 0
+        self.t0: float = time.perf_counter()
+        self.last_report: float | None = None
+
+    def update(self, amount=1):
+        self.done += amount
+        now = time.perf_counter()
+        if self.done >= self.total or self.last_report is None or now - self.last_report >= self.interval_s:
+            self.last_report = now
+            elapsed = now - self.t0
+            rate = self.done / elapsed if elapsed > 0 else 0
+            print(f"{self.description}: {self.done}/{self.total} ({rate:.1f}/s, {elapsed:.1f} s)")
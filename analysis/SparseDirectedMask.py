@@ -0,0 +1,123 @@
+import numpy as np
+from scipy import stats
+
+
+class SparseDirectedMask:
+    """A directed mask that only stores its non-zero vectors.
+
+    Vectors are stored in row-major order of their pixels: indices holds the sorted flat pixel indices and
+    vectors the (x, y) vector at each of those pixels. All other pixels hold the zero vector.
+    Sums and differences produce the same vectors as on dense directed masks, a dense operand is converted first.
+    Sparse directed masks are never modified in place.
+    """
+    def __init__(self, shape, indices, vectors):
+        self.shape: tuple = (shape[0], shape[1], 2)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.vectors = np.asarray(vectors)
+        assert self.vectors.shape == (len(self.indices), 2)
+
+    @staticmethod
+    def from_dense(directed_mask):
+        height, width, _ = directed_mask.shape
+        flat_directed_mask = directed_mask.reshape(-1, 2)
+        indices = np.flatnonzero((flat_directed_mask != 0).any(axis=1))
+        return SparseDirectedMask((height, width), indices, flat_directed_mask[indices])
+
+    @staticmethod
+    def load(file_path):
+        with np.load(file_path) as container:
+            return SparseDirectedMask(tuple(container["shape"]), container["indices"], container["vectors"])
+
+    @property
+    def size(self):
+        return self.shape[0] * self.shape[1]
+
+    @property
+    def dtype(self):
+        return self.vectors.dtype
+
+    def save(self, file_path, compressed=False):
+        save = np.savez_compressed if compressed else np.savez
+        with open(file_path, "wb") as file:
+            save(file, shape=np.array(self.shape[:2]), indices=self.indices, vectors=self.vectors)
+
+    def to_dense(self):
+        directed_mask = np.zeros((self.size, 2), dtype=self.vectors.dtype)
+        directed_mask[self.indices] = self.vectors
+        return directed_mask.reshape(self.shape)
+
+    def astype(self, dtype):
+        return SparseDirectedMask(self.shape, self.indices.copy(), self.vectors.astype(dtype))
+
+    def add(self, other):
+        return self._combine(other, 1)
+
+    def subtract(self, other):
+        return self._combine(other, -1)
+
+    def pearson_correlation(self, other, channel):
+        """Calculates the pearson correlation between one channel (0 = x, 1 = y) of two sparse directed masks
+        without densifying them. Pixels stored by neither mask are accounted for in closed form.
+
+        returns:
+            - pearson correlation between both channels or 0 if either channel has a constant value.
+            - p_value of the pearson correlation or 0 if either channel has a constant value.
+        """
+        self._assert_equal_shapes(other)
+        if self._is_constant(channel) or other._is_constant(channel):
+            return 0, 0
+
+        size = self.size
+        union_indices = np.union1d(self.indices, other.indices)
+        unstored_count = size - len(union_indices)
+        x_values = self._values_at(union_indices, channel)
+        y_values = other._values_at(union_indices, channel)
+        x_mean = x_values.sum() / size
+        y_mean = y_values.sum() / size
+
+        x_deviations = x_values - x_mean
+        y_deviations = y_values - y_mean
+        covariance = x_deviations @ y_deviations + unstored_count * x_mean * y_mean
+        x_variance = x_deviations @ x_deviations + unstored_count * x_mean ** 2
+        y_variance = y_deviations @ y_deviations + unstored_count * y_mean ** 2
+        corr = float(np.clip(covariance / np.sqrt(x_variance * y_variance), -1, 1))
+
+        # Two-sided p-value of the exact distribution of r under independence, as calculated by scipy
+        ab = size / 2 - 1
+        p_value = float(2 * stats.beta.sf(abs(corr), ab, ab, loc=-1, scale=2))
+        return corr, p_value
+
+    def _combine(self, other, sign):
+        if isinstance(other, np.ndarray):
+            other = SparseDirectedMask.from_dense(other)
+        self._assert_equal_shapes(other)
+        indices = np.union1d(self.indices, other.indices)
+        vectors = np.zeros((len(indices), 2), dtype=np.result_type(self.vectors, other.vectors))
+        vectors[np.searchsorted(indices, self.indices)] += self.vectors
+        if sign < 0:
+            vectors[np.searchsorted(indices, other.indices)] -= other.vectors
+        else:
+            vectors[np.searchsorted(indices, other.indices)] += other.vectors
+        return SparseDirectedMask(self.shape, indices, vectors)
+
+    def _values_at(self, indices, channel):
+        values = np.zeros(len(indices), dtype=np.float64)
+        if len(self.indices) == 0:
+            return values
+        positions = np.searchsorted(self.indices, indices)
+        stored = positions < len(self.indices)
+        stored[stored] = self.indices[positions[stored]] == indices[stored]
+        values[stored] = self.vectors[positions[stored], channel]
+        return values
+
+    def _is_constant(self, channel):
+        channel_values = self.vectors[:, channel]
+        if len(channel_values) == 0:
+            return True
+        if len(channel_values) < self.size:
+            return (channel_values == 0).all()
+        return (channel_values == channel_values[0]).all()
+
+    def _assert_equal_shapes(self, other):
+        if self.shape != other.shape:
+            raise ValueError(f"Directed masks must have the same shape {self.shape} != {other.shape}")
@@ -0,0 +1,102 @@
+import os
+import time
+
+import numpy as np
+
+from analysis.DirectedMaskFormat import load_directed_mask
+from analysis.SparseDirectedMask import SparseDirectedMask
+from analysis.directed_mask_algebra import accumulate_directed_mask, start_accumulation
+from analysis.run_report import count
+
+
+class StreamingDirectedMaskAccumulator:
+    """Accumulates directed masks from disk into a single running sum.
+
+    Directed masks are loaded one at a time, hence at most the running sum and one directed mask are held in memory.
+    Once checkpoint_interval seconds passed since the last checkpoint, the partial sum is written to a checkpoint file
+    together with the directed masks it contains. If the accumulation is interrupted, the next accumulation of the same
+    directed masks resumes from the checkpoint. A checkpoint is only resumed if its directed mask files did not change
+    since.
+    """
+    def __init__(self, checkpoint_path, checkpoint_interval=60):
+        assert checkpoint_interval >= 0
+        self.checkpoint_path: str = checkpoint_path
+        # Writing a full resolution sum takes about as long as accumulating a directed mask,
+        # hence checkpoints are written by time instead of after every directed mask
+        self.checkpoint_interval: float = checkpoint_interval
+        self.resumed_count: int = 0
+
+    def accumulate(self, directed_mask_file_paths: list[str]):
+        """Accumulates the directed masks stored at the given file paths.
+
+        returns:
+            - The accumulated directed mask.
+        """
+        if not directed_mask_file_paths:
+            raise ValueError("At least one directed mask is required for the accumulation")
+        for directed_mask_file_path in directed_mask_file_paths:
+            if not os.path.exists(directed_mask_file_path):
+                raise FileNotFoundError(f"Could not find directed mask: {directed_mask_file_path}")
+
+        source_mtimes = [os.stat(path).st_mtime_ns for path in directed_mask_file_paths]
+        accumulated_directed_mask, self.resumed_count = self._load_checkpoint(directed_mask_file_paths, source_mtimes)
+        if self.resumed_count:
+            print(f"Resuming directed mask accumulation after {self.resumed_count} of {len(directed_mask_file_paths)} directed masks")
+        else:
+            print(f"Planned directed mask accumulations: {len(directed_mask_file_paths)}")
+
+        last_checkpoint_time = time.monotonic()
+        for index in range(self.resumed_count, len(directed_mask_file_paths)):
+            directed_mask = load_directed_mask(directed_mask_file_paths[index])
+            if accumulated_directed_mask is None:
+                accumulated_directed_mask = start_accumulation(directed_mask)
+            else:
+                accumulated_directed_mask = accumulate_directed_mask(accumulated_directed_mask, directed_mask)
+            del directed_mask
+            count("directed_masks_accumulated")
+
+            accumulated_count = index + 1
+            if time.monotonic() - last_checkpoint_time >= self.checkpoint_interval \
+                    and accumulated_count < len(directed_mask_file_paths):
+                self._save_checkpoint(accumulated_directed_mask, directed_mask_file_paths[:accumulated_count],
+                                      source_mtimes[:accumulated_count])
+                last_checkpoint_time = time.monotonic()
+
+        return accumulated_directed_mask
+
+    def discard_checkpoint(self):
+        """Removes the checkpoint. Should be called once the accumulated directed mask is persisted.
+        """
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def _load_checkpoint(self, directed_mask_file_paths, source_mtimes):
+        if not os.path.exists(self.checkpoint_path):
+            return None, 0
+        with np.load(self.checkpoint_path) as checkpoint:
+            checkpoint_sources = list(checkpoint["sources"])
+            checkpoint_mtimes = list(checkpoint["mtimes"])
+            accumulated_count = len(checkpoint_sources)
+            resumable = (0 < accumulated_count <= len(directed_mask_file_paths)
+                         and checkpoint_sources == directed_mask_file_paths[:accumulated_count]
+                         and checkpoint_mtimes == source_mtimes[:accumulated_count])
+            if not resumable:
+                print(f"Discarding outdated directed mask accumulation checkpoint ({self.checkpoint_path})")
+                return None, 0
+            if "sparse_indices" in checkpoint.files:
+                return SparseDirectedMask(tuple(checkpoint["sparse_shape"]), checkpoint["sparse_indices"],
+                                          checkpoint["sparse_vectors"]), accumulated_count
+            return checkpoint["directed_mask"], accumulated_count
+
+    def _save_checkpoint(self, accumulated_directed_mask, sources, mtimes):
+        # Write to a temporary file first to never leave a partially written checkpoint behind
+        temporary_checkpoint_path = f"{self.checkpoint_path}.tmp"
+        if isinstance(accumulated_directed_mask, SparseDirectedMask):
+            directed_mask_arrays = dict(sparse_shape=np.array(accumulated_directed_mask.shape[:2]),
+                                        sparse_indices=accumulated_directed_mask.indices,
+                                        sparse_vectors=accumulated_directed_mask.vectors)
+        else:
+            directed_mask_arrays = dict(directed_mask=accumulated_directed_mask)
+        with open(temporary_checkpoint_path, "wb") as file:
+            np.savez(file, sources=np.array(sources), mtimes=np.array(mtimes, dtype=np.int64), **directed_mask_arrays)
+        os.replace(temporary_checkpoint_path, self.checkpoint_path)
@@ -21,12 +21,15 @@ class ValidationResult:
 
 
 class ValidationScore:
-    def __init__(self, mapping, pid, eid, hm_score, dm_score):
+    def __init__(self, mapping, pid, eid, hm_score, dm_score, hm_key=None, dm_key=None):
         self.mapping: str = mapping
         self.pid: int = pid
         self.eid: int = eid
         self.hm_score: HeatMapScore = hm_score
         self.dm_score: DirectedMaskScore = dm_score
+        # Keys of the inputs the scores were computed from (see ArtifactCache), None if unknown
+        self.hm_key: str = hm_key
+        self.dm_key: str = dm_key
 
     def __eq__(self, other):
         return self.mapping == other.mapping and self.pid == other.pid and self.eid == other.eid and self.hm_score == other.hm_score and self.dm_score == other.hm_score
@@ -0,0 +1,103 @@
+import os.path
+import sqlite3
+
+from analysis.ValidationResult import ValidationResult, ValidationScore, HeatMapScore, DirectedMaskScore
+
+
+class ValidationResultStore:
+    """Stores validation scores in an SQLite database, one row per (mapping, pid, eid).
+
+    Every score is committed on its own, hence an interrupted validation resumes with all scores saved so far.
+    Scores are looked up by their primary key instead of loading and rewriting all scores.
+    Each score is saved with the key of the inputs it was computed from, hence outdated scores can be recognized.
+    A legacy pickled ValidationResult is migrated once into an empty store, its scores have no keys.
+    """
+    def __init__(self, file_path, legacy_file_path=None):
+        self.file_path: str = file_path
+        self.legacy_file_path: str = legacy_file_path
+        self.connection = None
+
+    def get_score(self, mapping, pid, eid):
+        """returns:
+            - The validation score of the exploration or None if it has no scores yet.
+        """
+        row = self._get_connection().execute(
+            "SELECT mapping, pid, eid, hm_corr, hm_p, dm_corr, dm_p, hm_key, dm_key FROM validation_scores "
+            "WHERE mapping = ? AND pid = ? AND eid = ?", (mapping, pid, eid)).fetchone()
+        return self._row_to_validation_score(row) if row else None
+
+    def get_scores_by_mapping(self):
+        """Reads all validation scores at once.
+
+        returns:
+            - Dict that holds a list of validation scores for each mapping, in the order they were first saved.
+        """
+        scores_by_mapping = dict()
+        rows = self._get_connection().execute(
+            "SELECT mapping, pid, eid, hm_corr, hm_p, dm_corr, dm_p, hm_key, dm_key FROM validation_scores "
+            "ORDER BY rowid")
+        for row in rows:
+            validation_score = self._row_to_validation_score(row)
+            scores_by_mapping.setdefault(validation_score.mapping, []).append(validation_score)
+        return scores_by_mapping
+
+    def save_hm_score(self, mapping, pid, eid, hm_score: HeatMapScore, hm_key=None):
+        self._save_score(mapping, pid, eid, "hm", hm_score, hm_key)
+
+    def save_dm_score(self, mapping, pid, eid, dm_score: DirectedMaskScore, dm_key=None):
+        self._save_score(mapping, pid, eid, "dm", dm_score, dm_key)
+
+    def close(self):
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+    def _save_score(self, mapping, pid, eid, score_type, score, key):
+        connection = self._get_connection()
+        with connection:
+            connection.execute(
+                f"INSERT INTO validation_scores "
+                f"(mapping, pid, eid, {score_type}_corr, {score_type}_p, {score_type}_key) VALUES (?, ?, ?, ?, ?, ?) "
+                f"ON CONFLICT (mapping, pid, eid) DO UPDATE SET "
+                f"{score_type}_corr = excluded.{score_type}_corr, {score_type}_p = excluded.{score_type}_p, "
+                f"{score_type}_key = excluded.{score_type}_key",
+                (mapping, pid, eid, float(score.corr), float(score.p), key))
+
+    def _get_connection(self):
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.file_path)
+            with self.connection:
+                self.connection.execute(
+                    "CREATE TABLE IF NOT EXISTS validation_scores (mapping TEXT NOT NULL, pid INTEGER NOT NULL, "
+                    "eid INTEGER NOT NULL, hm_corr REAL, hm_p REAL, dm_corr REAL, dm_p REAL, hm_key TEXT, "
+                    "dm_key TEXT, PRIMARY KEY (mapping, pid, eid))")
+                # Stores created before scores were keyed keep their scores, which count as outdated
+                columns = [column[1] for column in self.connection.execute("PRAGMA table_info(validation_scores)")]
+                for key_column in ["hm_key", "dm_key"]:
+                    if key_column not in columns:
+                        self.connection.execute(f"ALTER TABLE validation_scores ADD COLUMN {key_column} TEXT")
+            self._migrate_legacy_validation_result()
+        return self.connection
+
+    def _migrate_legacy_validation_result(self):
+        if not self.legacy_file_path or not os.path.exists(self.legacy_file_path):
+            return
+        if self.connection.execute("SELECT COUNT(*) FROM validation_scores").fetchone()[0]:
+            return
+        validation_result = ValidationResult()
+        validation_result.load(self.legacy_file_path)
+        print(f"Migrating {len(validation_result.validation_scores)} validation scores from {self.legacy_file_path}")
+        for validation_score in validation_result.validation_scores:
+            if validation_score.hm_score:
+                self.save_hm_score(validation_score.mapping, validation_score.pid, validation_score.eid,
+                                   validation_score.hm_score)
+            if validation_score.dm_score:
+                self.save_dm_score(validation_score.mapping, validation_score.pid, validation_score.eid,
+                                   validation_score.dm_score)
+
+    @staticmethod
+    def _row_to_validation_score(row):
+        mapping, pid, eid, hm_corr, hm_p, dm_corr, dm_p, hm_key, dm_key = row
+        hm_score = HeatMapScore(hm_corr, hm_p) if hm_corr is not None else None
+        dm_score = DirectedMaskScore(dm_corr, dm_p) if dm_corr is not None else None
+        return ValidationScore(mapping, pid, eid, hm_score, dm_score, hm_key, dm_key)
@@ -6,11 +6,20 @@ from scipy.stats import pearsonr
 
 from analysis.Accumulator import Accumulator
 from analysis.AnalysisConfiguration import AnalysisConfiguration
+from analysis.ArtifactCache import ArtifactCache
 from analysis.Plotter import Plotter
-from analysis.ValidationResult import ValidationResult, DirectedMaskScore, HeatMapScore, ValidationScore
+from analysis.ValidationResult import DirectedMaskScore, HeatMapScore
+from analysis.ValidationResultStore import ValidationResultStore
 from analysis.WeightType import WeightType
-from analysis.analysis_utils import get_directed_mask_file_path
-from config import ACCUMULATED_DIRECTED_MASK_DIR, VALIDATION_RESULT_FILE_PATH
+from analysis.DirectedMaskFormat import load_directed_mask
+from analysis.DirectedMaskStore import DirectedMaskStore
+from analysis.SparseDirectedMask import SparseDirectedMask
+from analysis.analysis_utils import get_directed_mask_file_path, get_accumulated_directed_mask_file_path, \
+    get_directed_mask_store_file_path
+from analysis.directed_mask_algebra import subtract_directed_masks
+from analysis.ProgressReporter import ProgressReporter
+from analysis.run_report import count
+from config import VALIDATION_RESULT_FILE_PATH, VALIDATION_RESULT_DB_PATH, DIRECTED_MASK_STORE_DIR, RESOLUTION
 
 
 class Validator:
@@ -19,7 +28,9 @@ class Validator:
         self.config: AnalysisConfiguration = config
         self.accumulator: Accumulator = accumulator
         self.plotter: Plotter = plotter
-        self.file_path: str = VALIDATION_RESULT_FILE_PATH
+        self.artifact_cache: ArtifactCache = plotter.artifact_cache
+        self.result_store: ValidationResultStore = ValidationResultStore(VALIDATION_RESULT_DB_PATH,
+                                                                          VALIDATION_RESULT_FILE_PATH)
 
     def leave_one_out_cross_validation(self, relatable_fixations_map):
         """Performs leave-one-out cross-validation for directed masks and heatmaps.
@@ -40,85 +51,131 @@ class Validator:
         4. Calculates correlation between minor accumulated directed mask and excluded directed mask.
         5. Saves results to file.
         5. Repeats steps 2-5 for all directed masks in the relatable fixations list.
+        Scores are only recomputed if the accumulated directed mask changed since they were saved.
         """
         print(f"Performing leave-one-out cross-validation for {len(relatable_fixations_list)} directed masks")
-        accumulated_directed_mask_dir = ACCUMULATED_DIRECTED_MASK_DIR
-        accumulated_directed_mask_path = os.path.join(accumulated_directed_mask_dir,
-                                                      f"{list_id}-accumulated-directed-mask.npy")
-        minor_accumulated_directed_mask = np.load(accumulated_directed_mask_path)
-        for index, relatable_fixations in enumerate(relatable_fixations_list):
+        mask_format = self.config.directed_mask_format
+        accumulated_directed_mask_path = get_accumulated_directed_mask_file_path(list_id, mask_format)
+        # The accumulated directed mask is keyed by all directed masks it was accumulated from
+        dm_key = self.artifact_cache.key([accumulated_directed_mask_path], {"artifact": "directed-mask-score"})
+        minor_accumulated_directed_mask = load_directed_mask(accumulated_directed_mask_path, mmap_mode='r')
+        # Sparse directed masks are small enough to be loaded one at a time.
+        # The store of dense directed masks is only built or opened once a score has to be (re)computed
+        directed_mask_store = None
+        progress_reporter = ProgressReporter(f"Directed mask cross-validation of {list_id}", len(relatable_fixations_list))
+        for relatable_fixations in relatable_fixations_list:
             pid = relatable_fixations.pid
             exploration_id = relatable_fixations.exploration_id
 
-            validation_result = self._get_validation_result()
-            validation_scores = validation_result.validation_scores
-            validation_score, score_index = self._find_validation_score(validation_scores, list_id, pid, exploration_id)
+            validation_score = self.result_store.get_score(list_id, pid, exploration_id)
             directed_mask_score = None
-            if validation_score:
+            if validation_score and validation_score.dm_key == dm_key:
                 directed_mask_score = validation_score.dm_score
 
             if not directed_mask_score or self.config.validation_overwrite:
-                print(f"Leaving out directed mask {index + 1}")
-                directed_mask_file_path = get_directed_mask_file_path(pid, exploration_id)
-                left_out_directed_mask = np.load(directed_mask_file_path)
-                subtracted_directed_mask = self.accumulator.subtract_directed_mask(minor_accumulated_directed_mask,
-                                                                              left_out_directed_mask)
+                if directed_mask_store is None and not mask_format.sparse:
+                    directed_mask_store = self._get_directed_mask_store(list_id, relatable_fixations_list)
+                if directed_mask_store is not None:
+                    left_out_directed_mask = directed_mask_store.get(pid, exploration_id)
+                else:
+                    left_out_directed_mask = load_directed_mask(get_directed_mask_file_path(pid, exploration_id, mask_format))
+                subtracted_directed_mask = subtract_directed_masks(minor_accumulated_directed_mask,
+                                                                   left_out_directed_mask)
                 dm_correlation, dm_p_value = Validator._correlation_between_directed_masks(subtracted_directed_mask,
                                                                                            left_out_directed_mask)
 
                 directed_mask_score = DirectedMaskScore(dm_correlation, dm_p_value)
-                if validation_score:
-                    validation_score.dm_score = directed_mask_score
-                    validation_scores[score_index] = validation_score
-                else:
-                    validation_score = ValidationScore(list_id, pid, exploration_id, None, directed_mask_score)
-                    validation_scores.append(validation_score)
-                validation_result.save(self.file_path)
+                self.result_store.save_dm_score(list_id, pid, exploration_id, directed_mask_score, dm_key)
+                count("directed_mask_scores_computed")
+            progress_reporter.update()
+
+    def _get_directed_mask_store(self, list_id, relatable_fixations_list):
+        """Opens the directed mask store of the accumulation mapping. The store is (re)built if it is missing
+        or does not reflect the current directed masks.
+        """
+        mask_format = self.config.directed_mask_format
+        if not os.path.exists(DIRECTED_MASK_STORE_DIR):
+            os.mkdir(DIRECTED_MASK_STORE_DIR)
+        entries = [(relatable_fixations.pid, relatable_fixations.exploration_id,
+                    get_directed_mask_file_path(relatable_fixations.pid, relatable_fixations.exploration_id, mask_format))
+                   for relatable_fixations in relatable_fixations_list]
+        directed_mask_store = DirectedMaskStore(get_directed_mask_store_file_path(list_id, mask_format))
+        if not directed_mask_store.is_current(entries):
+            directed_mask_store.build(entries)
+        return directed_mask_store.open()
 
     def _loucv_heatmaps(self, list_id, relatable_fixations_list):
         """Performs leave-one-out cross-validation for heatmaps.
-        1. Excludes one heatmap from the relatable fixations list.
-        2. Calculates minor accumulated heatmap, accumulating all but the excluded heatmap.
-        3. Calculates correlation between minor accumulated heatmap and excluded heatmap.
-        4. Saves results to file.
-        5. Repeats steps 1-4 for all directed masks in the relatable fixations list.
+        1. Creates one unnormalized heatmap per exploration and adds them up to the accumulated heatmap.
+        2. Excludes one heatmap from the relatable fixations list.
+        3. Calculates minor accumulated heatmap by subtracting the excluded heatmap from the accumulated heatmap.
+        4. Calculates correlation between minor accumulated heatmap and excluded heatmap, both normalized.
+        5. Saves results to file.
+        6. Repeats steps 2-5 for all heatmaps in the relatable fixations list.
+        Scores are only recomputed if the heat points of any exploration changed since they were saved.
+
+        Only the heat points of each exploration and the accumulated heatmap are kept in memory. The excluded heatmap
+        is rendered again when it is left out, hence memory does not grow with the number of explorations.
         """
         print(f"Performing leave-one-out cross-validation for {len(relatable_fixations_list)} heatmaps")
+        heat_points_list = [self.accumulator.relatable_fixations_list_to_heat_points([relatable_fixations],
+                                                                                     WeightType.INTENSITY)
+                            for relatable_fixations in relatable_fixations_list]
+        heat_point_count = sum(len(heat_points) for heat_points in heat_points_list)
+        hm_key = self.artifact_cache.key([], {"artifact": "heatmap-score", "plot_size": RESOLUTION,
+                                              "sigma": self.plotter.heatmap_renderer.sigma,
+                                              "dtype": np.dtype(self.plotter.heatmap_renderer.dtype).name,
+                                              "values": [[(heat_point.x, heat_point.y, heat_point.intensity)
+                                                          for heat_point in heat_points]
+                                                         for heat_points in heat_points_list]})
+        accumulated_heatmap = None
+        progress_reporter = ProgressReporter(f"Heatmap cross-validation of {list_id}", len(relatable_fixations_list))
         for index, relatable_fixations in enumerate(relatable_fixations_list):
             pid = relatable_fixations.pid
             exploration_id = relatable_fixations.exploration_id
 
-            validation_result = self._get_validation_result()
-            validation_scores = validation_result.validation_scores
-            validation_score, score_index = self._find_validation_score(validation_scores, list_id, pid, exploration_id)
+            validation_score = self.result_store.get_score(list_id, pid, exploration_id)
             heatmap_score = None
-            if validation_score:
+            if validation_score and validation_score.hm_key == hm_key:
                 heatmap_score = validation_score.hm_score
 
             if not heatmap_score or self.config.validation_overwrite:
-                print(f"Leaving out heatmap {index + 1}")
-                left_out_relatable_fixations_list = [relatable_fixations]
-                current_relatable_fixations_list = relatable_fixations_list.copy()
-                current_relatable_fixations_list.pop(index)
-
-                left_out_heatmap = self.plotter.create_heatmap_from_heat_points(
-                    self.accumulator.relatable_fixations_list_to_heat_points(
-                        left_out_relatable_fixations_list, WeightType.INTENSITY))
-                current_accumulated_heatmap = self.plotter.create_heatmap_from_heat_points(
-                    self.accumulator.relatable_fixations_list_to_heat_points(
-                        current_relatable_fixations_list, WeightType.INTENSITY))
+                if accumulated_heatmap is None:
+                    accumulated_heatmap = self._create_accumulated_heatmap(heat_points_list)
+
+                heat_points = heat_points_list[index]
+                unnormalized_heatmap = self.plotter.create_unnormalized_heatmap_from_heat_points(heat_points)
+                left_out_heatmap = self._normalize_heatmap(unnormalized_heatmap, len(heat_points))
+                current_accumulated_heatmap = accumulated_heatmap - unnormalized_heatmap
+                # Subtracting may leave rounding residues slightly below 0 where no other heat is present
+                np.maximum(current_accumulated_heatmap, 0, out=current_accumulated_heatmap)
+                current_accumulated_heatmap = self._normalize_heatmap(current_accumulated_heatmap,
+                                                                      heat_point_count - len(heat_points))
 
                 hm_correlation, hm_p_value = Validator._correlation_between_heat_maps(current_accumulated_heatmap,
                                                                                       left_out_heatmap)
 
                 heatmap_score = HeatMapScore(hm_correlation, hm_p_value)
-                if validation_score:
-                    validation_score.hm_score = heatmap_score
-                    validation_scores[score_index] = validation_score
-                else:
-                    validation_score = ValidationScore(list_id, pid, exploration_id, heatmap_score, None)
-                    validation_scores.append(validation_score)
-                validation_result.save(self.file_path)
+                self.result_store.save_hm_score(list_id, pid, exploration_id, heatmap_score, hm_key)
+                count("heatmap_scores_computed")
+            progress_reporter.update()
+
+    def _create_accumulated_heatmap(self, heat_points_list):
+        """Adds up the unnormalized heatmaps of all explorations, one exploration at a time.
+        """
+        accumulated_heatmap = None
+        for heat_points in heat_points_list:
+            heatmap = self.plotter.create_unnormalized_heatmap_from_heat_points(heat_points)
+            if accumulated_heatmap is None:
+                accumulated_heatmap = heatmap
+            else:
+                accumulated_heatmap += heatmap
+        return accumulated_heatmap
+
+    def _normalize_heatmap(self, unnormalized_heatmap, heat_point_count):
+        if heat_point_count == 0:
+            return np.zeros(unnormalized_heatmap.shape, dtype=np.uint8)
+        return self.plotter.normalize_heatmap(unnormalized_heatmap)
 
     def analyse_cross_validation_results(self, relatable_fixations_map):
         """Given the cross-validation results as correlation, this method calculates the
@@ -129,10 +186,10 @@ class Validator:
         mapped_dm_correlation_values = dict()
         mapped_hm_correlation_values = dict()
         mapped_average_correlation_values = dict()
+        validation_scores_by_mapping = self.result_store.get_scores_by_mapping()
         for list_id, relatable_fixations_list in relatable_fixations_map.items():
             print(f"Validation result for {list_id}")
-            validation_result = self._get_validation_result()
-            filtered_validation_scores = self._filter_validation_scores_by_mapping(validation_result.validation_scores, list_id)
+            filtered_validation_scores = validation_scores_by_mapping.get(list_id, [])
             dm_correlation_values = []
             hm_correlation_values = []
             average_correlation_values = []
@@ -166,7 +223,13 @@ class Validator:
         It is not possible to find a vector representation that reflects in one value.
         Thus, to calculate the correlation of vectors, we calculaate the correlation of both
         x and y coordinate separately and chose their average as the correlation of the vectors.
+        Sparse directed masks are correlated without densifying them.
         """
+        if isinstance(mask1, SparseDirectedMask):
+            x_correlation, x_p_value = mask1.pearson_correlation(mask2, channel=0)
+            y_correlation, y_p_value = mask1.pearson_correlation(mask2, channel=1)
+            return statistics.mean([x_correlation, y_correlation]), statistics.mean([x_p_value, y_p_value])
+
         mask1_x_coordinates = mask1[:, :, 0]
         mask2_x_coordinates = mask2[:, :, 0]
         x_correlation, x_p_value = Validator._pearson_correlation_similarity(mask1_x_coordinates, mask2_x_coordinates)
@@ -208,26 +271,6 @@ class Validator:
             corr, p_value = pearsonr(np_2d_array1.flatten(), np_2d_array_2.flatten())
         return corr, p_value
 
-    def _get_validation_result(self):
-        validation_result = ValidationResult()
-        validation_result.load(self.file_path)
-        return validation_result
-
-    @staticmethod
-    def _filter_validation_scores_by_mapping(validation_scores, mapping):
-        filtered_validation_scores = []
-        for validation_score in validation_scores:
-            if validation_score.mapping == mapping:
-                filtered_validation_scores.append(validation_score)
-        return filtered_validation_scores
-
-    @staticmethod
-    def _find_validation_score(validation_result, mapping, pid, eid):
-        for index, validation_score in enumerate(validation_result):
-            if validation_score.mapping == mapping and validation_score.pid == pid and validation_score.eid == eid:
-                return validation_score, index
-        return None, None
-
     @staticmethod
     def _cv(data):
         mean = statistics.mean(data)
@@ -1,17 +1,19 @@
+import functools
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 import cv2
 import numpy as np
 from matplotlib import pyplot as plt
 from scipy import stats
 
-from analysis.Analyzer import Analyzer
+from analysis.DirectedMaskFormat import DirectedMaskFormat
 from analysis.Exploration import Exploration
-from analysis.Movement import Movement
-from config import ANALYSIS_DATA_DIR, EXPERIMENT_DATA_DIR, ANALYSIS_PLOT_DIR
-
-DIRECTED_MASK_SIGNATURE = '(2),(2)->(2)'
-
+from analysis.FixationTable import FixationTable
+from analysis.ProgressReporter import ProgressReporter
+from analysis.run_report import count, get_counters, merge_counters
+from config import ANALYSIS_DATA_DIR, EXPERIMENT_DATA_DIR, ANALYSIS_PLOT_DIR, ACCUMULATED_DIRECTED_MASK_DIR, \
+    DIRECTED_MASK_STORE_DIR
 
 def find_close_dividers(target_divider, values):
     """Finds the closest two dividers to the target divider that divide each value with a remainder of 0.
@@ -44,18 +46,96 @@ def find_close_dividers(target_divider, values):
     return x_divider, y_divider
 
 
-def parse_fixations(movements_file_path) -> list[Movement]:
-    fixations = []
-    with open(movements_file_path, 'r') as movements_file:
-        header_line = movements_file.readline()  # Read off header line
-        for line in movements_file:
-            movement = Movement.from_csv(line)
-            if movement.is_fixation() and _is_fixation_on_display_area(movement):
-                fixations.append(movement)
+# Number of parsed files of each kind that are kept in memory
+PARSE_CACHE_SIZE = 64
+
+
+def parse_fixations(movements_file_path) -> FixationTable:
+    """Parses the fixations of a movements file once per state of the file.
+    The cached table is read-only, copy it before changing fixations.
+    """
+    file_stat = os.stat(movements_file_path)
+    misses = _parse_fixations.cache_info().misses
+    fixations = _parse_fixations(movements_file_path, file_stat.st_size, file_stat.st_mtime_ns)
+    if _parse_fixations.cache_info().misses == misses:
+        count("fixation_parse_cache_hits")
     return fixations
 
 
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_fixations(movements_file_path, file_size, file_mtime) -> FixationTable:
+    fixations = FixationTable.from_csv(movements_file_path)
+    fixations = fixations[_is_fixation_on_display_area(fixations)]
+    fixations.fixations.flags.writeable = False
+    count("movement_files_parsed")
+    count("fixations_parsed", len(fixations))
+    return fixations
+
+
+def map_in_parallel(function, items, jobs=1, progress_description=None) -> list:
+    """Applies the function to each item, in a pool of jobs worker processes if jobs is greater than 1.
+    The function and the items are pickled for the workers, hence they must not hold open files or connections.
+    Run report counters incremented by the workers are added to the counters of this process.
+
+    args:
+        - progress_description: If given, the progress is reported under this description as items finish.
+    returns:
+        - The results in the order of the items, once the function has returned for every item.
+    """
+    items = list(items)
+    progress_reporter = ProgressReporter(progress_description, len(items)) if progress_description else None
+    results = []
+    if jobs <= 1 or len(items) <= 1:
+        for item in items:
+            results.append(function(item))
+            if progress_reporter:
+                progress_reporter.update()
+        return results
+    with ProcessPoolExecutor(max_workers=min(jobs, len(items))) as executor:
+        for result, counters in executor.map(functools.partial(_run_with_counters, function), items):
+            merge_counters(counters)
+            results.append(result)
+            if progress_reporter:
+                progress_reporter.update()
+    return results
+
+
+def _run_with_counters(function, item):
+    """returns:
+        - The result of the function and the run report counters it incremented in this worker process.
+    """
+    counters_before = get_counters()
+    result = function(item)
+    counters = {name: amount - counters_before.get(name, 0) for name, amount in get_counters().items()}
+    return result, {name: amount for name, amount in counters.items() if amount}
+
+
 def parse_explorations(explorations_file_path) -> list[Exploration]:
+    """Parses the explorations of an explorations file once per state of the file.
+    """
+    file_stat = os.stat(explorations_file_path)
+    misses = _parse_explorations.cache_info().misses
+    explorations = list(_parse_explorations(explorations_file_path, file_stat.st_size, file_stat.st_mtime_ns))
+    if _parse_explorations.cache_info().misses == misses:
+        count("exploration_parse_cache_hits")
+    return explorations
+
+
+def get_parse_cache_info():
+    """returns:
+        - A dict of the hits, misses and current size of the fixation and exploration parse caches.
+    """
+    return {name: cache_function.cache_info()._asdict()
+            for name, cache_function in [("fixations", _parse_fixations), ("explorations", _parse_explorations)]}
+
+
+def clear_parse_cache():
+    _parse_fixations.cache_clear()
+    _parse_explorations.cache_clear()
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_explorations(explorations_file_path, file_size, file_mtime) -> tuple[Exploration]:
     explorations = []
     with open(explorations_file_path, 'r') as explorations_file:
         header_line = explorations_file.readline()  # Read off header line
@@ -68,20 +148,17 @@ def parse_explorations(explorations_file_path) -> list[Exploration]:
                 exploration = Exploration.create_exploration()
     for i in range(len(explorations)-1):
         assert explorations[i].trial_end < explorations[i+1].trial_start
-    return explorations
+    return tuple(explorations)
 
 
-def filter_fixations_for_exploration(exploration: Exploration, fixations: list[Movement]) -> list[Movement]:
+def filter_fixations_for_exploration(exploration: Exploration, fixations: FixationTable) -> FixationTable:
     """Filters fixations for an exploration/image.
     Fixations are passing the filter when they occur during the actual exploration i.e. while the image is visible.
     After that, the first fixation is filtered out because it is not influenced by a stimulus on the image.
     Also, the last fixation is filtered out in case its duration is outstandingly higher than every other fixation's
     duration because this indicates lingering attention caused by searching the button to end the exploration phase.
     """
-    filtered_fixations = []
-    for fixation in fixations:
-        if exploration.img_online < fixation.timestamp_us < exploration.img_offline:
-            filtered_fixations.append(fixation)
+    filtered_fixations = fixations.between(exploration.img_online, exploration.img_offline)
     if len(filtered_fixations) >= 3:
         filtered_fixations = _remove_last_fixation_if_positive_outlier(filtered_fixations[1:])
     return filtered_fixations
@@ -95,7 +172,7 @@ def _remove_last_fixation_if_positive_outlier(fixations):
     the outlier on the mean and hence the standard deviation.
     Since we have explorations with only few fixations, our threshold needs to be quite low.
     """
-    fixation_durations = [fixation.duration for fixation in fixations]
+    fixation_durations = fixations.durations
     if max(fixation_durations) > fixation_durations[-1]:
         return fixations
     z_scores = np.array(stats.zscore(fixation_durations))
@@ -108,13 +185,34 @@ def _remove_last_fixation_if_positive_outlier(fixations):
         return fixations
 
 
-def _is_fixation_on_display_area(fixation):
+def get_flipped_min_max_timestamps(fixations):
+    """Flips fixation timestamps to make early occurring fixations worth more than later occurring ones.
+
+    returns:
+        - The flip function, the minimum and the maximum flipped timestamp.
+    """
+    fixation_timestamps = [fixation.timestamp_us for fixation in fixations]
+    min_fixation_timestamp = min(fixation_timestamps)
+    max_fixation_timestamp = max(fixation_timestamps)
+
+    def flip(value):
+        flipper = max_fixation_timestamp + 1
+        return abs(value - flipper)
+
+    flipped_min_timestamp = flip(max_fixation_timestamp)
+    flipped_max_timestamp = flip(min_fixation_timestamp)
+    return flip, flipped_min_timestamp, flipped_max_timestamp
+
+
+def _is_fixation_on_display_area(fixations: FixationTable):
     """Raw gaze data from the Tobii SDK might include gaze points outside the display area.
     We are filtering those out here because there is no sense in plotting points outside the image.
+
+    returns:
+        - A boolean mask of the fixations on the display area.
     """
-    if 0 <= fixation.average_gaze_point2d_x <= 1 and 0 <= fixation.average_gaze_point2d_y <= 1:
-        return True
-    return False
+    gaze_points2d = fixations.gaze_points2d
+    return np.all((0 <= gaze_points2d) & (gaze_points2d <= 1), axis=1)
 
 
 def plot_points_on_img(points, img_path, colored_source=True):
@@ -147,6 +245,10 @@ def get_movements_file_path(pid):
     return os.path.join(get_participant_analysis_data_dir(pid), "movements.csv")
 
 
+def get_gaze_sample_store_file_path(pid):
+    return os.path.join(get_participant_analysis_data_dir(pid), "gaze_samples.npy")
+
+
 def get_explorations_file_path(pid):
     return os.path.join(get_participant_analysis_data_dir(pid), "explorations.tsv")
 
@@ -167,8 +269,24 @@ def get_directed_masks_dir(pid):
     return os.path.join(get_participant_analysis_data_dir(pid), "directed_masks")
 
 
-def get_directed_mask_file_path(pid, exploration_index):
-    return os.path.join(get_directed_masks_dir(pid), f"{exploration_index}-directed-mask.npy")
+def get_directed_mask_file_path(pid, exploration_index, mask_format=None):
+    if mask_format is None:
+        mask_format = DirectedMaskFormat()
+    file_name = f"{exploration_index}-directed-mask{mask_format.file_suffix}{mask_format.file_extension}"
+    return os.path.join(get_directed_masks_dir(pid), file_name)
+
+
+def get_accumulated_directed_mask_file_path(list_id, mask_format=None):
+    if mask_format is None:
+        mask_format = DirectedMaskFormat()
+    file_extension = ".npz" if mask_format.sparse else ".npy"
+    return os.path.join(ACCUMULATED_DIRECTED_MASK_DIR, f"{list_id}-accumulated-directed-mask{mask_format.file_suffix}{file_extension}")
+
+
+def get_directed_mask_store_file_path(list_id, mask_format=None):
+    if mask_format is None:
+        mask_format = DirectedMaskFormat()
+    return os.path.join(DIRECTED_MASK_STORE_DIR, f"{list_id}-directed-mask-store{mask_format.file_suffix}.npy")
 
 
 def get_validation_analysis_file_path(accumulation_mapping):
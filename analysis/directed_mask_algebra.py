@@ -0,0 +1,76 @@
+"""
+Algebra on directed masks, i.e. numpy arrays of shape (height, width, 2) that hold one vector per pixel.
+All operations work on whole arrays instead of single vectors.
+Sparse directed masks are supported as well, operations on them return new sparse directed masks.
+"""
+
+import numpy as np
+
+from analysis.SparseDirectedMask import SparseDirectedMask
+
+
+def sum_directed_masks(directed_masks):
+    """Cumulatively adds up vectors at the same position for each directed mask.
+    The provided directed masks are not modified.
+    """
+    if not directed_masks:
+        raise ValueError("At least one directed mask is required for the accumulation")
+    accumulated_directed_mask = start_accumulation(directed_masks[0])
+    print(f"Accumulating {len(directed_masks)} directed masks")
+    for directed_mask in directed_masks[1:]:
+        accumulated_directed_mask = accumulate_directed_mask(accumulated_directed_mask, directed_mask)
+    return accumulated_directed_mask
+
+
+def start_accumulation(directed_mask):
+    """Copies the directed mask with full precision to accumulate other directed masks into it.
+    """
+    if isinstance(directed_mask, SparseDirectedMask):
+        return directed_mask.astype(np.float64)
+    return np.array(directed_mask, dtype=np.float64)
+
+
+def accumulate_directed_mask(accumulated_directed_mask, directed_mask):
+    """Adds the vectors of the directed mask to the accumulated directed mask.
+    Dense accumulated directed masks are updated in place.
+
+    returns:
+        - The accumulated directed mask.
+    """
+    if isinstance(accumulated_directed_mask, SparseDirectedMask):
+        return accumulated_directed_mask.add(directed_mask)
+    _assert_equal_shapes(accumulated_directed_mask, directed_mask)
+    np.add(accumulated_directed_mask, directed_mask, out=accumulated_directed_mask)
+    return accumulated_directed_mask
+
+
+def add_directed_masks(directed_mask1, directed_mask2):
+    """Adds vectors at the same position of two directed masks.
+    """
+    if isinstance(directed_mask1, SparseDirectedMask):
+        return directed_mask1.add(directed_mask2)
+    _assert_equal_shapes(directed_mask1, directed_mask2)
+    return np.add(directed_mask1, directed_mask2)
+
+
+def subtract_directed_masks(minuend_directed_mask, subtrahend_directed_mask):
+    """Subtracts the subtrahend's vectors from the minuend's vectors at the same position.
+    """
+    if isinstance(minuend_directed_mask, SparseDirectedMask):
+        return minuend_directed_mask.subtract(subtrahend_directed_mask)
+    _assert_equal_shapes(minuend_directed_mask, subtrahend_directed_mask)
+    return np.subtract(minuend_directed_mask, subtrahend_directed_mask)
+
+
+def scale_directed_mask(directed_mask, factor):
+    """Scales the length of every vector in the directed mask by the given factor.
+    """
+    if isinstance(directed_mask, SparseDirectedMask):
+        return SparseDirectedMask(directed_mask.shape, directed_mask.indices.copy(),
+                                  np.multiply(directed_mask.vectors, factor))
+    return np.multiply(directed_mask, factor)
+
+
+def _assert_equal_shapes(directed_mask1, directed_mask2):
+    if directed_mask1.shape != directed_mask2.shape:
+        raise ValueError(f"Directed masks must have the same shape {directed_mask1.shape} != {directed_mask2.shape}")
@@ -1,6 +1,7 @@
 import numpy as np
 from matplotlib import pyplot as plt
 from scipy.interpolate import SmoothBivariateSpline
+from scipy.ndimage import maximum_filter
 
 from analysis.Extractor import Extractor
 from analysis.HeatPoint import HeatPoint
@@ -11,9 +12,19 @@ class BivariateSplineExtractor(Extractor):
 
     The algorithm fits a bivariate spline to the heatmap and finds the local maxima within the spline.
     As the local maxima represent the heat sources.
+
+    args:
+        - fine_grid_resolution: Number of points per axis at which the spline is evaluated.
+        - neighborhood_size: A local maximum is the maximum of the square of this many points
+          in each direction around it.
     """
-    def __init__(self, overwrite=False):
+    def __init__(self, overwrite=False, fine_grid_resolution=2 ** 9, neighborhood_size=5):
         super().__init__(overwrite)
+        self.fine_grid_resolution: int = fine_grid_resolution
+        self.neighborhood_size: int = neighborhood_size
+
+    def get_parameters(self):
+        return {"fine_grid_resolution": self.fine_grid_resolution, "neighborhood_size": self.neighborhood_size}
 
     def _extract_heat_sources_from_heatmap(self):
         heatmap_image = plt.imread(self.heatmap_path)
@@ -39,40 +50,28 @@ class BivariateSplineExtractor(Extractor):
         spline = SmoothBivariateSpline(y_flat, x_flat, z_flat, s=smoothing_factor)
 
         # Create a finer grid for the 3D surface plot
-        fine_grid_resolution = 2 ** 9  # Adjust as needed (2 ** 8=256)
-        x_fine = np.linspace(0, heatmap_width - 1, fine_grid_resolution)
-        y_fine = np.linspace(0, heatmap_height - 1, fine_grid_resolution)
-        X_fine, Y_fine = np.meshgrid(x_fine, y_fine)
+        x_fine = np.linspace(0, heatmap_width - 1, self.fine_grid_resolution)
+        y_fine = np.linspace(0, heatmap_height - 1, self.fine_grid_resolution)
 
         # Normalized Z values after spline fitting process.
         Z_fine = spline(y_fine, x_fine)
 
-        # Initialize lists to store the coordinates of local maxima
-        x_maxima = []
-        y_maxima = []
-        z_maxima = []
-
-        # Define a neighborhood size for checking local maxima
-        neighborhood_size = 5  # Adjust as needed
-        for i in range(neighborhood_size, Z_fine.shape[0] - neighborhood_size):
-            for j in range(neighborhood_size, Z_fine.shape[1] - neighborhood_size):
-                neighborhood = Z_fine[i - neighborhood_size:i + neighborhood_size + 1,
-                               j - neighborhood_size:j + neighborhood_size + 1]
-                if Z_fine[i, j] == np.max(neighborhood) and int(
-                        heatmap_image[int(y_fine[i])][int(x_fine[j])] * 255) > 0:
-                    x_maxima.append(x_fine[j])
-                    y_maxima.append(y_fine[i])
-                    z_maxima.append(Z_fine[i, j])
-
-        x_maxima = np.array(x_maxima)
-        y_maxima = np.array(y_maxima)
-        z_maxima = np.array(z_maxima)
+        i_maxima, j_maxima = self.find_local_maxima(Z_fine, self.neighborhood_size)
+        # Only maxima on heat of the heatmap are heat sources
+        heated = (heatmap_image[y_fine[i_maxima].astype(int), x_fine[j_maxima].astype(int)] * 255).astype(int) > 0
+        i_maxima = i_maxima[heated]
+        j_maxima = j_maxima[heated]
+
+        x_maxima = x_fine[j_maxima]
+        y_maxima = y_fine[i_maxima]
+        z_maxima = Z_fine[i_maxima, j_maxima]
 
         # # Create the 3D surface plot
         # matplotlib.use('Qt5Agg')
         # fig = plt.figure()
         # ax = fig.add_subplot(111, projection='3d')
         # ax.invert_yaxis()
+        # X_fine, Y_fine = np.meshgrid(x_fine, y_fine)
         # ax.plot_surface(X_fine, Y_fine, Z_fine, cmap='viridis')
         # # Mark local maxima as red points
         # ax.scatter(x_maxima, y_maxima, z_maxima, c='red', s=30, marker='o')
@@ -83,3 +82,21 @@ class BivariateSplineExtractor(Extractor):
             y_max = int(y)
             z_max = int(heatmap_image[y_max][x_max] * 255)
             self.heat_sources.append(HeatPoint(x_max, y_max, z_max))
+
+    @staticmethod
+    def find_local_maxima(values, neighborhood_size):
+        """Finds the points that equal the maximum of their neighborhood, i.e. the square of neighborhood_size points
+        in each direction around them. Points closer to the border than neighborhood_size have no full neighborhood
+        and are never maxima.
+
+        returns:
+            - The row and column indices of the local maxima in row-major order.
+        """
+        neighborhood_maxima = maximum_filter(values, size=2 * neighborhood_size + 1, mode='nearest')
+        is_maximum = values == neighborhood_maxima
+        height, width = values.shape
+        is_maximum[:neighborhood_size] = False
+        is_maximum[height - neighborhood_size:] = False
+        is_maximum[:, :neighborhood_size] = False
+        is_maximum[:, width - neighborhood_size:] = False
+        return np.nonzero(is_maximum)
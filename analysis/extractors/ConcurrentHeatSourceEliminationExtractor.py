@@ -8,6 +8,8 @@ import numpy as np
 
 from analysis.Extractor import Extractor
 from analysis.HeatPoint import HeatPoint
+from analysis.HotNeighbourCountMap import HotNeighbourCountMap
+from analysis.extractors.HeatSourceEliminationExtractor import SLIDING_WINDOW_SIZE
 from util import Point
 
 
@@ -225,12 +227,11 @@ class HeatPointVisitor(Thread):
 
     @staticmethod
     def _is_negative_trend(visited_heat_points: list[tuple]):
-        size = 80
-        if len(visited_heat_points) < size:
+        if len(visited_heat_points) < SLIDING_WINDOW_SIZE:
             return True
         else:
-            # Intensity of 80th last point is higher than intensity of current point
-            return visited_heat_points[-size][2] > visited_heat_points[-1][2]
+            # Intensity of the first point in the window is higher than intensity of current point
+            return visited_heat_points[-SLIDING_WINDOW_SIZE][2] > visited_heat_points[-1][2]
 
     def _init_axis_and_quadrant_info(self):
         match self.primary_axis_direction:
@@ -264,46 +265,32 @@ class ConcurrentHeatSourceEliminationExtractor(Extractor):
 
     def _extract_heat_sources_from_heatmap(self):
         heatmap = cv2.imread(self.heatmap_path, cv2.IMREAD_GRAYSCALE)
-        saved_heatmap = heatmap.copy()
+        hot_neighbour_count_map = HotNeighbourCountMap(heatmap)
         while True:
             _, max_val, _, max_pos = cv2.minMaxLoc(heatmap)
             all_heat_sources_found = max_val == 0
             if all_heat_sources_found:
                 break
             heat_source = HeatPoint(max_pos[0], max_pos[1], int(max_val))
-            if self._is_valid_heat_source(heat_source, heatmap):
+            if hot_neighbour_count_map.is_valid_heat_source(heat_source.x, heat_source.y):
                 self.heat_sources.append(heat_source)
-            self._eliminate_heat_source(heat_source, heatmap)
-
-    @staticmethod
-    def _is_valid_heat_source(heat_point, heatmap):
-        """A heat source is a valid if it spreads heat.
-        To determine if the point spreads heat, we consider all surrounding points in the range
-        of a fixed manhattan distance. For all points that are on the display area, we define a percentage
-        threshold, of how many of these surrounding points on the display area need to be hot (non-black).
-        """
-        # How many neighbours need to be hot for the current point to be a heat center point (0.5 == 50%)
-        VALIDITY_THRESHOLD = 0.6
-        hot_points = 0
-        neighbours_on_display_area = []
-        for neighbour in heat_point.neighbours_in_range(2):
-            x = neighbour.x
-            y = neighbour.y
-            height, width = heatmap.shape
-            if 0 <= x < width and 0 <= y < height:
-                neighbours_on_display_area.append(neighbour)
-                if heatmap[y][x] > 0:
-                    hot_points += 1
-        return hot_points >= int(len(neighbours_on_display_area) * VALIDITY_THRESHOLD)
+            eliminated_points = self._eliminate_heat_source(heat_source, heatmap)
+            # The rows and columns that contain eliminated points span the bounding box of the change
+            hot_neighbour_count_map.update(heatmap, np.flatnonzero(eliminated_points.any(axis=0)),
+                                           np.flatnonzero(eliminated_points.any(axis=1)))
 
     def _eliminate_heat_source(self, heat_source, heatmap):
-        marker_mask = self._find_affected_points_from_heat_source(heat_source, heatmap)
-        self._eliminate_points(marker_mask, heatmap)
+        """returns:
+            - A boolean mask of the eliminated points, i.e. the points with a positive mark.
+        """
+        eliminated_points = self._find_affected_points_from_heat_source(heat_source, heatmap) > 0
+        self._eliminate_points(eliminated_points, heatmap)
+        return eliminated_points
 
     @staticmethod
-    def _eliminate_points(marker_mask, heatmap):
-        assert marker_mask.shape == heatmap.shape
-        heatmap[marker_mask > 0] = 0
+    def _eliminate_points(eliminated_points, heatmap):
+        assert eliminated_points.shape == heatmap.shape
+        heatmap[eliminated_points] = 0
 
     @staticmethod
     def _find_affected_points_from_heat_source(heat_source: HeatPoint, heatmap):
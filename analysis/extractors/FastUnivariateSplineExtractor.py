@@ -0,0 +1,114 @@
+import cv2
+import numpy as np
+from scipy.interpolate import UnivariateSpline
+from scipy.spatial import cKDTree
+
+from analysis.HeatPoint import HeatPoint
+from analysis.analysis_utils import map_in_parallel
+from analysis.extractors.UnivariateSplineExtractor import UnivariateSplineExtractor, SMOOTHING_FACTOR, \
+    FINE_GRID_RESOLUTION
+
+# Heat sources closer than this distance are merged into the hotter one
+HEAT_SOURCE_DISTANCE = 10
+
+
+class FastUnivariateSplineExtractor(UnivariateSplineExtractor):
+    """Extracts the same heat sources as the UnivariateSplineExtractor.
+
+    The splines of rows and columns are fitted in batches of lines, in parallel worker processes if jobs is greater
+    than 1. Coinciding row and column maxima are found with a KD-tree of the column maxima instead of comparing
+    every row maximum with every column maximum. Close heat sources are found in a grid of cells of the size
+    of the merge distance instead of scanning all heat sources.
+    """
+    def __init__(self, overwrite=False, jobs=1, batch_size=64):
+        super().__init__(overwrite)
+        self.jobs: int = jobs
+        self.batch_size: int = batch_size
+        self.heat_source_grid: dict[tuple, list[int]] = dict()
+        self.heat_sources_by_number: dict[int, HeatPoint] = dict()
+        self.heat_source_count: int = 0
+
+    def _extract_heat_sources_from_heatmap(self):
+        heatmap = cv2.imread(self.heatmap_path, cv2.IMREAD_GRAYSCALE)
+        assert len(heatmap) > 0
+        row_maxima = [(x, y) for x, y in self._get_line_maxima(heatmap) if heatmap[y, x] != 0]
+        column_maxima = [(x, y) for y, x in self._get_line_maxima(heatmap.T)]
+        if not row_maxima or not column_maxima:
+            return
+
+        # Points with integer coordinates are closer than 2 exactly if they are at most sqrt(2) apart
+        coinciding_counts = cKDTree(column_maxima).query_ball_point(row_maxima, r=1.5, return_length=True)
+
+        self.heat_source_grid = dict()
+        self.heat_sources_by_number = dict()
+        self.heat_source_count = 0
+        for (x, y), coinciding_count in zip(row_maxima, coinciding_counts):
+            row_maximum = HeatPoint(x, y, heatmap[y, x])
+            # A row maximum is considered once for every column maximum it coincides with
+            for _ in range(coinciding_count):
+                self._update_heat_point_list(row_maximum)
+        self.heat_sources.extend(self.heat_sources_by_number.values())
+
+    def _get_line_maxima(self, lines):
+        """returns:
+            - A list of (position in line, line index) of the local maxima of the splines of all lines.
+        """
+        batches = [(start, lines[start:start + self.batch_size]) for start in range(0, len(lines), self.batch_size)]
+        line_maxima = []
+        for batch_maxima in map_in_parallel(_get_local_maxima_of_lines, batches, self.jobs):
+            line_maxima.extend(batch_maxima)
+        return line_maxima
+
+    def _update_heat_point_list(self, new_heat_point):
+        """Updates the heat sources like UnivariateSplineExtractor._update_heat_point_list does.
+        Heat sources are numbered in the order of the heat source list, hence the first close heat source of the list
+        is the close heat source with the lowest number among the heat sources of the neighbouring grid cells.
+        """
+        cell_x = new_heat_point.x // HEAT_SOURCE_DISTANCE
+        cell_y = new_heat_point.y // HEAT_SOURCE_DISTANCE
+        close_heat_source_numbers = [number
+                                     for neighbour_cell_x in range(cell_x - 1, cell_x + 2)
+                                     for neighbour_cell_y in range(cell_y - 1, cell_y + 2)
+                                     for number in self.heat_source_grid.get((neighbour_cell_x, neighbour_cell_y), [])
+                                     if new_heat_point.distance(self.heat_sources_by_number[number])
+                                     < HEAT_SOURCE_DISTANCE]
+        if close_heat_source_numbers:
+            number = min(close_heat_source_numbers)
+            heat_point = self.heat_sources_by_number[number]
+            if new_heat_point.intensity > heat_point.intensity:
+                del self.heat_sources_by_number[number]
+                self.heat_source_grid[(heat_point.x // HEAT_SOURCE_DISTANCE,
+                                       heat_point.y // HEAT_SOURCE_DISTANCE)].remove(number)
+                self._add_heat_source(new_heat_point)
+            return
+        self._add_heat_source(new_heat_point)
+
+    def _add_heat_source(self, heat_point):
+        number = self.heat_source_count
+        self.heat_source_count += 1
+        self.heat_sources_by_number[number] = heat_point
+        self.heat_source_grid.setdefault((heat_point.x // HEAT_SOURCE_DISTANCE,
+                                          heat_point.y // HEAT_SOURCE_DISTANCE), []).append(number)
+
+
+def _get_local_maxima_of_lines(batch):
+    """Fits a spline to each line of a batch of lines and finds its local maxima
+    like UnivariateSplineExtractor._get_local_maxima_by_univariate_spline does. Runs in worker processes.
+
+    args:
+        - batch: A tuple of the index of the first line and the lines.
+    returns:
+        - A list of (position in line, line index) of the local maxima.
+    """
+    start, lines = batch
+    line_x = np.arange(lines.shape[1])
+    # All lines of a batch have the same length, hence the same fine grid
+    x_finer = np.linspace(line_x[0], line_x[-1], FINE_GRID_RESOLUTION)
+    local_maxima = []
+    for index, line in enumerate(lines, start):
+        spline = UnivariateSpline(line_x, line, s=SMOOTHING_FACTOR)
+        y_prime = spline.derivative(n=1)(x_finer)
+        y_double_prime = spline.derivative(n=2)(x_finer)
+        local_maxima_x = x_finer[:-2][(y_prime[1:-1] > 0) & (y_prime[2:] < 0) & (y_double_prime[1:-1] < 0)]
+        local_maxima.extend((int(local_maximum_x), index) for local_maximum_x in local_maxima_x)
+    return local_maxima
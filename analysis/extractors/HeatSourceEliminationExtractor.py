@@ -1,8 +1,14 @@
 import cv2
+import numpy as np
 
 from analysis.Extractor import Extractor
 from analysis.HeatPoint import HeatPoint
-from util import Point, SlidingWindow
+from analysis.HotNeighbourCountMap import HotNeighbourCountMap
+from util import SlidingWindow
+
+# The larger the window, the more of the weaker heat sources will be extinguished
+# The smaller the window, the more artifacts (false positive heat sources) remain
+SLIDING_WINDOW_SIZE = 80
 
 
 class HeatSourceEliminationExtractor(Extractor):
@@ -16,43 +22,28 @@ class HeatSourceEliminationExtractor(Extractor):
 
     def _extract_heat_sources_from_heatmap(self):
         heatmap = cv2.imread(self.heatmap_path, cv2.IMREAD_GRAYSCALE)
-        saved_heatmap = heatmap.copy()
+        hot_neighbour_count_map = HotNeighbourCountMap(heatmap)
         while True:
             _, max_val, _, max_pos = cv2.minMaxLoc(heatmap)
             all_heat_sources_found = max_val == 0
             if all_heat_sources_found:
                 break
             heat_source = HeatPoint(max_pos[0], max_pos[1], int(max_val))
-            if self._is_valid_heat_source(heat_source, heatmap):
+            if hot_neighbour_count_map.is_valid_heat_source(heat_source.x, heat_source.y):
                 self.heat_sources.append(heat_source)
-            self._eliminate_heat_source(heat_source, heatmap)
-
-    @staticmethod
-    def _is_valid_heat_source(heat_point, heatmap):
-        """A heat source is a valid if it spreads heat.
-        To determine if the point spreads heat, we consider all surrounding points in the range
-        of a fixed manhattan distance. For all points that are on the display area, we define a percentage
-        threshold, of how many of these surrounding points on the display area need to be hot (non-black).
-        """
-        # How many neighbours need to be hot for the current point to be a heat center point (0.5 == 50%)
-        VALIDITY_THRESHOLD = 0.6
-        hot_points = 0
-        neighbours_on_display_area = []
-        for neighbour in heat_point.neighbours_in_range(2):
-            x = neighbour.x
-            y = neighbour.y
-            width = heatmap.shape[1]
-            height = heatmap.shape[0]
-            if 0 <= x < width and 0 <= y < height:
-                neighbours_on_display_area.append(neighbour)
-                if heatmap[y][x] > 0:
-                    hot_points += 1
-        return hot_points >= int(len(neighbours_on_display_area) * VALIDITY_THRESHOLD)
+            eliminated_points = self._eliminate_heat_source(heat_source, heatmap)
+            # The rows and columns that contain eliminated points span the bounding box of the change
+            hot_neighbour_count_map.update(heatmap, np.flatnonzero(eliminated_points.any(axis=0)),
+                                           np.flatnonzero(eliminated_points.any(axis=1)))
 
     @staticmethod
     def _eliminate_heat_source(heat_source, heatmap):
-        points_from_heat_sources = HeatSourceEliminationExtractor._find_affected_points_from_heat_source(heat_source, heatmap)
-        HeatSourceEliminationExtractor._eliminate_points(points_from_heat_sources, heatmap)
+        """returns:
+            - A boolean mask of the eliminated points.
+        """
+        affected_points = HeatSourceEliminationExtractor._find_affected_points_from_heat_source(heat_source, heatmap)
+        HeatSourceEliminationExtractor._eliminate_points(affected_points, heatmap)
+        return affected_points
 
     @staticmethod
     def _find_affected_points_from_heat_source(heat_source: HeatPoint, heatmap):
@@ -69,90 +60,61 @@ class HeatSourceEliminationExtractor(Extractor):
 
         We stop point visitations in a direction if the intensity trend, updated with the currently visited point,
         is not negative i.e. if the heat is not decreasing.
+
+        returns:
+            - A boolean mask of the heatmap's shape that is True for the affected points.
         """
-        affected_points = [heat_source.position()]
-        heatmap_width = heatmap.shape[1]
-        heatmap_height = heatmap.shape[0]
-
-        min_difference_x = heat_source.x
-        max_difference_x = heatmap_width - heat_source.x
-        min_difference_y = heat_source.y
-        max_difference_y = heatmap_height - heat_source.y
-
-        positive_x_values = [value for value in range(1, max_difference_x)] if heat_source.x < heatmap_width else []
-        negative_x_values = [value for value in range(-min_difference_x, 0)] if heat_source.x > 0 else []
-        negative_x_values.reverse()
-        positive_y_values = [value for value in range(1, max_difference_y)] if heat_source.y < heatmap_height else []
-        negative_y_values = [value for value in range(-min_difference_y, 0)] if heat_source.y > 0 else []
-        negative_y_values.reverse()
-
-        # The larger the window, the more of the weaker heat sources will be extinguished
-        # The smaller the window, the more artifacts (false positive heat sources) remain
-        sliding_window_size = 80
-        sliding_window_y = SlidingWindow(sliding_window_size)
-        sliding_window_y.append(heat_source)
-        sliding_window_x = SlidingWindow(sliding_window_size)
-        sliding_window_x.append(heat_source)
+        heatmap_height, heatmap_width = heatmap.shape
+        affected_points = np.zeros(heatmap.shape, dtype=bool)
+        affected_points[heat_source.y, heat_source.x] = True
+
+        # The windows hold intensities, the heatmap does not change while points are visited
+        sliding_window_y = SlidingWindow(SLIDING_WINDOW_SIZE)
+        sliding_window_x = SlidingWindow(SLIDING_WINDOW_SIZE)
 
         def is_decreasing_intensity(sliding_window):
             if not sliding_window.is_full:
                 return True
             else:
-                return heatmap[sliding_window.get(0).y][sliding_window.get(0).x] > heatmap[sliding_window.get(-1).y][
-                    sliding_window.get(-1).x]
-
-        def visit_y(positive):
-            sliding_window_y.set_values([heat_source])
-            if positive:
-                y_values = positive_y_values
-            else:
-                y_values = negative_y_values
-            for y_diff in y_values:
-                current_point = Point(heat_source.x, heat_source.y + y_diff)
-                sliding_window_y.append(current_point)
-                if is_decreasing_intensity(sliding_window_y):
-                    affected_points.append(current_point)
-                    visit_positive_x()
-                    visit_negative_x()
-                else:
+                return sliding_window.get(0) > sliding_window.get(-1)
+
+        def visit_y(y_step):
+            column = heatmap[:, heat_source.x].tolist()
+            sliding_window_y.set_values([column[heat_source.y]])
+            y = heat_source.y + y_step
+            while 0 <= y < heatmap_height:
+                sliding_window_y.append(column[y])
+                if not is_decreasing_intensity(sliding_window_y):
                     break
-
-        def visit_positive_y():
-            visit_y(positive=True)
-
-        def visit_negative_y():
-            visit_y(positive=False)
-
-        def visit_x(positive):
-            y_anker_point = sliding_window_y.get(-1)
-            sliding_window_x.set_values([y_anker_point])
-            if positive:
-                x_values = positive_x_values
-            else:
-                x_values = negative_x_values
-            for x_diff in x_values:
-                current_point = Point(heat_source.x + x_diff, y_anker_point.y)
-                sliding_window_x.append(current_point)
-                if is_decreasing_intensity(sliding_window_x):
-                    affected_points.append(current_point)
-                else:
+                affected_points[y, heat_source.x] = True
+                row = heatmap[y].tolist()
+                visit_x(y, row, 1)
+                visit_x(y, row, -1)
+                y += y_step
+
+        def visit_x(y, row, x_step):
+            sliding_window_x.set_values([row[heat_source.x]])
+            x = heat_source.x + x_step
+            while 0 <= x < heatmap_width:
+                sliding_window_x.append(row[x])
+                if not is_decreasing_intensity(sliding_window_x):
                     break
+                x += x_step
+            # The affected points of a row are the points between the heat source's column and the last visited point
+            if x_step > 0:
+                affected_points[y, heat_source.x + 1:x] = True
+            else:
+                affected_points[y, x + 1:heat_source.x] = True
 
-        def visit_positive_x():
-            visit_x(positive=True)
-
-        def visit_negative_x():
-            visit_x(positive=False)
-
-        visit_positive_x()
-        visit_negative_x()
+        heat_source_row = heatmap[heat_source.y].tolist()
+        visit_x(heat_source.y, heat_source_row, 1)
+        visit_x(heat_source.y, heat_source_row, -1)
 
-        visit_positive_y()
-        visit_negative_y()
+        visit_y(1)
+        visit_y(-1)
 
         return affected_points
 
     @staticmethod
-    def _eliminate_points(points, image):
-        for point in points:
-            image[point.y][point.x] = 0
+    def _eliminate_points(affected_points, image):
+        image[affected_points] = 0
@@ -6,6 +6,9 @@ from analysis.Extractor import Extractor
 from analysis.HeatPoint import HeatPoint
 from util import Point
 
+SMOOTHING_FACTOR = 200  # Adjust as needed
+FINE_GRID_RESOLUTION = 2 ** 11  # Adjust as needed (2**8=256)
+
 
 class UnivariateSplineExtractor(Extractor):
     def __init__(self, overwrite=False):
@@ -78,12 +81,10 @@ class UnivariateSplineExtractor(Extractor):
         - a list of local maxima points
         """
         # Fit a spline to the data
-        smoothing_factor = 200  # Adjust as needed
-        spline = UnivariateSpline(x_values, y_values, s=smoothing_factor)
+        spline = UnivariateSpline(x_values, y_values, s=SMOOTHING_FACTOR)
 
         # Evaluate the spline over a finer x range
-        fine_grid_resolution = 2 ** 11  # Adjust as needed (2**8=256)
-        x_finer = np.linspace(min(x_values), max(x_values), fine_grid_resolution)
+        x_finer = np.linspace(min(x_values), max(x_values), FINE_GRID_RESOLUTION)
 
         # Calculate the first and second derivatives of the spline
         y_prime = spline.derivative(n=1)(x_finer)
@@ -0,0 +1,85 @@
+import numpy as np
+
+from analysis.HeatPoint import HeatPoint
+from analysis.extractors.ConcurrentHeatSourceEliminationExtractor import ConcurrentHeatSourceEliminationExtractor
+from analysis.extractors.HeatSourceEliminationExtractor import SLIDING_WINDOW_SIZE
+
+
+class VectorizedHeatSourceEliminationExtractor(ConcurrentHeatSourceEliminationExtractor):
+    """Extracts heat sources like the ConcurrentHeatSourceEliminationExtractor but finds the points affected by
+    a heat source with array operations instead of visiting them one at a time.
+
+    A ray of points, e.g. a row to the right of an axis point, shows a negative trend as long as each point is
+    colder than the point SLIDING_WINDOW_SIZE - 1 points before it. The trends of all rays of a quadrant are
+    compared at once with a shifted view of the quadrant, and each ray is reduced to the index at which its trend
+    breaks. Each quadrant is flipped such that its rays start at the center axes, hence all four quadrants
+    are processed the same way.
+    """
+    def _eliminate_heat_source(self, heat_source, heatmap):
+        # The affected points already are a boolean mask of the points to eliminate
+        affected_points = self._find_affected_points_from_heat_source(heat_source, heatmap)
+        self._eliminate_points(affected_points, heatmap)
+        return affected_points
+
+    @staticmethod
+    def _find_affected_points_from_heat_source(heat_source: HeatPoint, heatmap):
+        """Finds the points the HeatPointVisitor threads would mark positively.
+
+        The visitors mark a point with 1 while the trend of its ray is negative, with -1 where the trend breaks
+        and not at all after that. A point of a quadrant is visited by a row from the y-axis and a column from
+        the x-axis, but only if the axis point the ray starts from has been visited itself, which includes the
+        axis point that broke the trend. A point is eliminated if the sum of its marks is positive.
+
+        returns:
+            - A boolean mask of the heatmap's shape that is True for the points to eliminate.
+        """
+        center_x, center_y = heat_source.x, heat_source.y
+        affected_points = np.zeros(heatmap.shape, dtype=bool)
+        for y_step in [-1, 1]:
+            for x_step in [-1, 1]:
+                # Flipped views of the quadrant including its axes, the heat source is at [0, 0]
+                quadrant = heatmap[center_y::y_step, center_x::x_step]
+                quadrant_affected_points = affected_points[center_y::y_step, center_x::x_step]
+                height, width = quadrant.shape
+
+                x_axis_break = _find_trend_breaks(quadrant[:1, :])[0]
+                y_axis_break = _find_trend_breaks(quadrant[:, :1].T)[0]
+                quadrant_affected_points[0, 1:x_axis_break] = True
+                quadrant_affected_points[1:y_axis_break, 0] = True
+
+                # Only rays from visited axis points, including the point that broke the trend, mark any points
+                row_count = min(y_axis_break, height - 1)
+                column_count = min(x_axis_break, width - 1)
+                row_breaks = _find_trend_breaks(quadrant[1:row_count + 1, :])
+                column_breaks = _find_trend_breaks(quadrant[:, 1:column_count + 1].T)
+
+                # A point is only affected if it is before the break of its row or its column
+                box_height = max(row_count, column_breaks.max(initial=0) - 1)
+                box_width = max(column_count, row_breaks.max(initial=0) - 1)
+                rows = np.arange(1, box_height + 1)[:, np.newaxis]
+                columns = np.arange(1, box_width + 1)
+                row_breaks = np.pad(row_breaks, (0, box_height - row_count))[:, np.newaxis]
+                column_breaks = np.pad(column_breaks, (0, box_width - column_count))
+                quadrant_affected_points[1:box_height + 1, 1:box_width + 1] = (
+                        ((columns < row_breaks) & (rows != column_breaks))
+                        | ((rows < column_breaks) & (columns != row_breaks)))
+        affected_points[center_y, center_x] = True
+        return affected_points
+
+
+def _find_trend_breaks(rays):
+    """Finds where the negative trend of rays breaks, each ray being a row that starts with its first point.
+
+    returns:
+        - The index of the first point of each ray that is not colder than the point SLIDING_WINDOW_SIZE - 1 points
+          before it, or the length of the rays if the trend does not break.
+    """
+    ray_count, ray_length = rays.shape
+    offset = SLIDING_WINDOW_SIZE - 1
+    trend_breaks = np.full(ray_count, ray_length)
+    if ray_length > offset:
+        breaking = rays[:, :ray_length - offset] <= rays[:, offset:]
+        first_breaking = np.argmax(breaking, axis=1)
+        broken = breaking[np.arange(ray_count), first_breaking]
+        trend_breaks[broken] = first_breaking[broken] + offset
+    return trend_breaks
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class EyeSelection(Enum):
+    LEFT = "Left"
+    RIGHT = "Right"
+    AVERAGE = "Average"  # Average of both eyes, or the valid eye if only one eye is valid
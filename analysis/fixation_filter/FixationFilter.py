@@ -2,8 +2,11 @@ import os.path
 import subprocess
 
 from analysis.AnalysisConfiguration import AnalysisConfiguration
-from analysis.analysis_utils import get_movements_file_path
-from analysis.fixation_filter.tobiidata_to_uxidata import convert_tobiidata_to_uxidata
+from analysis.GazeSampleStore import GazeSampleStore
+from analysis.analysis_utils import get_movements_file_path, get_gaze_sample_store_file_path, map_in_parallel
+from analysis.fixation_filter.IVTFixationFilter import IVTFixationFilter
+from analysis.fixation_filter.tobiidata_to_uxidata import convert_tobiidata_to_uxidata, \
+    convert_gaze_samples_to_uxidata
 from config import ANALYSIS_DATA_DIR
 from util import repo_root
 
@@ -13,39 +16,62 @@ class FixationFilter:
         self.config: AnalysisConfiguration = config
         self.GAZE_TOOLKIT_RELEASE_DIR = os.path.join(repo_root, "analysis", "fixation_filter", "Release")
         self.IVT_EXE_PATH = os.path.join(self.GAZE_TOOLKIT_RELEASE_DIR, "i-vt.exe")
+        # Same parameters as the i-vt.exe command
+        self.ivt_fixation_filter = IVTFixationFilter(frequency=120, fillin_max_gap_ms=75, threshold=30,
+                                                     merge_max_gap_ms=75, merge_max_angle=0.5,
+                                                     discard_min_duration_ms=60)
 
     def apply_ivt_fixation_filter(self):
-        if not os.path.exists(self.IVT_EXE_PATH):
+        if not self.config.native_fixation_filter and not os.path.exists(self.IVT_EXE_PATH):
             raise FileNotFoundError(f'I-VT fixation filter executable could not be found ({self.IVT_EXE_PATH})'
                                     f'\nPlease make sure to provide the release binaries of the GazeToolkit '
                                     f'at the following location: {self.GAZE_TOOLKIT_RELEASE_DIR}')
 
-        for pid in self.config.participants:
-            movements_file_path = get_movements_file_path(pid)
-            if not os.path.exists(movements_file_path) or self.config.general_overwrite:
-                print(f"Applying I-VT fixation filter for participant {pid}")
-                participant_data_dir = os.path.join(ANALYSIS_DATA_DIR, str(pid))
-                input_file_path = os.path.join(participant_data_dir, "uxi_data.csv")
-                if not os.path.exists(input_file_path):
-                    print(f"UXI data file for participant {pid} not found, trying to create one ({input_file_path})")
-                    if not convert_tobiidata_to_uxidata(participant_data_dir):
-                        raise FileNotFoundError(f"UXI data file for participant {pid} could not be created")
-                    print(f"Successfully created UXI data file for participant {pid}")
-                output_file_path = os.path.join(participant_data_dir, "movements.csv")
-
-                command = [
-                    self.IVT_EXE_PATH,
-                    input_file_path,
-                    '--timestamp-format', 'ticks:us',
-                    '--frequency', '120',
-                    '--fillin', '--fillin-max-gap', '75',
-                    '--select', 'Average',
-                    '--threshold', '30',
-                    '--merge', '--merge-max-gap', '75', '--merge-max-angle', '0.5',
-                    '--discard', '--discard-min-duration', '60',
-                    '--output', output_file_path
-                ]
-
-                subprocess.run(command, check=True)
+        map_in_parallel(self.apply_ivt_fixation_filter_for_participant, self.config.participants,
+                        self.config.jobs)
 
+    def apply_ivt_fixation_filter_for_participant(self, pid):
+        movements_file_path = get_movements_file_path(pid)
+        if not os.path.exists(movements_file_path) or self.config.general_overwrite:
+            print(f"Applying I-VT fixation filter for participant {pid}")
+            participant_data_dir = os.path.join(ANALYSIS_DATA_DIR, str(pid))
+            output_file_path = os.path.join(participant_data_dir, "movements.csv")
+            gaze_sample_store = GazeSampleStore(get_gaze_sample_store_file_path(pid))
+            if self.config.native_fixation_filter and gaze_sample_store.exists():
+                # Reads the memory-mapped gaze samples directly, no UXI data file is needed
+                self.ivt_fixation_filter.apply_to_gaze_samples(gaze_sample_store.open(), output_file_path)
                 print(f"Successful application of I-VT fixation filter for participant {pid}")
+                return
+
+            input_file_path = os.path.join(participant_data_dir, "uxi_data.csv")
+            if not os.path.exists(input_file_path) and gaze_sample_store.exists():
+                print(f"UXI data file for participant {pid} not found, creating one from the gaze sample store")
+                convert_gaze_samples_to_uxidata(gaze_sample_store.open(), input_file_path)
+            elif not os.path.exists(input_file_path):
+                print(f"UXI data file for participant {pid} not found, trying to create one ({input_file_path})")
+                if not convert_tobiidata_to_uxidata(participant_data_dir):
+                    raise FileNotFoundError(f"UXI data file for participant {pid} could not be created")
+                print(f"Successfully created UXI data file for participant {pid}")
+
+            if self.config.native_fixation_filter:
+                self.ivt_fixation_filter.apply(input_file_path, output_file_path)
+            else:
+                self._apply_ivt_executable(input_file_path, output_file_path)
+
+            print(f"Successful application of I-VT fixation filter for participant {pid}")
+
+    def _apply_ivt_executable(self, input_file_path, output_file_path):
+        command = [
+            self.IVT_EXE_PATH,
+            input_file_path,
+            '--timestamp-format', 'ticks:us',
+            '--frequency', '120',
+            '--fillin', '--fillin-max-gap', '75',
+            '--select', 'Average',
+            '--threshold', '30',
+            '--merge', '--merge-max-gap', '75', '--merge-max-angle', '0.5',
+            '--discard', '--discard-min-duration', '60',
+            '--output', output_file_path
+        ]
+
+        subprocess.run(command, check=True)
@@ -0,0 +1,247 @@
+import numpy as np
+import pandas as pd
+
+from analysis.Movement import Movement, MovementType, write_movements_to_file
+from analysis.fixation_filter.EyeSelection import EyeSelection
+
+UNKNOWN = 0
+FIXATION = 1
+SACCADE = 2
+
+MOVEMENT_TYPES = {UNKNOWN: MovementType.UNKNOWN, FIXATION: MovementType.FIXATION, SACCADE: MovementType.SACCADE}
+
+
+class IVTFixationFilter:
+    """Velocity-threshold identification (I-VT) of fixations in UXI gaze data, following the steps of the
+    GazeToolkit i-vt command line tool:
+    1. Fills in gaps of invalid samples of each eye by linear interpolation, if the gap is short enough.
+    2. Selects the gaze of one eye or the average of both eyes.
+    3. Calculates the angular velocity of each sample over a window of samples around it.
+    4. Classifies samples below the velocity threshold as fixation, the others as saccade.
+    Samples without valid gaze are unknown.
+    5. Merges adjacent fixations that are close in time and angle.
+    6. Discards fixations that are too short, they become unknown.
+
+    Timestamps are given in microseconds and durations of the resulting movements in milliseconds.
+    """
+    def __init__(self, frequency=120, fillin_max_gap_ms=75, eye_selection=EyeSelection.AVERAGE, threshold=30,
+                 window_ms=20, merge_max_gap_ms=75, merge_max_angle=0.5, discard_min_duration_ms=60):
+        self.frequency: int = frequency
+        self.fillin_max_gap_ms: float = fillin_max_gap_ms
+        self.eye_selection: EyeSelection = eye_selection
+        self.threshold: float = threshold
+        self.window_ms: float = window_ms
+        self.merge_max_gap_ms: float = merge_max_gap_ms
+        self.merge_max_angle: float = merge_max_angle
+        self.discard_min_duration_ms: float = discard_min_duration_ms
+
+    def apply(self, input_file_path, output_file_path):
+        """Reads UXI gaze data from the input file and writes the identified movements to the output file.
+        """
+        timestamps, left_eye, right_eye = self.read_uxi_data(input_file_path)
+        movements = self.identify_movements(timestamps, left_eye, right_eye)
+        write_movements_to_file(movements, output_file_path)
+        return movements
+
+    def apply_to_gaze_samples(self, gaze_samples, output_file_path):
+        """Identifies the movements in the gaze samples of a gaze sample store and writes them to the output file.
+        """
+        timestamps, left_eye, right_eye = self.read_gaze_samples(gaze_samples)
+        movements = self.identify_movements(timestamps, left_eye, right_eye)
+        write_movements_to_file(movements, output_file_path)
+        return movements
+
+    @staticmethod
+    def read_gaze_samples(gaze_samples):
+        """Reads the gaze samples the same way they are read from the UXI gaze data they convert to:
+        missing values are 0 and the right eye validity depends on the left pupil validity.
+
+        returns:
+            - The timestamps of all samples.
+            - One dict of arrays for each eye: valid, gaze_2d, gaze_3d, eye_3d, pupil.
+        """
+        timestamps = np.array(gaze_samples["system_time_stamp"], dtype=np.int64)
+        eyes = []
+        for eye in ["left", "right"]:
+            eyes.append(dict(
+                valid=(gaze_samples[f"{eye}_gaze_point_validity"] != 0) & (gaze_samples["left_pupil_validity"] != 0),
+                gaze_2d=np.nan_to_num(gaze_samples[f"{eye}_gaze_point_on_display_area"], nan=0),
+                gaze_3d=np.nan_to_num(gaze_samples[f"{eye}_gaze_point_in_user_coordinate_system"], nan=0),
+                eye_3d=np.nan_to_num(gaze_samples[f"{eye}_gaze_origin_in_user_coordinate_system"], nan=0),
+                pupil=np.nan_to_num(gaze_samples[f"{eye}_pupil_diameter"], nan=0)[:, None],
+            ))
+        return timestamps, eyes[0], eyes[1]
+
+    @staticmethod
+    def read_uxi_data(file_path):
+        """returns:
+            - The timestamps of all samples.
+            - One dict of arrays for each eye: valid, gaze_2d, gaze_3d, eye_3d, pupil.
+        """
+        uxi_data = pd.read_csv(file_path)
+        timestamps = uxi_data["Timestamp"].to_numpy(dtype=np.int64)
+        eyes = []
+        for eye in ["Left", "Right"]:
+            eyes.append(dict(
+                valid=(uxi_data[f"{eye}Validity"] == "Valid").to_numpy(),
+                gaze_2d=uxi_data[[f"{eye}GazePoint2DX", f"{eye}GazePoint2DY"]].to_numpy(dtype=np.float64),
+                gaze_3d=uxi_data[[f"{eye}GazePoint3DX", f"{eye}GazePoint3DY", f"{eye}GazePoint3DZ"]].to_numpy(dtype=np.float64),
+                eye_3d=uxi_data[[f"{eye}EyePosition3DX", f"{eye}EyePosition3DY", f"{eye}EyePosition3DZ"]].to_numpy(dtype=np.float64),
+                pupil=uxi_data[[f"{eye}PupilDiameter"]].to_numpy(dtype=np.float64),
+            ))
+        return timestamps, eyes[0], eyes[1]
+
+    def identify_movements(self, timestamps, left_eye, right_eye) -> list[Movement]:
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        if len(timestamps) == 0:
+            return []
+        left_eye = self._fill_in(timestamps, left_eye)
+        right_eye = self._fill_in(timestamps, right_eye)
+        gaze = self._select_eye(left_eye, right_eye)
+
+        velocities = self._angular_velocities(timestamps, gaze)
+        classes = np.full(len(timestamps), UNKNOWN, dtype=np.int8)
+        valid_velocities = ~np.isnan(velocities)
+        classes[valid_velocities] = np.where(velocities[valid_velocities] < self.threshold, FIXATION, SACCADE)
+
+        self._merge_fixations(timestamps, gaze, classes)
+        self._discard_short_fixations(timestamps, classes)
+        return self._to_movements(timestamps, gaze, classes)
+
+    def _fill_in(self, timestamps, eye):
+        valid = eye["valid"]
+        sample_indices = np.arange(len(valid))
+        previous_valid = np.maximum.accumulate(np.where(valid, sample_indices, -1))
+        next_valid = np.minimum.accumulate(np.where(valid, sample_indices, len(valid))[::-1])[::-1]
+        fillable = ~valid & (previous_valid >= 0) & (next_valid < len(valid))
+        fillable[fillable] = (timestamps[next_valid[fillable]] - timestamps[previous_valid[fillable]]
+                              <= self.fillin_max_gap_ms * 1000)
+        if not fillable.any():
+            return eye
+
+        before = previous_valid[fillable]
+        after = next_valid[fillable]
+        fraction = ((timestamps[fillable] - timestamps[before]) / (timestamps[after] - timestamps[before]))[:, None]
+        filled_eye = dict(valid=valid | fillable)
+        for name in ["gaze_2d", "gaze_3d", "eye_3d", "pupil"]:
+            values = eye[name].copy()
+            values[fillable] = values[before] + fraction * (values[after] - values[before])
+            filled_eye[name] = values
+        return filled_eye
+
+    def _select_eye(self, left_eye, right_eye):
+        if self.eye_selection == EyeSelection.LEFT:
+            return left_eye
+        if self.eye_selection == EyeSelection.RIGHT:
+            return right_eye
+
+        left_valid = left_eye["valid"]
+        right_valid = right_eye["valid"]
+        both_valid = (left_valid & right_valid)[:, None]
+        only_left_valid = (left_valid & ~right_valid)[:, None]
+        gaze = dict(valid=left_valid | right_valid)
+        for name in ["gaze_2d", "gaze_3d", "eye_3d", "pupil"]:
+            average = (left_eye[name] + right_eye[name]) / 2
+            gaze[name] = np.where(both_valid, average, np.where(only_left_valid, left_eye[name], right_eye[name]))
+        return gaze
+
+    def _angular_velocities(self, timestamps, gaze):
+        """Calculates the angle between the gaze directions at the first and the last sample of the window around
+        each sample, as seen from the eye position of the sample, per second.
+        Samples without a valid window have no velocity (nan).
+        """
+        half_window_us = self.window_ms * 1000 / 2
+        window_starts = np.searchsorted(timestamps, timestamps - half_window_us, side='left')
+        window_ends = np.searchsorted(timestamps, timestamps + half_window_us, side='right') - 1
+
+        valid = gaze["valid"]
+        eye_3d = gaze["eye_3d"]
+        start_directions = gaze["gaze_3d"][window_starts] - eye_3d
+        end_directions = gaze["gaze_3d"][window_ends] - eye_3d
+        angles = _angles_between(start_directions, end_directions)
+        window_durations_s = (timestamps[window_ends] - timestamps[window_starts]) / 1e6
+
+        velocities = np.full(len(timestamps), np.nan)
+        measurable = valid & valid[window_starts] & valid[window_ends] & (window_durations_s > 0)
+        velocities[measurable] = angles[measurable] / window_durations_s[measurable]
+        return velocities
+
+    def _merge_fixations(self, timestamps, gaze, classes):
+        """Merges a fixation into the previous fixation if the time between both and the angle between their average
+        gaze directions is small enough. Samples between merged fixations become part of the fixation.
+        """
+        runs = _runs(classes)
+        previous_fixation = None
+        for start, end in runs:
+            if classes[start] != FIXATION:
+                continue
+            if previous_fixation is not None:
+                previous_start, previous_end = previous_fixation
+                gap_ms = (timestamps[start] - timestamps[previous_end - 1]) / 1000
+                if gap_ms <= self.merge_max_gap_ms and \
+                        self._fixation_angle(gaze, previous_fixation, (start, end)) <= self.merge_max_angle:
+                    classes[previous_end:start] = FIXATION
+                    previous_fixation = (previous_start, end)
+                    continue
+            previous_fixation = (start, end)
+
+    @staticmethod
+    def _fixation_angle(gaze, fixation1, fixation2):
+        averages = []
+        for start, end in [fixation1, fixation2]:
+            valid = gaze["valid"][start:end]
+            averages.append((gaze["gaze_3d"][start:end][valid].mean(axis=0), gaze["eye_3d"][start:end][valid].mean(axis=0)))
+        (gaze_3d1, eye_3d1), (gaze_3d2, eye_3d2) = averages
+        eye_3d = (eye_3d1 + eye_3d2) / 2
+        return _angles_between((gaze_3d1 - eye_3d)[None], (gaze_3d2 - eye_3d)[None])[0]
+
+    def _discard_short_fixations(self, timestamps, classes):
+        for start, end in _runs(classes):
+            if classes[start] == FIXATION and self._duration_ms(timestamps, start, end) < self.discard_min_duration_ms:
+                classes[start:end] = UNKNOWN
+
+    def _duration_ms(self, timestamps, start, end):
+        """The duration of samples [start, end) lasts until the sample after the last one is due.
+        """
+        return (timestamps[end - 1] - timestamps[start]) / 1000 + 1000 / self.frequency
+
+    def _to_movements(self, timestamps, gaze, classes) -> list[Movement]:
+        movements = []
+        for start, end in _runs(classes):
+            movement_type = MOVEMENT_TYPES[int(classes[start])]
+            duration = self._duration_ms(timestamps, start, end)
+            valid = gaze["valid"][start:end]
+            if movement_type == MovementType.FIXATION and valid.any():
+                gaze_2d = gaze["gaze_2d"][start:end][valid].mean(axis=0)
+                gaze_3d = gaze["gaze_3d"][start:end][valid].mean(axis=0)
+                eye_3d = gaze["eye_3d"][start:end][valid].mean(axis=0)
+                pupil = gaze["pupil"][start:end][valid].mean()
+                movements.append(Movement(int(timestamps[start]), movement_type, duration,
+                                          float(gaze_2d[0]), float(gaze_2d[1]),
+                                          float(gaze_3d[0]), float(gaze_3d[1]), float(gaze_3d[2]),
+                                          float(eye_3d[0]), float(eye_3d[1]), float(eye_3d[2]), float(pupil)))
+            else:
+                movements.append(Movement(int(timestamps[start]), movement_type, duration,
+                                          None, None, None, None, None, None, None, None, None))
+        return movements
+
+
+def _runs(classes):
+    """returns:
+        - List of (start, end) tuples of consecutive samples of the same class, end is exclusive.
+    """
+    if len(classes) == 0:
+        return []
+    boundaries = np.flatnonzero(np.diff(classes)) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(classes)]))
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def _angles_between(vectors1, vectors2):
+    """Angles in degrees between the row vectors of both arrays.
+    """
+    norms = np.linalg.norm(vectors1, axis=1) * np.linalg.norm(vectors2, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cosines = np.einsum('ij,ij->i', vectors1, vectors2) / norms
+    return np.degrees(np.arccos(np.clip(cosines, -1, 1)))
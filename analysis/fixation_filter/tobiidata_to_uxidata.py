@@ -1,4 +1,8 @@
+import itertools
 import os
+import time
+
+import numpy as np
 
 from util import repo_root
 
@@ -33,127 +37,120 @@ def _tobii_tsv_header():
             'right_gaze_origin_validity')
 
 
-def _validity(gaze_point_validity, pupil_validity):
-    if int(gaze_point_validity) and int(pupil_validity):
-        return "Valid"
-    return "Invalid"
-
-
-def _get_value(gaze_data, variable):
-    src_header = {name: index for index, name in enumerate(_tobii_tsv_header().split("\t"))}
-    return gaze_data[src_header[variable]]
-
-
-def _str_to_tup(s):
-    return tuple(s.replace("(", "")
-                 .replace(")", "")
-                 .replace(" ", "")
-                 .split(","))
-
-
-def _replace_nan(lst):
-    rep = "0"
-    clean_list = []
-    for item in lst:
-        if isinstance(item, tuple):
-            clean_item = _handle_nan_tuple(item, rep)
-        else:
-            if item == "nan":
-                clean_item = rep
-            else:
-                clean_item = item
-        clean_list.append(clean_item)
-    return clean_list
-
-
-def _handle_nan_tuple(tup, rep):
-    clean_elements = []
-    for element in tup:
-        if element == "nan":
-            clean_elements.append(rep)
-        else:
-            clean_elements.append(element)
-    return f"({str(tuple(clean_elements)).replace(' ', '')})"
-
-
-def convert_tobiidata_to_uxidata(participant_data_dir):
+def convert_tobiidata_to_uxidata(participant_data_dir, chunk_size=50000):
+    """Converts the Tobii gaze data of a participant to UXI gaze data, one chunk of lines at a time.
+    All fields of a chunk are split at once and converted column by column,
+    the output is the same as converting line by line.
+    """
     source_file_path = os.path.join(participant_data_dir, "tobii_data.tsv")
     if not os.path.exists(source_file_path):
         print(f"Tobii data file for participant not found ({source_file_path})")
         return False
     destination_file_path = os.path.join(participant_data_dir, "uxi_data.csv")
+    t0 = time.perf_counter()
+    row_count = 0
     with open(source_file_path, 'r') as src_file:
         with open(destination_file_path, 'w') as res_file:
             res_file.write(_uxi_csv_header()+"\n")
             src_header_line = src_file.readline()  # Read off the header line
-            for line in src_file:
-                gaze_data = line.split("\t")
-                # Timestamp from Tobii SDK given in microseconds (ticks:us)
-                # us_to_hh_mm_ss_ms(1034954093) -> 00:17:14:954.093
-                timestamp = _get_value(gaze_data, "system_time_stamp")
-                # Left eye measures
-                left_validity = _validity(_get_value(gaze_data, "left_gaze_point_validity"),
-                                         _get_value(gaze_data, "left_pupil_validity"))
-                left_gaze_point_on_display_area = _str_to_tup(_get_value(
-                    gaze_data, "left_gaze_point_on_display_area"))
-                left_gaze_point_2d_x = left_gaze_point_on_display_area[0]
-                left_gaze_point_2d_y = left_gaze_point_on_display_area[1]
-                left_gaze_point_in_user_coordinate_system = _str_to_tup(
-                    _get_value(gaze_data, "left_gaze_point_in_user_coordinate_system"))
-                left_gaze_point_3d_x = left_gaze_point_in_user_coordinate_system[0]
-                left_gaze_point_3d_y = left_gaze_point_in_user_coordinate_system[1]
-                left_gaze_point_3d_z = left_gaze_point_in_user_coordinate_system[2]
-                left_gaze_origin_in_user_coordinate_system = _str_to_tup(
-                    _get_value(gaze_data, "left_gaze_origin_in_user_coordinate_system"))
-                left_eye_position_3d_x = left_gaze_origin_in_user_coordinate_system[0]
-                left_eye_position_3d_y = left_gaze_origin_in_user_coordinate_system[1]
-                left_eye_position_3d_z = left_gaze_origin_in_user_coordinate_system[2]
-                left_pupil_diameter = _get_value(gaze_data, "left_pupil_diameter")
-                # Right eye measures
-                right_validity = _validity(_get_value(gaze_data, "right_gaze_point_validity"),
-                                          _get_value(gaze_data, "left_pupil_validity"))
-                right_gaze_point_on_display_area = _str_to_tup(
-                    _get_value(gaze_data, "right_gaze_point_on_display_area"))
-                right_gaze_point_2d_x = right_gaze_point_on_display_area[0]
-                right_gaze_point_2d_y = right_gaze_point_on_display_area[1]
-                right_gaze_point_in_user_coordinate_system = _str_to_tup(
-                    _get_value(gaze_data, "right_gaze_point_in_user_coordinate_system"))
-                right_gaze_point_3d_x = right_gaze_point_in_user_coordinate_system[0]
-                right_gaze_point_3d_y = right_gaze_point_in_user_coordinate_system[1]
-                right_gaze_point_3d_z = right_gaze_point_in_user_coordinate_system[2]
-                right_gaze_origin_in_user_coordinate_system = _str_to_tup(
-                    _get_value(gaze_data, "right_gaze_origin_in_user_coordinate_system"))
-                right_eye_position_3d_x = right_gaze_origin_in_user_coordinate_system[0]
-                right_eye_position_3d_y = right_gaze_origin_in_user_coordinate_system[1]
-                right_eye_position_3d_z = right_gaze_origin_in_user_coordinate_system[2]
-                right_pupil_diameter = _get_value(gaze_data, "right_pupil_diameter")
-
-                uxi_variables = [
-                    timestamp,
-                    left_validity,
-                    left_gaze_point_2d_x,
-                    left_gaze_point_2d_y,
-                    left_gaze_point_3d_x,
-                    left_gaze_point_3d_y,
-                    left_gaze_point_3d_z,
-                    left_eye_position_3d_x,
-                    left_eye_position_3d_y,
-                    left_eye_position_3d_z,
-                    left_pupil_diameter,
-                    right_validity,
-                    right_gaze_point_2d_x,
-                    right_gaze_point_2d_y,
-                    right_gaze_point_3d_x,
-                    right_gaze_point_3d_y,
-                    right_gaze_point_3d_z,
-                    right_eye_position_3d_x,
-                    right_eye_position_3d_y,
-                    right_eye_position_3d_z,
-                    right_pupil_diameter
-                ]
-
-                uxi_variables = _replace_nan(uxi_variables)
-                uxi_data = ",".join(uxi_variables)
-                res_file.write(uxi_data+"\n")
+            while True:
+                lines = list(itertools.islice(src_file, chunk_size))
+                if not lines:
+                    break
+                res_file.write("\n".join(_tobii_fields_to_uxi_lines(split_tobii_lines(lines))) + "\n")
+                row_count += len(lines)
+    _print_throughput(row_count, time.perf_counter() - t0)
+    return True
 
+
+def convert_gaze_samples_to_uxidata(gaze_samples, destination_file_path, chunk_size=50000):
+    """Converts gaze samples of a gaze sample store to UXI gaze data.
+    Numbers are formatted like Python formats them, hence the output is the same as converting the Tobii data file.
+    """
+    t0 = time.perf_counter()
+    with open(destination_file_path, 'w') as res_file:
+        res_file.write(_uxi_csv_header()+"\n")
+        for chunk_start in range(0, len(gaze_samples), chunk_size):
+            fields = _gaze_samples_to_tobii_fields(gaze_samples[chunk_start:chunk_start + chunk_size])
+            res_file.write("\n".join(_tobii_fields_to_uxi_lines(fields)) + "\n")
+    _print_throughput(len(gaze_samples), time.perf_counter() - t0)
     return True
+
+
+def _print_throughput(row_count, seconds):
+    print(f"Converted {row_count} rows of Tobii data in {seconds:.2f} s ({row_count / max(seconds, 1e-9):.0f} rows/s)")
+
+
+def split_tobii_lines(lines):
+    """Splits lines of Tobii gaze data into a 2D array of field strings.
+    Removing the tuple brackets and spaces leaves every tuple element as a field of its own,
+    see tobii_field_columns for the position of each variable.
+    """
+    chunk = "".join(lines).translate(_TUPLE_CHARACTERS).replace("\t", ",").splitlines()
+    return np.array(",".join(chunk).split(","), dtype=object).reshape(len(chunk), -1)
+
+
+def _gaze_samples_to_tobii_fields(gaze_samples):
+    columns = tobii_field_columns()
+    fields = np.empty((len(gaze_samples), TOBII_FIELD_COUNT), dtype=object)
+    for name, column in columns.items():
+        values = gaze_samples[name]
+        if values.ndim == 1:
+            fields[:, column] = values.astype(str)
+        else:
+            for element in range(values.shape[1]):
+                fields[:, column + element] = values[:, element].astype(str)
+    return fields
+
+
+def _tobii_fields_to_uxi_lines(fields):
+    columns = tobii_field_columns()
+
+    def column(name):
+        return fields[:, columns[name]]
+
+    uxi_columns = [column("system_time_stamp")]
+    for eye in ["left", "right"]:
+        # The right validity is based on the left pupil validity, as it always has been
+        uxi_columns.append(_validity_column(column(f"{eye}_gaze_point_validity"), column("left_pupil_validity")))
+        uxi_columns.append(fields[:, columns[f"{eye}_gaze_point_on_display_area"] + np.arange(2)])
+        uxi_columns.append(fields[:, columns[f"{eye}_gaze_point_in_user_coordinate_system"] + np.arange(3)])
+        uxi_columns.append(fields[:, columns[f"{eye}_gaze_origin_in_user_coordinate_system"] + np.arange(3)])
+        uxi_columns.append(column(f"{eye}_pupil_diameter"))
+
+    uxi_fields = np.column_stack(uxi_columns)
+    uxi_fields[uxi_fields == "nan"] = "0"
+    return [",".join(row) for row in uxi_fields.tolist()]
+
+
+_TUPLE_CHARACTERS = str.maketrans("", "", "() ")
+
+
+def tobii_variable_size(name):
+    """returns:
+        - The number of elements of a Tobii variable, 1 for scalars.
+    """
+    if name.endswith("_on_display_area"):
+        return 2
+    if name.endswith("_coordinate_system"):
+        return 3
+    return 1
+
+
+def tobii_field_columns():
+    """Maps each Tobii variable to the index of its first field once tuples are split into their elements.
+    """
+    columns = dict()
+    index = 0
+    for name in _tobii_tsv_header().split("\t"):
+        columns[name] = index
+        index += tobii_variable_size(name)
+    return columns
+
+
+TOBII_FIELD_COUNT = sum(tobii_variable_size(name) for name in _tobii_tsv_header().split("\t"))
+
+
+def _validity_column(gaze_point_validity, pupil_validity):
+    valid = (gaze_point_validity.astype(np.int64) != 0) & (pupil_validity.astype(np.int64) != 0)
+    return np.where(valid, "Valid", "Invalid").astype(object)
@@ -0,0 +1,54 @@
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Counters and stage timings of the current process, collected into the run report of an analysis run
+_counters: dict[str, int] = dict()
+_stage_seconds: dict[str, float] = dict()
+
+
+def count(name, amount=1):
+    _counters[name] = _counters.get(name, 0) + amount
+
+
+@contextmanager
+def stage(name):
+    """Times a stage of the analysis. Stages that are entered several times add up.
+    """
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stage_seconds[name] = _stage_seconds.get(name, 0) + time.perf_counter() - t0
+
+
+def get_counters():
+    return dict(_counters)
+
+
+def merge_counters(counters):
+    """Adds counters collected in another process, e.g. a worker process, to the counters of this process.
+    """
+    for name, amount in counters.items():
+        count(name, amount)
+
+
+def reset_run_report():
+    _counters.clear()
+    _stage_seconds.clear()
+
+
+def create_run_report(**run_attributes):
+    """returns:
+        - A dict of the given run attributes, the stage timings in seconds and the counters.
+    """
+    return dict(created=datetime.now().isoformat(timespec='seconds'), **run_attributes,
+                stage_seconds=dict(_stage_seconds), counters=dict(sorted(_counters.items())))
+
+
+def write_run_report(file_path, **run_attributes):
+    run_report = create_run_report(**run_attributes)
+    with open(file_path, 'w') as run_report_file:
+        json.dump(run_report, run_report_file, indent=4)
+    return run_report
@@ -14,9 +14,5 @@ TODO It is possible to modularize working steps more than they currently are
 
 TODO Move generation of directed masks and directed heatmaps forward to where all the other analysis images are plotted.
 
-TODO When generating accumulated directed masks, always save the latest accumulated mask in case there is a crash.
-
-TODO In the Accumulator, _influence_vector can be numpy vectorized.
-
 TODO Averaging the vectors in grid in the Plotter can be numpy vectorized.
 """
\ No newline at end of file
@@ -16,8 +16,11 @@ ACCUMULATED_PLOT_DIR = os.path.join(ANALYSIS_PLOT_DIR, "accumulated")
 ACCUMULATED_SALIENCE_PLOT_DIR = os.path.join(ACCUMULATED_PLOT_DIR, 'salience_considered')
 
 VALIDATION_RESULT_FILE_PATH = os.path.join(ANALYSIS_DATA_DIR, 'validation_result.pickle')
+VALIDATION_RESULT_DB_PATH = os.path.join(ANALYSIS_DATA_DIR, 'validation_result.sqlite')
+RUN_REPORT_PATH = os.path.join(ANALYSIS_DATA_DIR, 'run_report.json')
 
 ACCUMULATED_DIRECTED_MASK_DIR = os.path.join(ANALYSIS_DATA_DIR, "accumulated_directed_masks")
+DIRECTED_MASK_STORE_DIR = os.path.join(ANALYSIS_DATA_DIR, "directed_mask_stores")
 
 ORIGINAL_IMG_DIR = os.path.join(EXPERIMENT_DIR, "images", "original")
 SALIENCE_IMG_DIR = os.path.join(ANALYSIS_DIR, "saliency_maps")
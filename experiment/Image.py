@@ -1,7 +1,7 @@
 import os.path
 import re
 
-from util import repo_root, list_files
+from util import repo_root, get_directory_index
 
 SPECIFICATIONS = {
     1: ["Community", "E-Commerce", "Entertainment", "Informational"],
@@ -24,13 +24,14 @@ class Image:
         assert not reference or reference and self.task_id == 3
 
     def __infer_url(self):
-        image_dir = os.path.join(repo_root, "experiment", "images")
+        images_dir = os.path.join(repo_root, "experiment", "images")
+        image_dir = images_dir
         if self.reference:
             image_dir = os.path.join(image_dir, "reference")
         else:
             image_dir = os.path.join(image_dir, "original")
         image_dir = os.path.join(image_dir, f"task{self.task_id}")
-        files = list_files(image_dir)
+        files = get_directory_index(images_dir).list_files(image_dir)
         image_url = os.path.join(image_dir, files[self.id])
         return image_url
 
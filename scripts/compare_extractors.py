@@ -12,6 +12,7 @@ from analysis.extractors.BivariateSplineExtractor import BivariateSplineExtracto
 from analysis.extractors.ConcurrentHeatSourceEliminationExtractor import ConcurrentHeatSourceEliminationExtractor
 from analysis.extractors.HeatSourceEliminationExtractor import HeatSourceEliminationExtractor
 from analysis.extractors.UnivariateSplineExtractor import UnivariateSplineExtractor
+from analysis.extractors.VectorizedHeatSourceEliminationExtractor import VectorizedHeatSourceEliminationExtractor
 from config import SALIENCE_IMG_DIR, ANALYSIS_PLOT_DIR
 from util import list_files, find_file_in_dir, repo_root
 
@@ -74,7 +75,8 @@ if __name__ == '__main__':
     hse_extractor = HeatSourceEliminationExtractor(overwrite)
     uvs_extractor = UnivariateSplineExtractor(overwrite)
     bvs_extractor = BivariateSplineExtractor(overwrite)
-    extractors = [chse_extractor, hse_extractor, bvs_extractor]
+    vhse_extractor = VectorizedHeatSourceEliminationExtractor(overwrite)
+    extractors = [chse_extractor, vhse_extractor, hse_extractor, bvs_extractor]
 
     heatmap_paths = get_saliency_map_paths()
     #heatmap_paths = get_observation_heatmap_paths()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import time
+import unittest
+
+from analysis.ArtifactCache import ArtifactCache
+
+
+class ArtifactCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        self.input_file_path = os.path.join(self.temporary_dir.name, "movements.csv")
+        self.artifact_path = os.path.join(self.temporary_dir.name, "heatmap.png")
+        self.derived_artifact_path = os.path.join(self.temporary_dir.name, "heat-sources.csv")
+        self._write(self.input_file_path, "fixations")
+
+    def tearDown(self):
+        self.temporary_dir.cleanup()
+
+    @staticmethod
+    def _write(file_path, content):
+        with open(file_path, 'w') as file:
+            file.write(content)
+
+    def _build(self, artifact_cache, artifact_path, input_file_path, parameters):
+        key = artifact_cache.key([input_file_path], parameters)
+        if artifact_cache.is_current(artifact_path, key):
+            return False
+        self._write(artifact_path, f"built from {input_file_path}")
+        artifact_cache.record(artifact_path, key)
+        return True
+
+    def _build_all(self, parameters=None):
+        artifact_cache = ArtifactCache()
+        built_artifact = self._build(artifact_cache, self.artifact_path, self.input_file_path, parameters or {})
+        built_derived_artifact = self._build(artifact_cache, self.derived_artifact_path, self.artifact_path, {})
+        return built_artifact, built_derived_artifact
+
+    def test_only_artifacts_with_changed_inputs_are_rebuilt(self):
+        self.assertEqual((True, True), self._build_all())
+        self.assertEqual((False, False), self._build_all())
+
+        # Rewriting the same content keeps the key
+        time.sleep(0.01)
+        self._write(self.input_file_path, "fixations")
+        self.assertEqual((False, False), self._build_all())
+
+        self._write(self.input_file_path, "other fixations")
+        self.assertEqual((True, True), self._build_all())
+        self.assertEqual((True, True), self._build_all({"sigma": 30}))
+
+    def test_changed_artifacts_are_hashed(self):
+        self._build_all()
+        time.sleep(0.01)
+        self._write(self.artifact_path, "edited by hand")
+        self.assertTrue(self._build(ArtifactCache(), self.derived_artifact_path, self.artifact_path, {}))
+
+    def test_artifacts_changed_after_their_key_are_rebuilt(self):
+        artifact_cache = ArtifactCache()
+        self._build(artifact_cache, self.artifact_path, self.input_file_path, {})
+        time.sleep(0.01)
+        # An interrupted rebuild leaves a partial artifact next to the key of the previous build
+        self._write(self.artifact_path, "partially built")
+        self.assertTrue(self._build(artifact_cache, self.artifact_path, self.input_file_path, {}))
+        self.assertFalse(self._build(artifact_cache, self.artifact_path, self.input_file_path, {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
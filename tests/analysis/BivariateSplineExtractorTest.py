@@ -0,0 +1,32 @@
+import unittest
+
+import numpy as np
+
+from analysis.extractors.BivariateSplineExtractor import BivariateSplineExtractor
+
+
+def find_local_maxima_by_scanning(values, neighborhood_size):
+    maxima = []
+    for i in range(neighborhood_size, values.shape[0] - neighborhood_size):
+        for j in range(neighborhood_size, values.shape[1] - neighborhood_size):
+            neighborhood = values[i - neighborhood_size:i + neighborhood_size + 1,
+                                  j - neighborhood_size:j + neighborhood_size + 1]
+            if values[i, j] == np.max(neighborhood):
+                maxima.append((i, j))
+    return maxima
+
+
+class BivariateSplineExtractorTest(unittest.TestCase):
+    def test_local_maxima_match_scanning_every_neighborhood(self):
+        rng = np.random.default_rng(21)
+        # Rounded values produce plateaus where several points are maxima of their neighborhood
+        values = np.round(rng.random((60, 45)) * 20)
+        values[30:33, 10:14] = 25
+        for neighborhood_size in [0, 1, 5, 30]:
+            i_maxima, j_maxima = BivariateSplineExtractor.find_local_maxima(values, neighborhood_size)
+            self.assertEqual(find_local_maxima_by_scanning(values, neighborhood_size),
+                             list(zip(i_maxima.tolist(), j_maxima.tolist())))
+
+
+if __name__ == '__main__':
+    unittest.main()
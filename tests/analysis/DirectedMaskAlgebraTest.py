@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+
+from analysis.directed_mask_algebra import sum_directed_masks, subtract_directed_masks, add_directed_masks, \
+    scale_directed_mask, accumulate_directed_mask
+
+
+class DirectedMaskAlgebraTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.directed_masks = [rng.normal(size=(9, 16, 2)) for _ in range(3)]
+
+    def test_sum_matches_vector_wise_addition(self):
+        expected = self.directed_masks[0].copy()
+        for directed_mask in self.directed_masks[1:]:
+            for y in range(expected.shape[0]):
+                for x in range(expected.shape[1]):
+                    expected[y, x] = (expected[y, x][0] + directed_mask[y, x][0], expected[y, x][1] + directed_mask[y, x][1])
+        self.assertTrue(np.array_equal(expected, sum_directed_masks(self.directed_masks)))
+
+    def test_sum_does_not_modify_masks(self):
+        first_directed_mask = self.directed_masks[0].copy()
+        sum_directed_masks(self.directed_masks)
+        self.assertTrue(np.array_equal(first_directed_mask, self.directed_masks[0]))
+
+    def test_accumulation_and_subtraction_integrity(self):
+        dm1, dm2, _ = self.directed_masks
+        accumulated_directed_mask = add_directed_masks(dm1, dm2)
+        self.assertTrue(np.allclose(dm1, subtract_directed_masks(accumulated_directed_mask, dm2), atol=1e-12))
+        self.assertTrue(np.allclose(dm2, subtract_directed_masks(accumulated_directed_mask, dm1), atol=1e-12))
+
+    def test_in_place_accumulation_and_scale(self):
+        dm1, dm2, _ = self.directed_masks
+        accumulated_directed_mask = dm1.copy()
+        returned_directed_mask = accumulate_directed_mask(accumulated_directed_mask, dm2)
+        self.assertIs(accumulated_directed_mask, returned_directed_mask)
+        self.assertTrue(np.array_equal(dm1 + dm2, accumulated_directed_mask))
+        self.assertTrue(np.array_equal(dm1 * 0.5, scale_directed_mask(dm1, 0.5)))
+
+    def test_shape_mismatch_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            sum_directed_masks([np.zeros((2, 2, 2)), np.zeros((2, 3, 2))])
+        with self.assertRaises(ValueError):
+            subtract_directed_masks(np.zeros((2, 2, 2)), np.zeros((3, 2, 2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from analysis.DirectedMaskFormat import DirectedMaskFormat, load_directed_mask
+from analysis.DirectedMaskPrecision import DirectedMaskPrecision
+
+
+class DirectedMaskFormatTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        self.directed_mask = rng.normal(scale=50, size=(16, 24, 2))
+        self.temporary_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temporary_dir.cleanup()
+
+    def _round_trip(self, mask_format):
+        file_path = os.path.join(self.temporary_dir.name, f"mask{mask_format.file_suffix}{mask_format.file_extension}")
+        mask_format.save(file_path, self.directed_mask)
+        return load_directed_mask(file_path)
+
+    def test_default_format_is_lossless(self):
+        mask_format = DirectedMaskFormat()
+        self.assertEqual("", mask_format.file_suffix)
+        self.assertTrue(np.array_equal(self.directed_mask, self._round_trip(mask_format)))
+
+    def test_compressed_reduced_precision_round_trip(self):
+        mask_format = DirectedMaskFormat(precision=DirectedMaskPrecision.FLOAT16, compressed=True)
+        self.assertEqual("-f16", mask_format.file_suffix)
+        self.assertEqual(".npz", mask_format.file_extension)
+        loaded_directed_mask = self._round_trip(mask_format)
+        self.assertEqual(np.float16, loaded_directed_mask.dtype)
+        self.assertTrue(np.allclose(self.directed_mask, loaded_directed_mask, rtol=1e-3, atol=1e-2))
+
+    def test_vectors_beyond_float16_range_are_rejected(self):
+        mask_format = DirectedMaskFormat(precision=DirectedMaskPrecision.FLOAT16)
+        self.directed_mask[3, 5] = (70000, 0)
+        with self.assertRaises(ValueError):
+            mask_format.encode(self.directed_mask)
+        self.assertTrue(np.isfinite(DirectedMaskFormat(precision=DirectedMaskPrecision.FLOAT32)
+                                    .encode(self.directed_mask)).all())
+
+    def test_downsampling_averages_blocks(self):
+        mask_format = DirectedMaskFormat(downsampling_factor=4)
+        self.assertEqual("-d4", mask_format.file_suffix)
+        encoded_directed_mask = mask_format.encode(self.directed_mask)
+        self.assertEqual((4, 6, 2), encoded_directed_mask.shape)
+        self.assertTrue(np.allclose(self.directed_mask[:4, :4].mean(axis=(0, 1)), encoded_directed_mask[0, 0]))
+        self.assertEqual(self.directed_mask.shape, mask_format.upsample(encoded_directed_mask).shape)
+
+    def test_downsampling_requires_divisible_size(self):
+        with self.assertRaises(ValueError):
+            DirectedMaskFormat(downsampling_factor=5).encode(self.directed_mask)
+
+
+if __name__ == '__main__':
+    unittest.main()
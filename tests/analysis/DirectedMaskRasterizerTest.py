@@ -0,0 +1,41 @@
+import random
+import unittest
+
+import numpy as np
+
+from analysis.DirectedMaskRasterizer import DirectedMaskRasterizer
+from analysis.SimpleFixation import SimpleFixation
+from analysis.WeightType import WeightType
+from tests.analysis.per_pixel_rasterizer import rasterize_per_pixel
+
+
+class DirectedMaskRasterizerTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.width = 160
+        self.height = 90
+        self.fixations = []
+        timestamp_us = 0
+        for _ in range(12):
+            duration = rng.uniform(60, 600)
+            self.fixations.append(SimpleFixation(timestamp_us, duration, rng.random(), rng.random()))
+            timestamp_us += int(duration * 1000) + rng.randint(10000, 50000)
+
+    def test_rasterizer_matches_per_pixel_rasterizer(self):
+        rasterizer = DirectedMaskRasterizer()
+        for weight_type in WeightType:
+            with self.subTest(weight_type=weight_type):
+                directed_mask = rasterizer.create_directed_mask(self.width, self.height, self.fixations, weight_type)
+                strokes = rasterizer.get_directed_strokes(self.width, self.height, self.fixations, weight_type)
+                per_pixel_mask = rasterize_per_pixel(self.width, self.height, strokes)
+                self.assertEqual((self.height, self.width, 2), directed_mask.shape)
+                self.assertTrue(np.array_equal(per_pixel_mask, directed_mask))
+
+    def test_empty_scanpath_creates_zero_mask(self):
+        directed_mask = DirectedMaskRasterizer().create_directed_mask(self.width, self.height, [], WeightType.ORDER)
+        self.assertEqual((self.height, self.width, 2), directed_mask.shape)
+        self.assertFalse(directed_mask.any())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from analysis.DirectedMaskStore import DirectedMaskStore
+
+
+class DirectedMaskStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(6)
+        self.directed_masks = [rng.normal(size=(6, 8, 2)) for _ in range(3)]
+        self.entries = []
+        for index, directed_mask in enumerate(self.directed_masks):
+            file_path = os.path.join(self.temporary_dir.name, f"{index}-directed-mask.npy")
+            np.save(file_path, directed_mask)
+            self.entries.append((index + 1, index, file_path))
+        self.store_file_path = os.path.join(self.temporary_dir.name, "task-id-1-directed-mask-store.npy")
+
+    def tearDown(self):
+        self.temporary_dir.cleanup()
+
+    def test_store_returns_memory_mapped_masks(self):
+        directed_mask_store = DirectedMaskStore(self.store_file_path)
+        self.assertFalse(directed_mask_store.is_current(self.entries))
+        directed_mask_store.build(self.entries)
+        self.assertTrue(directed_mask_store.is_current(self.entries))
+
+        directed_mask_store.open()
+        self.assertEqual(3, len(directed_mask_store))
+        self.assertIn((2, 1), directed_mask_store)
+        for pid, exploration_id, _ in self.entries:
+            directed_mask = directed_mask_store.get(pid, exploration_id)
+            self.assertIsInstance(directed_mask.base, np.memmap)
+            self.assertFalse(directed_mask.flags.writeable)
+            self.assertTrue(np.array_equal(self.directed_masks[exploration_id], directed_mask))
+
+    def test_changed_source_outdates_store(self):
+        directed_mask_store = DirectedMaskStore(self.store_file_path)
+        directed_mask_store.build(self.entries)
+        self.assertFalse(directed_mask_store.is_current(self.entries[:2]))
+
+        file_path = self.entries[0][2]
+        os.utime(file_path, ns=(0, 0))
+        self.assertFalse(directed_mask_store.is_current(self.entries))
+
+
+if __name__ == '__main__':
+    unittest.main()
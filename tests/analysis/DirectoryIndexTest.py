@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from util import DirectoryIndex, list_files
+
+
+class DirectoryIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        self.directory = self.temporary_dir.name
+        for relative_path in ["a.png", os.path.join("task1", "c.png"), os.path.join("task1", "b.png"),
+                              os.path.join("task1", "a.png")]:
+            self._create_file(relative_path)
+
+    def tearDown(self):
+        self.temporary_dir.cleanup()
+
+    def _create_file(self, relative_path):
+        file_path = os.path.join(self.directory, relative_path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        open(file_path, 'w').close()
+
+    def test_finds_files_like_a_directory_walk(self):
+        directory_index = DirectoryIndex(self.directory)
+        self.assertEqual(os.path.join(self.directory, "a.png"), directory_index.find_file("a.png"))
+        self.assertEqual(os.path.join(self.directory, "task1", "b.png"), directory_index.find_file("b.png"))
+        self.assertIsNone(directory_index.find_file("d.png"))
+
+        task_dir = os.path.join(self.directory, "task1")
+        self.assertEqual(list_files(task_dir), directory_index.list_files(task_dir))
+        self.assertEqual(list_files(self.directory), directory_index.list_files(self.directory))
+
+    def test_changed_files_are_found(self):
+        directory_index = DirectoryIndex(self.directory)
+        directory_index.build()
+        self._create_file(os.path.join("task2", "d.png"))
+        self.assertEqual(os.path.join(self.directory, "task2", "d.png"), directory_index.find_file("d.png"))
+
+        os.remove(os.path.join(self.directory, "a.png"))
+        self.assertEqual(os.path.join(self.directory, "task1", "a.png"), directory_index.find_file("a.png"))
+
+    def test_missing_files_are_looked_up_again_once_a_directory_changed(self):
+        directory_index = DirectoryIndex(self.directory)
+        self.assertIsNone(directory_index.find_file("d.png"))
+        directory_mtimes = directory_index.directory_mtimes
+        self.assertIsNone(directory_index.find_file("d.png"))
+        self.assertIs(directory_mtimes, directory_index.directory_mtimes)
+
+        self._create_file(os.path.join("task1", "d.png"))
+        task_dir = os.path.join(self.directory, "task1")
+        stat = os.stat(task_dir)
+        os.utime(task_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        self.assertEqual(os.path.join(task_dir, "d.png"), directory_index.find_file("d.png"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from analysis.HeatPoint import HeatPoint
+from analysis.extractors.FastUnivariateSplineExtractor import FastUnivariateSplineExtractor, _get_local_maxima_of_lines
+from analysis.extractors.UnivariateSplineExtractor import UnivariateSplineExtractor
+
+
+class FastUnivariateSplineExtractorTest(unittest.TestCase):
+    def test_heat_sources_are_merged_like_scanning_the_list(self):
+        rng = np.random.default_rng(25)
+        extractor = UnivariateSplineExtractor()
+        extractor.heat_sources = []
+        fast_extractor = FastUnivariateSplineExtractor()
+        # Clustered points, some of them repeated, to merge and replace heat sources often
+        centers = rng.integers(0, 200, (15, 2))
+        for _ in range(2000):
+            x, y = centers[rng.integers(len(centers))] + rng.integers(-12, 13, 2)
+            heat_point = HeatPoint(int(x), int(y), int(rng.integers(1, 256)))
+            for _ in range(rng.integers(1, 3)):
+                extractor._update_heat_point_list(heat_point)
+                fast_extractor._update_heat_point_list(heat_point)
+        self.assertEqual([heat_point.to_tuple() for heat_point in extractor.heat_sources],
+                         [heat_point.to_tuple() for heat_point in fast_extractor.heat_sources_by_number.values()])
+
+    def test_line_maxima_match_fitting_each_line(self):
+        rng = np.random.default_rng(26)
+        heatmap = cv2.GaussianBlur((rng.random((12, 300)) * 255).astype(np.uint8), (0, 0), 8)
+        expected = [(int(local_maximum.x), index) for index, line in enumerate(heatmap)
+                    for local_maximum in UnivariateSplineExtractor._get_local_maxima_by_univariate_spline(
+                        np.arange(len(line)), line)]
+        self.assertEqual(expected, _get_local_maxima_of_lines((0, heatmap)))
+
+
+if __name__ == '__main__':
+    unittest.main()
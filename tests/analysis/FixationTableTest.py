@@ -0,0 +1,66 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from analysis.FixationTable import FixationTable, FIXATION_ATTRIBUTES
+from analysis.Movement import Movement, write_movements_to_file
+from analysis.analysis_utils import parse_fixations
+from tests.analysis.synthetic_data import create_movements
+
+
+class FixationTableTest(unittest.TestCase):
+    def setUp(self):
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        self.movements_file_path = os.path.join(self.temporary_dir.name, "movements.csv")
+        write_movements_to_file(create_movements(random.Random(13), 500), self.movements_file_path)
+
+    def tearDown(self):
+        self.temporary_dir.cleanup()
+
+    def test_parsed_fixations_match_movements(self):
+        with open(self.movements_file_path, 'r') as movements_file:
+            movements_file.readline()
+            expected = [movement for movement in map(Movement.from_csv, movements_file) if movement.is_fixation()
+                        and 0 <= movement.average_gaze_point2d_x <= 1 and 0 <= movement.average_gaze_point2d_y <= 1]
+
+        fixations = parse_fixations(self.movements_file_path)
+        self.assertEqual(len(expected), len(fixations))
+        for expected_fixation, fixation in zip(expected, fixations):
+            self.assertTrue(fixation.is_fixation())
+            for attribute in FIXATION_ATTRIBUTES:
+                self.assertEqual(getattr(expected_fixation, attribute), getattr(fixation, attribute))
+
+    def test_rows_are_views(self):
+        fixations = parse_fixations(self.movements_file_path)
+        copied_fixations = fixations.copy()
+        copied_fixations[-1].duration = 42.5
+        self.assertEqual(42.5, copied_fixations.durations[-1])
+        self.assertNotEqual(42.5, fixations[-1].duration)
+
+        later_fixations = fixations[fixations.timestamps_us > fixations[10].timestamp_us]
+        self.assertIsInstance(later_fixations, FixationTable)
+        self.assertEqual(len(fixations) - 11, len(later_fixations))
+        self.assertEqual(fixations[11].timestamp_us, later_fixations[0].timestamp_us)
+
+    def test_time_range_is_found_by_binary_search(self):
+        fixations = parse_fixations(self.movements_file_path)
+        timestamps_us = fixations.timestamps_us
+        shuffled_fixations = fixations[np.random.default_rng(14).permutation(len(fixations))]
+        for start_us, end_us in [(timestamps_us[3], timestamps_us[40]), (timestamps_us[3] + 1, timestamps_us[40] - 1),
+                                 (0, timestamps_us[-1] + 1), (timestamps_us[40], timestamps_us[3])]:
+            expected = timestamps_us[(start_us < timestamps_us) & (timestamps_us < end_us)]
+            np.testing.assert_array_equal(expected, fixations.between(start_us, end_us).timestamps_us)
+            np.testing.assert_array_equal(expected, np.sort(shuffled_fixations.between(start_us, end_us).timestamps_us))
+
+    def test_written_difference_fixations_are_parsed_again(self):
+        fixations = parse_fixations(self.movements_file_path)
+        rewritten_file_path = os.path.join(self.temporary_dir.name, "difference_fixations.csv")
+        write_movements_to_file(FixationTable.concatenate([fixations[:5], fixations[5:]]), rewritten_file_path)
+        np.testing.assert_array_equal(fixations.fixations, parse_fixations(rewritten_file_path).fixations)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+import numpy as np
+
+from analysis.GaussianHeatmapRenderer import GaussianHeatmapRenderer
+
+
+class GaussianHeatmapRendererTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(8)
+        self.plot_size = (640, 400)
+        self.x_y_intensity_list = [(rng.random(), rng.random(), float(rng.integers(80, 900))) for _ in range(20)]
+        # Heat points on the frame borders and corners are reflected back into the frame
+        self.x_y_intensity_list += [(0, 0, 150.0), (1, 1, 300.0), (0.001, 0.999, 200.0), (0.5, 0, 100.0)]
+        self.renderer = GaussianHeatmapRenderer(sigma=45)
+
+    def test_splatted_heatmap_matches_blurred_heatmap(self):
+        blurred_heatmap = self.renderer.render_blurred(self.plot_size, self.x_y_intensity_list)
+        splatted_heatmap = self.renderer.render_splatted(self.plot_size, self.x_y_intensity_list)
+        self.assertEqual(np.float64, splatted_heatmap.dtype)
+        self.assertLess(np.abs(blurred_heatmap - splatted_heatmap).max() / blurred_heatmap.max(), 1e-12)
+
+    def test_render_switches_to_blur_for_many_heat_points(self):
+        renderer = GaussianHeatmapRenderer(sigma=45, splat_point_limit=10)
+        self.assertTrue(np.array_equal(renderer.render_blurred(self.plot_size, self.x_y_intensity_list),
+                                       renderer.render(self.plot_size, self.x_y_intensity_list)))
+        self.assertFalse(renderer.render(self.plot_size, []).any())
+
+
+if __name__ == '__main__':
+    unittest.main()
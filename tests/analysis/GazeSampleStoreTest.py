@@ -0,0 +1,73 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from analysis.GazeSampleStore import GazeSampleStore
+from analysis.fixation_filter.IVTFixationFilter import IVTFixationFilter
+from analysis.fixation_filter.tobiidata_to_uxidata import convert_tobiidata_to_uxidata, \
+    convert_gaze_samples_to_uxidata, _tobii_tsv_header
+from tests.analysis.synthetic_data import create_tobii_line
+
+
+class GazeSampleStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        self.tobii_data_file_path = os.path.join(self.temporary_dir.name, "tobii_data.tsv")
+        rng = random.Random(12)
+        lines = [create_tobii_line(rng, 1034954093 + index * 8333) for index in range(300)]
+        with open(self.tobii_data_file_path, 'w') as tobii_file:
+            tobii_file.write(_tobii_tsv_header() + "\n" + "\n".join(lines) + "\n")
+        self.store = GazeSampleStore(os.path.join(self.temporary_dir.name, "gaze_samples.npy"))
+
+    def tearDown(self):
+        self.temporary_dir.cleanup()
+
+    def test_import_is_lossless_and_memory_mapped(self):
+        self.assertFalse(self.store.is_current(self.tobii_data_file_path))
+        self.store.import_tobii_data(self.tobii_data_file_path, chunk_size=64)
+        self.assertTrue(self.store.is_current(self.tobii_data_file_path))
+
+        gaze_samples = self.store.open()
+        self.assertIsInstance(gaze_samples, np.memmap)
+        self.assertEqual(300, len(gaze_samples))
+        self.assertEqual((300, 2), gaze_samples["left_gaze_point_on_display_area"].shape)
+
+        store_uxi_data_file_path = os.path.join(self.temporary_dir.name, "store_uxi_data.csv")
+        convert_gaze_samples_to_uxidata(gaze_samples, store_uxi_data_file_path, chunk_size=64)
+        convert_tobiidata_to_uxidata(self.temporary_dir.name)
+        with open(store_uxi_data_file_path, 'r') as store_uxi_file, \
+                open(os.path.join(self.temporary_dir.name, "uxi_data.csv"), 'r') as uxi_file:
+            self.assertEqual(uxi_file.read(), store_uxi_file.read())
+
+    def test_gaze_samples_are_read_like_uxi_data(self):
+        self.store.import_tobii_data(self.tobii_data_file_path)
+        convert_tobiidata_to_uxidata(self.temporary_dir.name)
+        expected = IVTFixationFilter.read_uxi_data(os.path.join(self.temporary_dir.name, "uxi_data.csv"))
+        actual = IVTFixationFilter.read_gaze_samples(self.store.open())
+
+        np.testing.assert_array_equal(expected[0], actual[0])
+        for expected_eye, actual_eye in zip(expected[1:], actual[1:]):
+            np.testing.assert_array_equal(expected_eye["valid"], actual_eye["valid"])
+            # pandas parses the UXI data with its fast float parser, which may be off by one ulp
+            for name in ["gaze_2d", "gaze_3d", "eye_3d", "pupil"]:
+                np.testing.assert_allclose(expected_eye[name], actual_eye[name], rtol=1e-12)
+
+    def test_outdated_schema(self):
+        self.store.import_tobii_data(self.tobii_data_file_path)
+        with open(self.store.schema_file_path, 'r') as schema_file:
+            schema = json.load(schema_file)
+        schema["schema_version"] = 0
+        with open(self.store.schema_file_path, 'w') as schema_file:
+            json.dump(schema, schema_file)
+
+        self.assertFalse(self.store.is_current(self.tobii_data_file_path))
+        with self.assertRaises(ValueError):
+            self.store.open()
+
+
+if __name__ == '__main__':
+    unittest.main()
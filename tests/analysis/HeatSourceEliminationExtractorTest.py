@@ -0,0 +1,110 @@
+import os
+import unittest
+
+import cv2
+import numpy as np
+
+from analysis.HeatPoint import HeatPoint
+from analysis.extractors.HeatSourceEliminationExtractor import HeatSourceEliminationExtractor, SLIDING_WINDOW_SIZE
+from util import Point, SlidingWindow
+
+
+def find_affected_points_by_point_walk(heat_source: HeatPoint, heatmap):
+    """The former point walk that looks up the intensity of every Point in the sliding windows.
+
+    returns:
+        - A list of the affected points.
+    """
+    affected_points = [heat_source.position()]
+    heatmap_height, heatmap_width = heatmap.shape
+
+    positive_x_values = list(range(1, heatmap_width - heat_source.x))
+    negative_x_values = list(range(-1, -heat_source.x - 1, -1))
+    positive_y_values = list(range(1, heatmap_height - heat_source.y))
+    negative_y_values = list(range(-1, -heat_source.y - 1, -1))
+
+    sliding_window_y = SlidingWindow(SLIDING_WINDOW_SIZE)
+    sliding_window_y.append(heat_source)
+    sliding_window_x = SlidingWindow(SLIDING_WINDOW_SIZE)
+    sliding_window_x.append(heat_source)
+
+    def is_decreasing_intensity(sliding_window):
+        if not sliding_window.is_full:
+            return True
+        else:
+            return heatmap[sliding_window.get(0).y][sliding_window.get(0).x] > heatmap[sliding_window.get(-1).y][
+                sliding_window.get(-1).x]
+
+    def visit_y(y_values):
+        sliding_window_y.set_values([heat_source])
+        for y_diff in y_values:
+            current_point = Point(heat_source.x, heat_source.y + y_diff)
+            sliding_window_y.append(current_point)
+            if is_decreasing_intensity(sliding_window_y):
+                affected_points.append(current_point)
+                visit_x(positive_x_values)
+                visit_x(negative_x_values)
+            else:
+                break
+
+    def visit_x(x_values):
+        y_anker_point = sliding_window_y.get(-1)
+        sliding_window_x.set_values([y_anker_point])
+        for x_diff in x_values:
+            current_point = Point(heat_source.x + x_diff, y_anker_point.y)
+            sliding_window_x.append(current_point)
+            if is_decreasing_intensity(sliding_window_x):
+                affected_points.append(current_point)
+            else:
+                break
+
+    visit_x(positive_x_values)
+    visit_x(negative_x_values)
+
+    visit_y(positive_y_values)
+    visit_y(negative_y_values)
+
+    return affected_points
+
+
+def to_mask(points, shape):
+    mask = np.zeros(shape, dtype=bool)
+    for point in points:
+        mask[point.y, point.x] = True
+    return mask
+
+
+class HeatSourceEliminationExtractorTest(unittest.TestCase):
+    def test_affected_points_match_point_walk(self):
+        rng = np.random.default_rng(24)
+        for _ in range(40):
+            width, height = rng.integers(1, 250, 2)
+            heatmap = cv2.GaussianBlur((rng.random((height, width)) * 255).astype(np.uint8), (0, 0),
+                                       int(rng.integers(1, 8)))
+            x = int(rng.choice([0, width - 1, rng.integers(0, width)]))
+            y = int(rng.choice([0, height - 1, rng.integers(0, height)]))
+            heat_source = HeatPoint(x, y, int(heatmap[y, x]))
+
+            affected_points = HeatSourceEliminationExtractor._find_affected_points_from_heat_source(heat_source,
+                                                                                                  heatmap)
+            np.testing.assert_array_equal(
+                to_mask(find_affected_points_by_point_walk(heat_source, heatmap), heatmap.shape), affected_points)
+
+    def test_eliminated_heat_sources_match_point_walk(self):
+        test_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        heatmap = cv2.imread(os.path.join(test_dir, "test_resources", "heatmap.png"), cv2.IMREAD_GRAYSCALE)
+        point_walk_heatmap = heatmap.copy()
+        for _ in range(25):
+            _, max_val, _, max_pos = cv2.minMaxLoc(heatmap)
+            heat_source = HeatPoint(max_pos[0], max_pos[1], int(max_val))
+            eliminated_points = HeatSourceEliminationExtractor._eliminate_heat_source(heat_source, heatmap)
+
+            point_walk_mask = to_mask(find_affected_points_by_point_walk(heat_source, point_walk_heatmap),
+                                      heatmap.shape)
+            point_walk_heatmap[point_walk_mask] = 0
+            np.testing.assert_array_equal(point_walk_mask, eliminated_points)
+            np.testing.assert_array_equal(point_walk_heatmap, heatmap)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+
+from analysis.HeatPoint import HeatPoint
+from analysis.HotNeighbourCountMap import HotNeighbourCountMap
+
+
+def is_valid_heat_source_by_visiting_neighbours(heat_point, heatmap):
+    hot_points = 0
+    neighbours_on_display_area = 0
+    height, width = heatmap.shape
+    for neighbour in heat_point.neighbours_in_range(2):
+        if 0 <= neighbour.x < width and 0 <= neighbour.y < height:
+            neighbours_on_display_area += 1
+            if heatmap[neighbour.y][neighbour.x] > 0:
+                hot_points += 1
+    return hot_points >= int(neighbours_on_display_area * 0.6)
+
+
+class HotNeighbourCountMapTest(unittest.TestCase):
+    def test_validity_matches_visiting_neighbours_while_points_are_eliminated(self):
+        rng = np.random.default_rng(23)
+        heatmap = (rng.random((40, 60)) * 255 * (rng.random((40, 60)) > 0.2)).astype(np.uint8)
+        hot_neighbour_count_map = HotNeighbourCountMap(heatmap)
+        for _ in range(10):
+            for y in range(heatmap.shape[0]):
+                for x in range(heatmap.shape[1]):
+                    self.assertEqual(is_valid_heat_source_by_visiting_neighbours(HeatPoint(x, y, 0), heatmap),
+                                     hot_neighbour_count_map.is_valid_heat_source(x, y), (x, y))
+
+            # Eliminate a random set of points within a random box, including points that were cold already
+            x_start, y_start = rng.integers(0, 50), rng.integers(0, 30)
+            eliminated_points = np.zeros(heatmap.shape, dtype=bool)
+            eliminated_points[y_start:y_start + rng.integers(1, 20), x_start:x_start + rng.integers(1, 20)] = True
+            eliminated_points &= rng.random(heatmap.shape) > 0.3
+            heatmap[eliminated_points] = 0
+            eliminated_ys, eliminated_xs = np.nonzero(eliminated_points)
+            hot_neighbour_count_map.update(heatmap, eliminated_xs, eliminated_ys)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from analysis.Movement import Movement, MovementType
+from analysis.fixation_filter.IVTFixationFilter import IVTFixationFilter
+from analysis.fixation_filter.tobiidata_to_uxidata import _uxi_csv_header
+from config import TEST_RESOURCES_DIR
+
+IVT_RESOURCES_DIR = os.path.join(TEST_RESOURCES_DIR, "ivt")
+SCREEN_SIZE_MM = (510, 290)
+EYE_DISTANCE_MM = 600
+
+
+def create_uxi_data(file_path, segments, invalid_ranges_ms=(), frequency=120):
+    """Writes UXI gaze data that follows the given segments of (movement type, duration_ms, normalized x, y).
+    The gaze rests on the point of a fixation and moves linearly to the point of a saccade.
+    """
+    lines = [_uxi_csv_header()]
+    timestamp_us = 1000000
+    position = np.array(segments[0][2:], dtype=np.float64)
+    for movement_type, duration_ms, x, y in segments:
+        sample_count = round(duration_ms * frequency / 1000)
+        start = position
+        for sample in range(sample_count):
+            if movement_type == MovementType.SACCADE:
+                position = start + (np.array((x, y)) - start) * (sample + 1) / sample_count
+            else:
+                position = np.array((x, y))
+            elapsed_ms = (timestamp_us - 1000000) / 1000
+            valid = not any(start_ms <= elapsed_ms < end_ms for start_ms, end_ms in invalid_ranges_ms)
+            lines.append(_uxi_line(timestamp_us, position, valid))
+            timestamp_us += round(1e6 / frequency)
+    with open(file_path, 'w') as file:
+        file.write("\n".join(lines) + "\n")
+
+
+def _uxi_line(timestamp_us, position, valid):
+    gaze_3d = ((position[0] - 0.5) * SCREEN_SIZE_MM[0], (0.5 - position[1]) * SCREEN_SIZE_MM[1], 0)
+    values = [str(timestamp_us)]
+    for eye_offset_mm in [-30, 30]:
+        if valid:
+            values += ["Valid", str(position[0]), str(position[1])] + [str(value) for value in gaze_3d]
+            values += [str(eye_offset_mm), "0", str(EYE_DISTANCE_MM), "3.5"]
+        else:
+            values += ["Invalid"] + ["0"] * 9
+    return ",".join(values)
+
+
+class IVTFixationFilterTest(unittest.TestCase):
+    def setUp(self):
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        self.input_file_path = os.path.join(self.temporary_dir.name, "uxi_data.csv")
+        self.output_file_path = os.path.join(self.temporary_dir.name, "movements.csv")
+
+    def tearDown(self):
+        self.temporary_dir.cleanup()
+
+    def test_identifies_synthetic_fixations(self):
+        segments = [
+            (MovementType.FIXATION, 300, 0.3, 0.4),
+            (MovementType.SACCADE, 40, 0.7, 0.6),
+            (MovementType.FIXATION, 300, 0.7, 0.6),  # With a blink that is filled in
+            (MovementType.SACCADE, 30, 0.5, 0.2),
+            (MovementType.FIXATION, 40, 0.5, 0.2),  # Too short, hence discarded
+            (MovementType.SACCADE, 30, 0.2, 0.8),
+            (MovementType.FIXATION, 200, 0.2, 0.8),
+        ]
+        create_uxi_data(self.input_file_path, segments, invalid_ranges_ms=[(450, 500)])
+        IVTFixationFilter().apply(self.input_file_path, self.output_file_path)
+
+        with open(self.output_file_path, 'r') as movements_file:
+            movements_file.readline()
+            movements = [Movement.from_csv(line) for line in movements_file]
+        fixations = [movement for movement in movements if movement.is_fixation()]
+        self.assertEqual(3, len(fixations))
+        for fixation, (_, duration_ms, x, y) in zip(fixations, [segments[0], segments[2], segments[6]]):
+            self.assertAlmostEqual(x, fixation.average_gaze_point2d_x, places=6)
+            self.assertAlmostEqual(y, fixation.average_gaze_point2d_y, places=6)
+            # The velocity window blurs the borders of a fixation by up to two samples
+            self.assertLess(abs(duration_ms - fixation.duration), 2 * 1000 / 120 + 1)
+        self.assertIn(MovementType.UNKNOWN, [movement.movement_type for movement in movements])
+
+    def test_merges_fixations_interrupted_by_noise(self):
+        # Two outlier samples in between two fixations at almost the same point
+        segments = [(MovementType.FIXATION, 200, 0.4, 0.4), (MovementType.FIXATION, 17, 0.6, 0.4),
+                    (MovementType.FIXATION, 200, 0.4001, 0.4)]
+        create_uxi_data(self.input_file_path, segments)
+        movements = IVTFixationFilter().apply(self.input_file_path, self.output_file_path)
+        fixations = [movement for movement in movements if movement.is_fixation()]
+        self.assertEqual(1, len(fixations))
+        self.assertEqual(1, len(movements))
+
+    @unittest.skipUnless(os.path.exists(os.path.join(IVT_RESOURCES_DIR, "uxi_data.csv"))
+                         and os.path.exists(os.path.join(IVT_RESOURCES_DIR, "movements.csv")),
+                         "Requires i-vt.exe reference output in tests/test_resources/ivt")
+    def test_parity_with_gaze_toolkit(self):
+        # The reference movements.csv is the output of the GazeToolkit i-vt.exe for the reference uxi_data.csv
+        movements = IVTFixationFilter().apply(os.path.join(IVT_RESOURCES_DIR, "uxi_data.csv"), self.output_file_path)
+        fixations = [movement for movement in movements if movement.is_fixation()]
+        with open(os.path.join(IVT_RESOURCES_DIR, "movements.csv"), 'r') as movements_file:
+            movements_file.readline()
+            reference_fixations = [movement for movement in map(Movement.from_csv, movements_file) if movement.is_fixation()]
+
+        self.assertEqual(len(reference_fixations), len(fixations))
+        sample_interval_ms = 1000 / 120
+        for fixation, reference_fixation in zip(fixations, reference_fixations):
+            self.assertLessEqual(abs(fixation.timestamp_us - reference_fixation.timestamp_us), sample_interval_ms * 1000)
+            self.assertLessEqual(abs(fixation.duration - reference_fixation.duration), 2 * sample_interval_ms)
+            self.assertAlmostEqual(reference_fixation.average_gaze_point2d_x, fixation.average_gaze_point2d_x, places=2)
+            self.assertAlmostEqual(reference_fixation.average_gaze_point2d_y, fixation.average_gaze_point2d_y, places=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
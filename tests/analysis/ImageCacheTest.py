@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from analysis.ImageCache import ImageCache
+
+
+class ImageCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        self.image = np.random.default_rng(17).integers(0, 256, size=(30, 50, 3), dtype=np.uint8)
+        self.png_path = os.path.join(self.temporary_dir.name, "image.png")
+        self.jpg_path = os.path.join(self.temporary_dir.name, "image.jpg")
+        cv2.imwrite(self.png_path, self.image)
+        cv2.imwrite(self.jpg_path, self.image)
+
+    def tearDown(self):
+        self.temporary_dir.cleanup()
+
+    def test_size_is_read_without_decoding_pngs(self):
+        image_cache = ImageCache()
+        self.assertEqual((50, 30), image_cache.get_size(self.png_path))
+        self.assertEqual(0, image_cache.decoded_count)
+        self.assertEqual((50, 30), image_cache.get_size(self.jpg_path))
+        self.assertEqual(1, image_cache.decoded_count)
+
+    def test_images_are_decoded_once(self):
+        image_cache = ImageCache(max_images=1)
+        image = image_cache.read(self.png_path)
+        np.testing.assert_array_equal(self.image, image)
+        image[:] = 0
+        np.testing.assert_array_equal(self.image, image_cache.read(self.png_path))
+        self.assertEqual(1, image_cache.decoded_count)
+
+        image_cache.read(self.jpg_path)
+        image_cache.read(self.png_path)
+        self.assertEqual(3, image_cache.decoded_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import os
+import unittest
+
+from analysis.analysis_utils import map_in_parallel
+
+
+def _square_with_pid(value):
+    return value * value, os.getpid()
+
+
+class MapInParallelTest(unittest.TestCase):
+    def test_results_keep_the_order_of_the_items(self):
+        items = list(range(20, 0, -1))
+        serial_results = map_in_parallel(_square_with_pid, items)
+        parallel_results = map_in_parallel(_square_with_pid, items, jobs=3)
+        self.assertEqual([value * value for value in items], [result for result, _ in parallel_results])
+        self.assertEqual({os.getpid()}, {pid for _, pid in serial_results})
+        self.assertNotIn(os.getpid(), {pid for _, pid in parallel_results})
+
+    def test_errors_of_workers_are_raised(self):
+        with self.assertRaises(ZeroDivisionError):
+            map_in_parallel(lambda value: 1 / value, [1, 0], jobs=1)
+        with self.assertRaises(TypeError):
+            map_in_parallel(_square_with_pid, [1, None, 2], jobs=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import random
+import tempfile
+import unittest
+
+from analysis.Movement import write_movements_to_file
+from analysis.analysis_utils import parse_fixations, parse_explorations, get_parse_cache_info, clear_parse_cache
+from tests.analysis.synthetic_data import create_movements, write_explorations
+
+
+class ParseCacheTest(unittest.TestCase):
+    def setUp(self):
+        clear_parse_cache()
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        self.movements_file_path = os.path.join(self.temporary_dir.name, "movements.csv")
+        self.explorations_file_path = os.path.join(self.temporary_dir.name, "explorations.tsv")
+
+    def tearDown(self):
+        self.temporary_dir.cleanup()
+        clear_parse_cache()
+
+    def test_fixations_are_parsed_once_per_file_state(self):
+        write_movements_to_file(create_movements(random.Random(15), 100), self.movements_file_path)
+        fixations = parse_fixations(self.movements_file_path)
+        self.assertIs(fixations, parse_fixations(self.movements_file_path))
+        self.assertEqual({"hits": 1, "misses": 1}, _hits_and_misses(get_parse_cache_info()["fixations"]))
+        with self.assertRaises(ValueError):
+            fixations[0].duration = 0
+
+        write_movements_to_file(create_movements(random.Random(16), 120), self.movements_file_path)
+        self.assertIsNot(fixations, parse_fixations(self.movements_file_path))
+        self.assertEqual({"hits": 1, "misses": 2}, _hits_and_misses(get_parse_cache_info()["fixations"]))
+
+    def test_explorations_are_parsed_once_per_file_state(self):
+        write_explorations(self.explorations_file_path, 3)
+        explorations = parse_explorations(self.explorations_file_path)
+        explorations.pop()
+        self.assertEqual(3, len(parse_explorations(self.explorations_file_path)))
+        self.assertEqual({"hits": 1, "misses": 1}, _hits_and_misses(get_parse_cache_info()["explorations"]))
+
+
+def _hits_and_misses(cache_info):
+    return {"hits": cache_info["hits"], "misses": cache_info["misses"]}
+
+
+if __name__ == '__main__':
+    unittest.main()
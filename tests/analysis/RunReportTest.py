@@ -0,0 +1,60 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from analysis.ProgressReporter import ProgressReporter
+from analysis.analysis_utils import map_in_parallel
+from analysis.run_report import count, stage, get_counters, reset_run_report, write_run_report
+
+
+def _count_fixations(fixation_count):
+    count("fixations_processed", fixation_count)
+    return fixation_count
+
+
+class RunReportTest(unittest.TestCase):
+    def setUp(self):
+        reset_run_report()
+
+    def tearDown(self):
+        reset_run_report()
+
+    def test_counters_of_workers_are_merged(self):
+        items = [3, 5, 7, 11]
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(items, map_in_parallel(_count_fixations, items, jobs=2, progress_description="Counted"))
+        self.assertEqual({"fixations_processed": 26}, get_counters())
+        map_in_parallel(_count_fixations, items)
+        self.assertEqual({"fixations_processed": 52}, get_counters())
+
+    def test_run_report_is_written(self):
+        with stage("parse"):
+            count("files_parsed")
+        with stage("parse"):
+            count("files_parsed")
+        with tempfile.TemporaryDirectory() as temporary_dir:
+            run_report_path = os.path.join(temporary_dir, "run_report.json")
+            write_run_report(run_report_path, participants=[1, 2])
+            with open(run_report_path, 'r') as run_report_file:
+                run_report = json.load(run_report_file)
+        self.assertEqual([1, 2], run_report["participants"])
+        self.assertEqual({"files_parsed": 2}, run_report["counters"])
+        self.assertEqual(["parse"], list(run_report["stage_seconds"]))
+
+    def test_progress_is_reported_once_per_interval(self):
+        output = io.StringIO()
+        with mock.patch("analysis.ProgressReporter.time.perf_counter", side_effect=[0, 1, 2, 3, 7, 8]), \
+                contextlib.redirect_stdout(output):
+            progress_reporter = ProgressReporter("Plots", 5, interval_s=5)
+            for _ in range(5):
+                progress_reporter.update()
+        self.assertEqual(["Plots: 1/5", "Plots: 4/5", "Plots: 5/5"],
+                         [line.split(" (")[0] for line in output.getvalue().splitlines()])
+
+
+if __name__ == '__main__':
+    unittest.main()
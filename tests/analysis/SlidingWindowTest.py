@@ -0,0 +1,27 @@
+import unittest
+
+from util import SlidingWindow
+
+
+class SlidingWindowTest(unittest.TestCase):
+    def test_window_keeps_the_last_values(self):
+        sliding_window = SlidingWindow(3)
+        sliding_window.set_values([7])
+        self.assertFalse(sliding_window.is_full)
+        values = [7]
+        for value in range(10):
+            sliding_window.append(value)
+            values = (values + [value])[-3:]
+            self.assertEqual(len(values) == 3, sliding_window.is_full)
+            self.assertEqual(values, [sliding_window.get(index) for index in range(len(values))])
+            self.assertEqual(values[0], sliding_window.get(-len(values)))
+            self.assertEqual(values[-1], sliding_window.get(-1))
+        with self.assertRaises(IndexError):
+            sliding_window.get(3)
+
+        sliding_window.set_values([1, 2, 3, 4])
+        self.assertEqual([2, 3, 4], [sliding_window.get(index) for index in range(3)])
+
+
+if __name__ == '__main__':
+    unittest.main()
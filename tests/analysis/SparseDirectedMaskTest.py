@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from scipy.stats import pearsonr
+
+from analysis.DirectedMaskFormat import DirectedMaskFormat, load_directed_mask
+from analysis.SparseDirectedMask import SparseDirectedMask
+from analysis.StreamingDirectedMaskAccumulator import StreamingDirectedMaskAccumulator
+from analysis.directed_mask_algebra import sum_directed_masks, subtract_directed_masks
+
+
+class SparseDirectedMaskTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.directed_masks = []
+        for _ in range(3):
+            directed_mask = np.zeros((20, 30, 2))
+            y, x = rng.integers(0, 15), rng.integers(0, 25)
+            directed_mask[y:y + 5, x:x + 5] = rng.normal(size=(5, 5, 2))
+            self.directed_masks.append(directed_mask)
+        self.sparse_directed_masks = [SparseDirectedMask.from_dense(directed_mask) for directed_mask in self.directed_masks]
+
+    def test_algebra_matches_dense_directed_masks(self):
+        dense_sum = sum_directed_masks(self.directed_masks)
+        sparse_sum = sum_directed_masks(self.sparse_directed_masks)
+        self.assertTrue(np.array_equal(dense_sum, sparse_sum.to_dense()))
+        dense_difference = subtract_directed_masks(dense_sum, self.directed_masks[1])
+        sparse_difference = subtract_directed_masks(sparse_sum, self.sparse_directed_masks[1])
+        self.assertTrue(np.array_equal(dense_difference, sparse_difference.to_dense()))
+
+    def test_algebra_accepts_dense_operands(self):
+        sparse_sum = self.sparse_directed_masks[0].add(self.directed_masks[1])
+        self.assertTrue(np.array_equal(self.directed_masks[0] + self.directed_masks[1], sparse_sum.to_dense()))
+        sparse_difference = self.sparse_directed_masks[0].subtract(self.directed_masks[1])
+        self.assertTrue(np.array_equal(self.directed_masks[0] - self.directed_masks[1], sparse_difference.to_dense()))
+        with self.assertRaises(ValueError):
+            self.sparse_directed_masks[0].add(np.zeros((10, 30, 2)))
+
+    def test_correlation_matches_scipy(self):
+        sparse_sum = sum_directed_masks(self.sparse_directed_masks)
+        dense_sum = sparse_sum.to_dense()
+        for channel in range(2):
+            expected_corr, expected_p_value = pearsonr(dense_sum[:, :, channel].flatten(),
+                                                       self.directed_masks[0][:, :, channel].flatten())
+            corr, p_value = sparse_sum.pearson_correlation(self.sparse_directed_masks[0], channel)
+            self.assertAlmostEqual(expected_corr, corr, places=12)
+            self.assertAlmostEqual(expected_p_value, p_value, places=12)
+
+    def test_constant_channel_has_no_correlation(self):
+        empty_directed_mask = SparseDirectedMask.from_dense(np.zeros((20, 30, 2)))
+        self.assertEqual((0, 0), empty_directed_mask.pearson_correlation(self.sparse_directed_masks[0], 0))
+
+    def test_sparse_format_round_trip_and_accumulation(self):
+        mask_format = DirectedMaskFormat(sparse=True)
+        self.assertEqual("-sparse.npz", mask_format.file_suffix + mask_format.file_extension)
+        with tempfile.TemporaryDirectory() as temporary_dir:
+            file_paths = []
+            for index, directed_mask in enumerate(self.directed_masks):
+                file_path = os.path.join(temporary_dir, f"{index}-directed-mask{mask_format.file_suffix}{mask_format.file_extension}")
+                mask_format.save(file_path, directed_mask)
+                file_paths.append(file_path)
+            self.assertIsInstance(load_directed_mask(file_paths[0]), SparseDirectedMask)
+
+            checkpoint_path = os.path.join(temporary_dir, "checkpoint.npz")
+            StreamingDirectedMaskAccumulator(checkpoint_path, checkpoint_interval=0).accumulate(file_paths[:2])
+            streaming_accumulator = StreamingDirectedMaskAccumulator(checkpoint_path)
+            accumulated_directed_mask = streaming_accumulator.accumulate(file_paths)
+            self.assertEqual(1, streaming_accumulator.resumed_count)
+            self.assertTrue(np.array_equal(sum_directed_masks(self.directed_masks), mask_format.decode(accumulated_directed_mask)))
+
+
+if __name__ == '__main__':
+    unittest.main()
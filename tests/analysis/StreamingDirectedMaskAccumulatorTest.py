@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from analysis.StreamingDirectedMaskAccumulator import StreamingDirectedMaskAccumulator
+
+
+class StreamingDirectedMaskAccumulatorTest(unittest.TestCase):
+    def setUp(self):
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(5)
+        self.directed_masks = [rng.normal(size=(6, 8, 2)) for _ in range(4)]
+        self.directed_mask_file_paths = []
+        for index, directed_mask in enumerate(self.directed_masks):
+            file_path = os.path.join(self.temporary_dir.name, f"{index}-directed-mask.npy")
+            np.save(file_path, directed_mask)
+            self.directed_mask_file_paths.append(file_path)
+        self.checkpoint_path = os.path.join(self.temporary_dir.name, "checkpoint.npz")
+
+    def tearDown(self):
+        self.temporary_dir.cleanup()
+
+    def expected_sum(self):
+        expected = self.directed_masks[0].copy()
+        for directed_mask in self.directed_masks[1:]:
+            expected += directed_mask
+        return expected
+
+    def test_accumulation_matches_sum(self):
+        accumulator = StreamingDirectedMaskAccumulator(self.checkpoint_path)
+        accumulated_directed_mask = accumulator.accumulate(self.directed_mask_file_paths)
+        self.assertTrue(np.array_equal(self.expected_sum(), accumulated_directed_mask))
+        self.assertEqual(0, accumulator.resumed_count)
+        # Accumulating four small directed masks takes less than the default checkpoint interval
+        self.assertFalse(os.path.exists(self.checkpoint_path))
+
+    def test_accumulation_resumes_from_checkpoint(self):
+        # An interrupted accumulation leaves a checkpoint of the directed masks accumulated so far
+        StreamingDirectedMaskAccumulator(self.checkpoint_path, checkpoint_interval=0).accumulate(
+            self.directed_mask_file_paths[:3])
+        self.assertTrue(os.path.exists(self.checkpoint_path))
+
+        accumulator = StreamingDirectedMaskAccumulator(self.checkpoint_path)
+        accumulated_directed_mask = accumulator.accumulate(self.directed_mask_file_paths)
+        self.assertEqual(2, accumulator.resumed_count)
+        self.assertTrue(np.array_equal(self.expected_sum(), accumulated_directed_mask))
+
+        accumulator.discard_checkpoint()
+        self.assertFalse(os.path.exists(self.checkpoint_path))
+
+    def test_outdated_checkpoint_is_discarded(self):
+        StreamingDirectedMaskAccumulator(self.checkpoint_path, checkpoint_interval=0).accumulate(
+            self.directed_mask_file_paths[:3])
+        self.directed_masks[0] = self.directed_masks[0] * 2
+        np.save(self.directed_mask_file_paths[0], self.directed_masks[0])
+        stat = os.stat(self.directed_mask_file_paths[0])
+        os.utime(self.directed_mask_file_paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        accumulator = StreamingDirectedMaskAccumulator(self.checkpoint_path)
+        accumulated_directed_mask = accumulator.accumulate(self.directed_mask_file_paths)
+        self.assertEqual(0, accumulator.resumed_count)
+        self.assertTrue(np.array_equal(self.expected_sum(), accumulated_directed_mask))
+
+    def test_missing_directed_mask_raises_file_not_found_error(self):
+        with self.assertRaises(FileNotFoundError):
+            StreamingDirectedMaskAccumulator(self.checkpoint_path).accumulate([os.path.join(self.temporary_dir.name, "missing.npy")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import os
+import random
+import tempfile
+import unittest
+
+from analysis.fixation_filter.tobiidata_to_uxidata import convert_tobiidata_to_uxidata, _tobii_tsv_header, \
+    _uxi_csv_header
+from tests.analysis.synthetic_data import create_tobii_line
+
+
+def validity(gaze_point_validity, pupil_validity):
+    if int(gaze_point_validity) and int(pupil_validity):
+        return "Valid"
+    return "Invalid"
+
+
+def get_value(gaze_data, variable):
+    src_header = {name: index for index, name in enumerate(_tobii_tsv_header().split("\t"))}
+    return gaze_data[src_header[variable]]
+
+
+def str_to_tup(s):
+    return tuple(s.replace("(", "")
+                 .replace(")", "")
+                 .replace(" ", "")
+                 .split(","))
+
+
+def replace_nan(lst):
+    rep = "0"
+    clean_list = []
+    for item in lst:
+        if isinstance(item, tuple):
+            clean_item = handle_nan_tuple(item, rep)
+        else:
+            if item == "nan":
+                clean_item = rep
+            else:
+                clean_item = item
+        clean_list.append(clean_item)
+    return clean_list
+
+
+def handle_nan_tuple(tup, rep):
+    clean_elements = []
+    for element in tup:
+        if element == "nan":
+            clean_elements.append(rep)
+        else:
+            clean_elements.append(element)
+    return f"({str(tuple(clean_elements)).replace(' ', '')})"
+
+
+def tobii_line_to_uxi_line(line):
+    """Converts one line of Tobii gaze data to one line of UXI gaze data like the converter did before it
+    converted whole chunks column by column.
+    """
+    gaze_data = line.split("\t")
+    # Timestamp from Tobii SDK given in microseconds (ticks:us)
+    # us_to_hh_mm_ss_ms(1034954093) -> 00:17:14:954.093
+    timestamp = get_value(gaze_data, "system_time_stamp")
+    # Left eye measures
+    left_validity = validity(get_value(gaze_data, "left_gaze_point_validity"),
+                             get_value(gaze_data, "left_pupil_validity"))
+    left_gaze_point_on_display_area = str_to_tup(get_value(
+        gaze_data, "left_gaze_point_on_display_area"))
+    left_gaze_point_2d_x = left_gaze_point_on_display_area[0]
+    left_gaze_point_2d_y = left_gaze_point_on_display_area[1]
+    left_gaze_point_in_user_coordinate_system = str_to_tup(
+        get_value(gaze_data, "left_gaze_point_in_user_coordinate_system"))
+    left_gaze_point_3d_x = left_gaze_point_in_user_coordinate_system[0]
+    left_gaze_point_3d_y = left_gaze_point_in_user_coordinate_system[1]
+    left_gaze_point_3d_z = left_gaze_point_in_user_coordinate_system[2]
+    left_gaze_origin_in_user_coordinate_system = str_to_tup(
+        get_value(gaze_data, "left_gaze_origin_in_user_coordinate_system"))
+    left_eye_position_3d_x = left_gaze_origin_in_user_coordinate_system[0]
+    left_eye_position_3d_y = left_gaze_origin_in_user_coordinate_system[1]
+    left_eye_position_3d_z = left_gaze_origin_in_user_coordinate_system[2]
+    left_pupil_diameter = get_value(gaze_data, "left_pupil_diameter")
+    # Right eye measures
+    right_validity = validity(get_value(gaze_data, "right_gaze_point_validity"),
+                              get_value(gaze_data, "left_pupil_validity"))
+    right_gaze_point_on_display_area = str_to_tup(
+        get_value(gaze_data, "right_gaze_point_on_display_area"))
+    right_gaze_point_2d_x = right_gaze_point_on_display_area[0]
+    right_gaze_point_2d_y = right_gaze_point_on_display_area[1]
+    right_gaze_point_in_user_coordinate_system = str_to_tup(
+        get_value(gaze_data, "right_gaze_point_in_user_coordinate_system"))
+    right_gaze_point_3d_x = right_gaze_point_in_user_coordinate_system[0]
+    right_gaze_point_3d_y = right_gaze_point_in_user_coordinate_system[1]
+    right_gaze_point_3d_z = right_gaze_point_in_user_coordinate_system[2]
+    right_gaze_origin_in_user_coordinate_system = str_to_tup(
+        get_value(gaze_data, "right_gaze_origin_in_user_coordinate_system"))
+    right_eye_position_3d_x = right_gaze_origin_in_user_coordinate_system[0]
+    right_eye_position_3d_y = right_gaze_origin_in_user_coordinate_system[1]
+    right_eye_position_3d_z = right_gaze_origin_in_user_coordinate_system[2]
+    right_pupil_diameter = get_value(gaze_data, "right_pupil_diameter")
+
+    uxi_variables = [
+        timestamp,
+        left_validity,
+        left_gaze_point_2d_x,
+        left_gaze_point_2d_y,
+        left_gaze_point_3d_x,
+        left_gaze_point_3d_y,
+        left_gaze_point_3d_z,
+        left_eye_position_3d_x,
+        left_eye_position_3d_y,
+        left_eye_position_3d_z,
+        left_pupil_diameter,
+        right_validity,
+        right_gaze_point_2d_x,
+        right_gaze_point_2d_y,
+        right_gaze_point_3d_x,
+        right_gaze_point_3d_y,
+        right_gaze_point_3d_z,
+        right_eye_position_3d_x,
+        right_eye_position_3d_y,
+        right_eye_position_3d_z,
+        right_pupil_diameter
+    ]
+
+    uxi_variables = replace_nan(uxi_variables)
+    uxi_data = ",".join(uxi_variables)
+    return uxi_data
+
+
+class TobiiDataConversionTest(unittest.TestCase):
+    def test_columnar_conversion_matches_line_wise_conversion(self):
+        rng = random.Random(9)
+        lines = [create_tobii_line(rng, 1034954093 + index * 8333) for index in range(250)]
+        expected = _uxi_csv_header() + "\n" + "".join(tobii_line_to_uxi_line(line + "\n") + "\n" for line in lines)
+
+        with tempfile.TemporaryDirectory() as participant_data_dir:
+            with open(os.path.join(participant_data_dir, "tobii_data.tsv"), 'w') as tobii_file:
+                tobii_file.write(_tobii_tsv_header() + "\n" + "\n".join(lines) + "\n")
+            self.assertTrue(convert_tobiidata_to_uxidata(participant_data_dir, chunk_size=64))
+            with open(os.path.join(participant_data_dir, "uxi_data.csv"), 'r') as uxi_file:
+                self.assertEqual(expected, uxi_file.read())
+
+    def test_missing_tobii_data(self):
+        with tempfile.TemporaryDirectory() as participant_data_dir:
+            self.assertFalse(convert_tobiidata_to_uxidata(participant_data_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
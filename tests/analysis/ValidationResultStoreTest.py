@@ -0,0 +1,80 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from analysis.ValidationResult import DirectedMaskScore, HeatMapScore, ValidationScore, ValidationResult
+from analysis.ValidationResultStore import ValidationResultStore
+
+
+class ValidationResultStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temporary_dir.name, "validation_result.sqlite")
+        self.legacy_file_path = os.path.join(self.temporary_dir.name, "validation_result.pickle")
+
+    def tearDown(self):
+        self.temporary_dir.cleanup()
+
+    def test_scores_are_upserted_and_persisted(self):
+        store = ValidationResultStore(self.file_path)
+        self.assertIsNone(store.get_score("task-1", 1, 1))
+        store.save_dm_score("task-1", 1, 1, DirectedMaskScore(0.5, 0.01))
+        store.save_hm_score("task-1", 1, 2, HeatMapScore(0.3, 0.02))
+        store.save_hm_score("task-1", 1, 1, HeatMapScore(0.7, 0.03))
+        store.save_dm_score("task-1", 1, 1, DirectedMaskScore(0.6, 0.04))
+        store.close()
+
+        reopened_store = ValidationResultStore(self.file_path)
+        validation_score = reopened_store.get_score("task-1", 1, 1)
+        self.assertEqual(HeatMapScore(0.7, 0.03), validation_score.hm_score)
+        self.assertEqual(DirectedMaskScore(0.6, 0.04), validation_score.dm_score)
+        self.assertIsNone(reopened_store.get_score("task-1", 1, 2).dm_score)
+
+        scores_by_mapping = reopened_store.get_scores_by_mapping()
+        self.assertEqual([1, 2], [validation_score.eid for validation_score in scores_by_mapping["task-1"]])
+        reopened_store.close()
+
+    def test_scores_are_saved_with_their_keys(self):
+        store = ValidationResultStore(self.file_path)
+        store.save_hm_score("task-1", 1, 1, HeatMapScore(0.7, 0.03), "heatmap-key")
+        store.save_dm_score("task-1", 1, 1, DirectedMaskScore(0.6, 0.04), "directed-mask-key")
+        store.save_hm_score("task-1", 1, 1, HeatMapScore(0.8, 0.01), "changed-heatmap-key")
+        validation_score = store.get_score("task-1", 1, 1)
+        self.assertEqual(HeatMapScore(0.8, 0.01), validation_score.hm_score)
+        self.assertEqual("changed-heatmap-key", validation_score.hm_key)
+        self.assertEqual("directed-mask-key", validation_score.dm_key)
+        store.close()
+
+    def test_store_without_key_columns_is_extended(self):
+        connection = sqlite3.connect(self.file_path)
+        with connection:
+            connection.execute("CREATE TABLE validation_scores (mapping TEXT NOT NULL, pid INTEGER NOT NULL, "
+                               "eid INTEGER NOT NULL, hm_corr REAL, hm_p REAL, dm_corr REAL, dm_p REAL, "
+                               "PRIMARY KEY (mapping, pid, eid))")
+            connection.execute("INSERT INTO validation_scores (mapping, pid, eid, hm_corr, hm_p) "
+                               "VALUES ('task-1', 1, 1, 0.7, 0.03)")
+        connection.close()
+
+        store = ValidationResultStore(self.file_path)
+        validation_score = store.get_score("task-1", 1, 1)
+        self.assertEqual(HeatMapScore(0.7, 0.03), validation_score.hm_score)
+        self.assertIsNone(validation_score.hm_key)
+        store.save_dm_score("task-1", 1, 1, DirectedMaskScore(0.6, 0.04), "directed-mask-key")
+        self.assertEqual("directed-mask-key", store.get_score("task-1", 1, 1).dm_key)
+        store.close()
+
+    def test_legacy_validation_result_is_migrated(self):
+        validation_result = ValidationResult()
+        validation_result.set_scores([ValidationScore("task-2", 3, 4, HeatMapScore(0.1, 0.2), None)])
+        validation_result.save(self.legacy_file_path)
+
+        store = ValidationResultStore(self.file_path, self.legacy_file_path)
+        validation_score = store.get_score("task-2", 3, 4)
+        self.assertEqual(HeatMapScore(0.1, 0.2), validation_score.hm_score)
+        self.assertIsNone(validation_score.dm_score)
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from analysis.AnalysisConfiguration import AnalysisConfiguration
+from analysis.HeatPoint import HeatPoint
+from analysis.Plotter import Plotter
+from analysis.ValidationResult import DirectedMaskScore, HeatMapScore
+from analysis.Validator import Validator
+from analysis.WeightType import WeightType
+from analysis.run_report import get_counters, reset_run_report
+
+
+class HeatPointAccumulator:
+    """Provides fixed heat points per exploration in place of heat points derived from fixations."""
+    def __init__(self, heat_points_by_exploration):
+        self.heat_points_by_exploration = heat_points_by_exploration
+
+    def relatable_fixations_list_to_heat_points(self, relatable_fixations_list, weight_type):
+        heat_points = []
+        for relatable_fixations in relatable_fixations_list:
+            heat_points += self.heat_points_by_exploration[relatable_fixations.exploration_id]
+        return heat_points
+
+
+class ValidatorTest(unittest.TestCase):
+    def setUp(self):
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(5)
+        # Each exploration is splatted, all but one exploration together are blurred
+        heat_points_by_exploration = {exploration_id: [HeatPoint(rng.random(), rng.random(), int(rng.integers(80, 900)))
+                                                       for _ in range(120)]
+                                      for exploration_id in range(6)}
+        heat_points_by_exploration[6] = []
+        self.heat_points_by_exploration = heat_points_by_exploration
+        self.relatable_fixations_list = [mock.Mock(pid=1, exploration_id=exploration_id)
+                                         for exploration_id in heat_points_by_exploration]
+        self.accumulator = HeatPointAccumulator(heat_points_by_exploration)
+        config = AnalysisConfiguration([1], False, False, False, False, False, None, WeightType.INTENSITY,
+                                       WeightType.INTENSITY)
+        self.plotter = Plotter(config)
+        with mock.patch("analysis.Validator.VALIDATION_RESULT_DB_PATH",
+                        os.path.join(self.temporary_dir.name, "validation_result.sqlite")), \
+                mock.patch("analysis.Validator.VALIDATION_RESULT_FILE_PATH",
+                           os.path.join(self.temporary_dir.name, "validation_result.pickle")):
+            self.validator = Validator(config, self.accumulator, self.plotter)
+
+        reset_run_report()
+
+    def tearDown(self):
+        reset_run_report()
+        self.validator.result_store.close()
+        self.temporary_dir.cleanup()
+
+    def test_heatmap_scores_match_rendering_each_fold(self):
+        self.validator._loucv_heatmaps("task-1", self.relatable_fixations_list)
+        for index, relatable_fixations in enumerate(self.relatable_fixations_list):
+            remaining_relatable_fixations_list = self.relatable_fixations_list.copy()
+            remaining_relatable_fixations_list.pop(index)
+            left_out_heatmap = self.plotter.create_heatmap_from_heat_points(
+                self.accumulator.relatable_fixations_list_to_heat_points([relatable_fixations], WeightType.INTENSITY))
+            current_accumulated_heatmap = self.plotter.create_heatmap_from_heat_points(
+                self.accumulator.relatable_fixations_list_to_heat_points(remaining_relatable_fixations_list,
+                                                                         WeightType.INTENSITY))
+            hm_correlation, hm_p_value = Validator._correlation_between_heat_maps(current_accumulated_heatmap,
+                                                                                 left_out_heatmap)
+
+            validation_score = self.validator.result_store.get_score("task-1", 1, relatable_fixations.exploration_id)
+            self.assertEqual(HeatMapScore(hm_correlation, hm_p_value), validation_score.hm_score)
+
+    def test_heatmap_scores_are_recomputed_when_heat_points_change(self):
+        self.validator._loucv_heatmaps("task-1", self.relatable_fixations_list)
+        self.validator._loucv_heatmaps("task-1", self.relatable_fixations_list)
+        self.assertEqual(7, get_counters()["heatmap_scores_computed"])
+
+        heatmap_score = self.validator.result_store.get_score("task-1", 1, 0).hm_score
+        self.heat_points_by_exploration[0] = self.heat_points_by_exploration[0][:60]
+        self.validator._loucv_heatmaps("task-1", self.relatable_fixations_list)
+        self.assertEqual(14, get_counters()["heatmap_scores_computed"])
+        self.assertNotEqual(heatmap_score, self.validator.result_store.get_score("task-1", 1, 0).hm_score)
+
+    def test_heatmap_scores_are_recomputed_for_another_renderer_dtype(self):
+        self.validator._loucv_heatmaps("task-1", self.relatable_fixations_list)
+        self.plotter.heatmap_renderer.dtype = np.float32
+        self.validator._loucv_heatmaps("task-1", self.relatable_fixations_list)
+        self.assertEqual(14, get_counters()["heatmap_scores_computed"])
+
+    def test_directed_mask_store_is_not_built_for_current_scores(self):
+        accumulated_directed_mask_path = os.path.join(self.temporary_dir.name, "accumulated-directed-mask.npy")
+        np.save(accumulated_directed_mask_path, np.zeros((9, 16, 2)))
+        dm_key = self.validator.artifact_cache.key([accumulated_directed_mask_path],
+                                                   {"artifact": "directed-mask-score"})
+        for relatable_fixations in self.relatable_fixations_list:
+            self.validator.result_store.save_dm_score("task-1", 1, relatable_fixations.exploration_id,
+                                                      DirectedMaskScore(0.5, 0.01), dm_key)
+
+        with mock.patch("analysis.Validator.get_accumulated_directed_mask_file_path",
+                        return_value=accumulated_directed_mask_path), \
+                mock.patch.object(Validator, "_get_directed_mask_store") as get_directed_mask_store:
+            self.validator._loucv_directed_masks("task-1", self.relatable_fixations_list)
+        get_directed_mask_store.assert_not_called()
+        self.assertNotIn("directed_mask_scores_computed", get_counters())
+
+
+if __name__ == '__main__':
+    unittest.main()
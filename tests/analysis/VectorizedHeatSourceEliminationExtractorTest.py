@@ -0,0 +1,36 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from analysis.HeatPoint import HeatPoint
+from analysis.extractors.ConcurrentHeatSourceEliminationExtractor import ConcurrentHeatSourceEliminationExtractor
+from analysis.extractors.VectorizedHeatSourceEliminationExtractor import VectorizedHeatSourceEliminationExtractor
+
+
+def create_heatmap(rng, width, height):
+    heatmap = cv2.GaussianBlur((rng.random((height, width)) * 255).astype(np.uint8), (0, 0), int(rng.integers(1, 8)))
+    return (heatmap * rng.random() * 2).clip(0, 255).astype(np.uint8)
+
+
+class VectorizedHeatSourceEliminationExtractorTest(unittest.TestCase):
+    def test_affected_points_match_heat_point_visitors(self):
+        rng = np.random.default_rng(22)
+        for _ in range(40):
+            width, height = rng.integers(1, 250, 2)
+            heatmap = create_heatmap(rng, width, height)
+            x = int(rng.choice([0, width - 1, rng.integers(0, width)]))
+            y = int(rng.choice([0, height - 1, rng.integers(0, height)]))
+            heat_source = HeatPoint(x, y, int(heatmap[y, x]))
+
+            marker_mask = ConcurrentHeatSourceEliminationExtractor._find_affected_points_from_heat_source(heat_source,
+                                                                                                          heatmap)
+            # The full marker mask stacks the row of the heat source below the rows of the lower quadrants
+            marker_mask = np.vstack((marker_mask[:y], marker_mask[-1:], marker_mask[y:-1]))
+            affected_points = VectorizedHeatSourceEliminationExtractor._find_affected_points_from_heat_source(
+                heat_source, heatmap)
+            np.testing.assert_array_equal(marker_mask > 0, affected_points)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+The former per-pixel directed mask rasterizer, kept as the reference for the DirectedMaskRasterizer.
+It scans the full mask for every stroke and influences one pixel at a time.
+"""
+
+import math
+
+import numpy as np
+
+from analysis.DirectedMaskRasterizer import DirectedStroke
+
+
+def rasterize_per_pixel(width, height, strokes: list[DirectedStroke]):
+    """Creates a directed mask of shape (height, width, 2) and applies all strokes in order.
+    """
+    directed_mask = np.zeros((height, width, 2))
+    for stroke in strokes:
+        _apply_stroke_per_pixel(directed_mask, stroke)
+    return directed_mask
+
+
+def _apply_stroke_per_pixel(directed_mask, stroke: DirectedStroke):
+    x_vector, y_vector = np.meshgrid(np.arange(directed_mask.shape[1]), np.arange(directed_mask.shape[0]))
+    vector_origin = stroke.vector_origin
+    vector_range = stroke.vector_range
+
+    # Calculate all Euclidean distances from the vectors origin
+    distance_vector = np.sqrt((x_vector - vector_origin[0]) ** 2 + (y_vector - vector_origin[1]) ** 2)
+    # Find the indices of points within the given range
+    indices_in_vector_range = np.where(distance_vector <= vector_range)
+
+    points_in_range = []
+    for i in range(len(indices_in_vector_range[0])):
+        points_in_range.append((indices_in_vector_range[0][i], indices_in_vector_range[1][i]))
+
+    # Identify values for each index
+    values_in_vector_range = directed_mask[indices_in_vector_range]
+    # Remember the distances for each index
+    distances_to_vector_origin = distance_vector[indices_in_vector_range]
+
+    for i in range(len(points_in_range)):
+        directed_mask[points_in_range[i]] = _influence_vector(values_in_vector_range[i], stroke.vector,
+                                                              distances_to_vector_origin[i], vector_range)
+
+
+def _influence_vector(influenced_vector: tuple, influencing_vector: tuple, vector_distance: float, influencing_vector_range: int) -> tuple:
+    """Influences vectors in range of influencing vector. Uses a linear function to reduce
+    the strength of influence the further the influenced vector is away from the influencing vector.
+
+    args:
+        - influenced_vector: One vector that is in range of the influencing vector and is influenced by it.
+        - influencing_vector: The one vector extracted from the current saccade that influences surrounding vectors.
+        - vector_distance: The distance of the influencing vector to the influenced vector.
+        - influencing_vector_range: The range in which the influencing vector influences other vectors.
+
+    returns:
+        - The influenced vector after being influenced.
+    """
+    def _strength_at_range(current_distance, max_range, max_strength):
+        return max_strength - (max_strength / max_range) * current_distance
+
+    influencing_vector_strength = math.sqrt(influencing_vector[0] ** 2 + influencing_vector[1] ** 2)
+    strength_at_range = _strength_at_range(vector_distance, influencing_vector_range, influencing_vector_strength)
+    assert strength_at_range != 0
+    influencing_unit_vector = (influencing_vector[0] / influencing_vector_strength, influencing_vector[1] / influencing_vector_strength)
+    vector_influence = (influencing_unit_vector[0] * strength_at_range, influencing_unit_vector[1] * strength_at_range)
+    added_vec = (influenced_vector[0] + vector_influence[0], influenced_vector[1] + vector_influence[1])
+
+    return added_vec
@@ -0,0 +1,37 @@
+import random
+from datetime import datetime
+
+from analysis.DirectedMaskRasterizer import DirectedMaskRasterizer
+from analysis.SimpleFixation import SimpleFixation
+from analysis.WeightType import WeightType
+from config import RESOLUTION
+from tests.analysis.per_pixel_rasterizer import rasterize_per_pixel
+
+
+def create_exploration_fixations(number_of_fixations, seed=0):
+    rng = random.Random(seed)
+    fixations = []
+    timestamp_us = 0
+    for _ in range(number_of_fixations):
+        duration = rng.uniform(60, 600)
+        fixations.append(SimpleFixation(timestamp_us, duration, rng.random(), rng.random()))
+        timestamp_us += int(duration * 1000) + rng.randint(10000, 50000)
+    return fixations
+
+
+def time_exploration(rasterize, fixations, weight_type):
+    width, height = RESOLUTION
+    strokes = DirectedMaskRasterizer.get_directed_strokes(width, height, fixations, weight_type)
+    t0 = datetime.now().timestamp()
+    rasterize(width, height, strokes)
+    return datetime.now().timestamp() - t0
+
+
+if __name__ == '__main__':
+    number_of_fixations = 20
+    fixations = create_exploration_fixations(number_of_fixations)
+    for weight_type in WeightType:
+        per_pixel_time = time_exploration(rasterize_per_pixel, fixations, weight_type)
+        windowed_time = time_exploration(DirectedMaskRasterizer().rasterize, fixations, weight_type)
+        print(f"{weight_type.name}: per-pixel {per_pixel_time:.3f} s, windowed {windowed_time:.3f} s "
+              f"per exploration of {number_of_fixations} fixations ({per_pixel_time / windowed_time:.0f}x)")
@@ -0,0 +1,33 @@
+import random
+from datetime import datetime
+
+import numpy as np
+
+from analysis.GaussianHeatmapRenderer import GaussianHeatmapRenderer
+from config import RESOLUTION
+
+
+def create_x_y_intensity_list(number_of_heat_points, seed=0):
+    rng = random.Random(seed)
+    return [(rng.random(), rng.random(), rng.uniform(60, 600)) for _ in range(number_of_heat_points)]
+
+
+def time_rendering(render, x_y_intensity_list):
+    t0 = datetime.now().timestamp()
+    heatmap = render(RESOLUTION, x_y_intensity_list)
+    return datetime.now().timestamp() - t0, heatmap
+
+
+def normalize(heatmap):
+    return (heatmap / heatmap.max() * 255).astype(np.uint8)
+
+
+if __name__ == '__main__':
+    renderer = GaussianHeatmapRenderer()
+    for number_of_heat_points in [1, 10, 50, 100, 250, 500, 1000, 2000]:
+        x_y_intensity_list = create_x_y_intensity_list(number_of_heat_points)
+        blurred_time, blurred_heatmap = time_rendering(renderer.render_blurred, x_y_intensity_list)
+        splatted_time, splatted_heatmap = time_rendering(renderer.render_splatted, x_y_intensity_list)
+        differing_pixels = np.count_nonzero(normalize(blurred_heatmap) != normalize(splatted_heatmap))
+        print(f"{number_of_heat_points} heat points: blurred {blurred_time:.3f} s, splatted {splatted_time:.3f} s, "
+              f"{differing_pixels} normalized pixels differ")
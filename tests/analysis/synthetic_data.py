@@ -0,0 +1,46 @@
+"""
+Creates synthetic input data that is shared by several tests.
+"""
+
+from analysis.Movement import Movement, MovementType
+
+
+def create_tobii_line(rng, timestamp):
+    def number():
+        return "nan" if rng.random() < 0.1 else repr(rng.uniform(-300, 300))
+
+    def point(size):
+        return "(" + ", ".join(number() for _ in range(size)) + ")"
+
+    def validity():
+        return str(int(rng.random() > 0.1))
+
+    fields = [str(timestamp - 5000), str(timestamp)]
+    for _ in range(2):
+        fields += [point(2), point(3), validity(), number(), validity(), point(3), point(3), validity()]
+    return "\t".join(fields)
+
+
+def create_movements(rng, count):
+    movements = []
+    timestamp_us = 1000000
+    for _ in range(count):
+        movement_type = rng.choice(list(MovementType))
+        duration = rng.uniform(10, 600)
+        if movement_type == MovementType.FIXATION:
+            values = [rng.uniform(-0.1, 1.1), rng.uniform(-0.1, 1.1)] + [rng.uniform(-300, 600) for _ in range(7)]
+        else:
+            values = [None] * 9
+        movements.append(Movement(timestamp_us, movement_type, duration, *values))
+        timestamp_us += int(duration * 1000)
+    return movements
+
+
+def write_explorations(file_path, exploration_count):
+    lines = ["Timestamp\tMessage"]
+    for index in range(exploration_count):
+        start = 1000000 * (index + 1)
+        lines += [f"{start}\tTRIALSTART", f"{start + 1}\tIMAGENAME image-{index}.png", f"{start + 2}\timage online",
+                  f"{start + 500000}\timage offline", f"{start + 500001}\tTRIALEND"]
+    with open(file_path, 'w') as explorations_file:
+        explorations_file.write("\n".join(lines) + "\n")
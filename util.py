@@ -9,27 +9,45 @@ repo_root = os.path.dirname(os.path.abspath(__file__))
 
 
 class SlidingWindow:
+    """A window over the last size values that were appended.
+    The values are kept in a circular buffer of fixed size, hence appending a value does not move the others.
+    """
     def __init__(self, size):
-        self.values = []
+        self.values = [None] * size
         self.size = size
+        self.start = 0
+        self.length = 0
 
     @property
     def is_full(self):
-        return len(self.values) == self.size
+        return self.length == self.size
 
     def append(self, value):
         if self.is_full:
-            self.values.pop(0)
-        self.values.append(value)
+            # Overwrite the oldest value, which makes the next value the oldest
+            self.values[self.start] = value
+            self.start = (self.start + 1) % self.size
+        else:
+            self.values[(self.start + self.length) % self.size] = value
+            self.length += 1
 
     def get(self, index):
-        return self.values[index]
+        """Returns the value at the index, counted from the oldest value. Negative indices count from the newest value.
+        """
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError(f"Sliding window index out of range ({index})")
+        return self.values[(self.start + index) % self.size]
 
     def clear(self):
-        self.values.clear()
+        self.start = 0
+        self.length = 0
 
     def set_values(self, values):
-        self.values = values
+        self.clear()
+        for value in values[-self.size:]:
+            self.append(value)
 
 
 class Point:
@@ -228,10 +246,93 @@ def load_ui(path):
 
 
 def find_file_in_dir(file_name, start_dir):
-    for root, dirs, files in os.walk(start_dir):
-        if file_name in files:
-            return os.path.abspath(os.path.join(root, file_name))
-    return None
+    return get_directory_index(start_dir).find_file(file_name)
+
+
+class DirectoryIndex:
+    """Index of all files below a directory, built lazily by a single walk of the directory.
+
+    Files are found by name like a top-down os.walk finds them, i.e. the file closest to the top wins.
+    The index is rebuilt if a file is not found or has been removed since, hence added files are found as well.
+    A file that is still not found after rebuilding is remembered as missing. Later lookups of it only compare the
+    modification times of the indexed directories with those at the last walk, which change when a file is added,
+    and walk the directory again only if they did.
+    """
+    def __init__(self, directory):
+        self.directory: str = os.path.abspath(directory)
+        self.file_paths: dict[str, str] | None = None
+        self.sorted_entries: dict[str, list[str]] | None = None
+        self.directory_mtimes: dict[str, int | None] = dict()
+        self.missing_file_names: set[str] = set()
+
+    def build(self):
+        self.file_paths = dict()
+        self.sorted_entries = dict()
+        for root, dirs, files in os.walk(self.directory):
+            self.sorted_entries[root] = sorted(dirs + files)
+            for file_name in files:
+                self.file_paths.setdefault(file_name, os.path.join(root, file_name))
+        self.directory_mtimes = self._get_directory_mtimes()
+        self.missing_file_names.clear()
+
+    def invalidate(self):
+        self.file_paths = None
+        self.sorted_entries = None
+        self.missing_file_names.clear()
+
+    def find_file(self, file_name):
+        if file_name in self.missing_file_names and self._get_directory_mtimes() == self.directory_mtimes:
+            return None
+        if self.file_paths is None:
+            self.build()
+        file_path = self.file_paths.get(file_name)
+        if file_path is None or not os.path.exists(file_path):
+            self.build()
+            file_path = self.file_paths.get(file_name)
+        if file_path is None:
+            self.missing_file_names.add(file_name)
+        return file_path
+
+    def _get_directory_mtimes(self):
+        """returns:
+            - The modification time of the indexed directory and of each directory below it found by the last walk,
+            None for directories that do not exist (anymore).
+        """
+        directory_mtimes = dict()
+        for directory in [self.directory] + list(self.sorted_entries or []):
+            try:
+                directory_mtimes[directory] = os.stat(directory).st_mtime_ns
+            except FileNotFoundError:
+                directory_mtimes[directory] = None
+        return directory_mtimes
+
+    def list_files(self, directory):
+        """Same as list_files for a directory below the indexed directory.
+        The index is only rebuilt for directories it does not know yet, hence files added to or removed from a known
+        directory are only listed correctly after invalidate().
+        """
+        if self.sorted_entries is None:
+            self.build()
+        directory = os.path.abspath(directory)
+        if directory not in self.sorted_entries:
+            self.build()
+        assert directory in self.sorted_entries
+        return self.sorted_entries[directory]
+
+
+_directory_indexes: dict[str, DirectoryIndex] = dict()
+
+
+def get_directory_index(directory) -> DirectoryIndex:
+    directory = os.path.abspath(directory)
+    if directory not in _directory_indexes:
+        _directory_indexes[directory] = DirectoryIndex(directory)
+    return _directory_indexes[directory]
+
+
+def invalidate_directory_indexes():
+    for directory_index in _directory_indexes.values():
+        directory_index.invalidate()
 
 
 def absolute_to_repo_relative_path(abs_path):